@@ -0,0 +1,295 @@
+#!/usr/bin/env python3
+"""
+Almacén del vocabulario con registro de escritura anticipada (WAL).
+
+En lugar de abrir vocabulario_sentimiento.csv en modo "a" por cada token nuevo
+(sin bloqueo: varios procesos pueden intercalar filas o duplicarlas), las
+palabras nuevas se acumulan en memoria y se confirman por lotes:
+
+  - confirmar(): con el bloqueo exclusivo tomado, descarta las palabras que otro
+    proceso ya agregó y escribe el resto en el WAL (<vocabulario>.wal, mismas
+    columnas que el CSV) con una sola escritura + fsync.
+  - compactar(): incorpora el WAL al CSV (archivo temporal + os.replace, una
+    fila por palabra), vacía el WAL y regenera el vocabulario compilado si existe.
+    Se hace sola cuando el WAL supera 'umbral_compactacion' filas.
+  - actualizar(vocab): un lector de otro proceso aplica sólo las filas del WAL
+    que no había visto. Si el WAL y el CSV no cambiaron (tamaño, mtime) no lee
+    nada; el CSV sólo se vuelve a leer completo después de una compactación.
+
+Igual que al agregar filas al CSV, si una palabra aparece más de una vez vale
+la última (es lo que hace cargar_vocabulario).
+
+Uso:
+  python almacen_lexico.py estado [vocabulario.csv]
+  python almacen_lexico.py compactar [vocabulario.csv]
+"""
+
+import os
+import sys
+from contextlib import contextmanager
+from typing import Dict, List, Optional, Tuple
+
+try:
+    import fcntl
+except ImportError:  # Windows: sin bloqueo entre procesos
+    fcntl = None
+
+EXTENSION_WAL = ".wal"
+EXTENSION_LOCK = ".lock"
+UMBRAL_COMPACTACION = 500
+
+
+def ruta_wal(path_csv: str) -> str:
+    """
+    Ej: "vocabulario_sentimiento.csv" -> "vocabulario_sentimiento.wal"
+    """
+    return os.path.splitext(path_csv)[0] + EXTENSION_WAL
+
+
+def _firma(ruta: str) -> Optional[Tuple[int, int, int]]:
+    try:
+        st = os.stat(ruta)
+    except FileNotFoundError:
+        return None
+    return (st.st_ino, st.st_size, st.st_mtime_ns)
+
+
+def _parsear_filas(texto: str) -> List[Tuple[str, str, int]]:
+    """
+    Filas válidas (palabra, categoria, puntaje) con la misma normalización que
+    cargar_vocabulario.
+    """
+    import csv
+    import io
+
+    filas = []
+    for row in csv.reader(io.StringIO(texto)):
+        if len(row) < 3:
+            continue
+        try:
+            puntaje = int(row[2])
+        except ValueError:
+            continue
+        filas.append((row[0].strip().lower(), row[1].strip(), puntaje))
+    return filas
+
+
+def leer_wal(path_csv: str, desde: int = 0) -> Tuple[List[Tuple[str, str, int]], int]:
+    """
+    Filas del WAL a partir del byte 'desde'. Devuelve (filas, nuevo_offset); el
+    offset sólo avanza hasta la última fila completa.
+    """
+    try:
+        with open(ruta_wal(path_csv), "rb") as f:
+            f.seek(desde)
+            datos = f.read()
+    except FileNotFoundError:
+        return [], 0
+    fin = datos.rfind(b"\n") + 1
+    return _parsear_filas(datos[:fin].decode("utf-8")), desde + fin
+
+
+class AlmacenLexico:
+    """
+    Escritura por lotes y lectura incremental del vocabulario de 'path_csv'.
+    """
+
+    def __init__(self, path_csv: str, umbral_compactacion: int = UMBRAL_COMPACTACION):
+        self.path_csv = path_csv
+        self.ruta_wal = ruta_wal(path_csv)
+        self.ruta_lock = os.path.splitext(path_csv)[0] + EXTENSION_LOCK
+        self.umbral_compactacion = umbral_compactacion
+        self._pendientes: Dict[str, Tuple[str, int]] = {}
+        # Lectura incremental (actualizar): offset en el WAL y firmas vistas
+        self._offset = 0
+        self._firma_wal = None
+        self._firma_csv = None
+        # Deduplicación al confirmar: palabras ya escritas en el WAL por cualquiera
+        self._offset_escritas = 0
+        self._escritas: set = set()
+        self._firma_csv_escritas = None
+
+    # ------------------------------
+    # Bloqueo
+    # ------------------------------
+
+    @contextmanager
+    def _bloqueo(self, exclusivo: bool):
+        with open(self.ruta_lock, "a+b") as f:
+            if fcntl is not None:
+                fcntl.flock(f.fileno(), fcntl.LOCK_EX if exclusivo else fcntl.LOCK_SH)
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+    # ------------------------------
+    # Escritura
+    # ------------------------------
+
+    def agregar(self, palabra: str, categoria: str, puntaje: int):
+        """
+        Agrega (en memoria) una palabra; se escribe en el próximo confirmar().
+        """
+        self._pendientes[palabra.strip().lower()] = (categoria, int(puntaje))
+
+    def pendientes(self) -> int:
+        return len(self._pendientes)
+
+    def confirmar(self) -> int:
+        """
+        Escribe las palabras pendientes en el WAL, de forma atómica respecto de
+        otros procesos. Devuelve cuántas se escribieron (las que otro proceso ya
+        había agregado se descartan).
+        """
+        if not self._pendientes:
+            return 0
+        with self._bloqueo(exclusivo=True):
+            firma_csv = _firma(self.path_csv)
+            if firma_csv != self._firma_csv_escritas:
+                # Otro proceso compactó: el WAL empezó de nuevo
+                self._offset_escritas = 0
+                self._escritas.clear()
+                self._firma_csv_escritas = firma_csv
+            filas, self._offset_escritas = leer_wal(self.path_csv, self._offset_escritas)
+            self._escritas.update(palabra for palabra, _, _ in filas)
+
+            nuevas = [(p, c, s) for p, (c, s) in self._pendientes.items() if p not in self._escritas]
+            self._pendientes.clear()
+            if nuevas:
+                import csv
+                import io
+
+                buffer = io.StringIO()
+                writer = csv.writer(buffer, lineterminator="\n")
+                for palabra, categoria, puntaje in nuevas:
+                    writer.writerow([palabra, categoria, str(puntaje)])
+                datos = buffer.getvalue().encode("utf-8")
+                fd = os.open(self.ruta_wal, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+                try:
+                    os.write(fd, datos)
+                    os.fsync(fd)
+                finally:
+                    os.close(fd)
+                self._offset_escritas += len(datos)
+                self._escritas.update(p for p, _, _ in nuevas)
+
+            if len(self._escritas) >= self.umbral_compactacion:
+                self._compactar()
+        return len(nuevas)
+
+    def compactar(self) -> int:
+        """
+        Incorpora el WAL al CSV y lo vacía. Devuelve la cantidad de palabras del CSV.
+        """
+        with self._bloqueo(exclusivo=True):
+            return self._compactar()
+
+    def _compactar(self) -> int:
+        vocab: Dict[str, Tuple[str, int]] = {}
+        if os.path.isfile(self.path_csv):
+            with open(self.path_csv, encoding="utf-8") as f:
+                for palabra, categoria, puntaje in _parsear_filas(f.read()):
+                    vocab[palabra] = (categoria, puntaje)
+        filas_wal, _ = leer_wal(self.path_csv)
+        for palabra, categoria, puntaje in filas_wal:
+            vocab[palabra] = (categoria, puntaje)
+
+        import csv
+
+        tmp = f"{self.path_csv}.tmp{os.getpid()}"
+        with open(tmp, "w", encoding="utf-8", newline="") as f:
+            writer = csv.writer(f, lineterminator="\n")
+            for palabra, (categoria, puntaje) in vocab.items():
+                writer.writerow([palabra, categoria, str(puntaje)])
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, self.path_csv)
+        # Si se interrumpe acá, el WAL se vuelve a aplicar: como vale la
+        # última aparición, el resultado es el mismo
+        if os.path.exists(self.ruta_wal):
+            os.truncate(self.ruta_wal, 0)
+        self._offset_escritas = 0
+        self._escritas.clear()
+        self._firma_csv_escritas = _firma(self.path_csv)
+
+        from lexico_compilado import compilar_lexico, ruta_compilada
+        if os.path.isfile(ruta_compilada(self.path_csv)):
+            compilar_lexico(vocab, ruta_compilada(self.path_csv))
+        return len(vocab)
+
+    # ------------------------------
+    # Lectura
+    # ------------------------------
+
+    def hay_cambios(self) -> bool:
+        """
+        True si el WAL o el CSV cambiaron desde la última lectura (dos stat()).
+        """
+        return (_firma(self.ruta_wal) != self._firma_wal
+                or _firma(self.path_csv) != self._firma_csv)
+
+    def actualizar(self, vocab: Dict[str, Tuple[str, int]]) -> Dict[str, Tuple[str, int]]:
+        """
+        Aplica a 'vocab' lo que otros procesos agregaron desde la última llamada
+        y lo devuelve ({ palabra: (categoria, puntaje) }). Sin cambios en disco
+        sólo cuesta dos stat().
+        """
+        firma_wal = _firma(self.ruta_wal)
+        if firma_wal == self._firma_wal and _firma(self.path_csv) == self._firma_csv:
+            return {}
+
+        with self._bloqueo(exclusivo=False):
+            cambios: Dict[str, Tuple[str, int]] = {}
+            if self._firma_csv is not None and _firma(self.path_csv) != self._firma_csv:
+                # Hubo una compactación (o una edición manual): releer el CSV
+                from tokenizacion import cargar_vocabulario
+                for palabra, valor in cargar_vocabulario(self.path_csv, usar_compilado=False).items():
+                    if vocab.get(palabra) != valor:
+                        cambios[palabra] = valor
+                self._offset = 0
+            elif self._firma_wal is not None and (firma_wal is None or firma_wal[1] < self._offset):
+                self._offset = 0
+
+            filas, self._offset = leer_wal(self.path_csv, self._offset)
+            for palabra, categoria, puntaje in filas:
+                cambios[palabra] = (categoria, puntaje)
+            self._firma_wal, self._firma_csv = _firma(self.ruta_wal), _firma(self.path_csv)
+
+        vocab.update(cambios)
+        return cambios
+
+    def sincronizado(self):
+        """
+        Marca el vocabulario recién cargado (cargar_vocabulario ya incluye el
+        WAL) como al día, para que actualizar() sólo lea lo que venga después.
+        """
+        with self._bloqueo(exclusivo=False):
+            _, self._offset = leer_wal(self.path_csv)
+            self._firma_wal, self._firma_csv = _firma(self.ruta_wal), _firma(self.path_csv)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Almacén del vocabulario (WAL + compactación).")
+    sub = parser.add_subparsers(dest="comando", required=True)
+    for nombre, ayuda in (("estado", "Filas pendientes en el WAL"),
+                          ("compactar", "Incorpora el WAL al CSV")):
+        p = sub.add_parser(nombre, help=ayuda)
+        p.add_argument("csv", nargs="?", default="vocabulario_sentimiento.csv")
+    args = parser.parse_args()
+
+    if not os.path.isfile(args.csv):
+        print(f"[ERROR] No se encontró {args.csv}")
+        sys.exit(1)
+
+    almacen = AlmacenLexico(args.csv)
+    if args.comando == "estado":
+        filas, _ = leer_wal(args.csv)
+        print(f"{len(filas)} filas en {almacen.ruta_wal} "
+              f"({len({p for p, _, _ in filas})} palabras distintas)")
+    else:
+        n = almacen.compactar()
+        print(f"✅ {args.csv} compactado: {n} palabras, WAL vacío.")
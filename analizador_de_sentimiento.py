@@ -1,9 +1,10 @@
-from typing import List, Dict
+from typing import List, Dict, Union
+from flujo_tokens import FlujoTokens
 
-def analizar_sentimiento(tokens: List[str], lexicon_sentimientos: Dict[str, int]) -> Dict[str, object]:
+def analizar_sentimiento(tokens: Union[List[str], FlujoTokens], lexicon_sentimientos: Dict[str, int]) -> Dict[str, object]:
     """
-    Dada una lista de tokens normalizados y un lexicón de sentimientos (palabra->peso),
-    calcula:
+    Dada una lista de tokens normalizados (o un FlujoTokens, que se reduce con
+    NumPy) y un lexicón de sentimientos (palabra->peso), calcula:
       - puntaje_total (suma de peso por palabra encontrada en lexicón)
       - count_positivas, count_negativas
       - palabra_mas_positiva (máximo peso), peso
@@ -20,6 +21,9 @@ def analizar_sentimiento(tokens: List[str], lexicon_sentimientos: Dict[str, int]
         "tokens_no_lexico": List[str]
       }
     """
+    if isinstance(tokens, FlujoTokens):
+        return tokens.analizar_sentimiento(lexicon_sentimientos)
+
     puntaje_total       = 0
     count_positivas     = 0
     count_negativas     = 0
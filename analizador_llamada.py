@@ -0,0 +1,116 @@
+from typing import Dict, Iterable, List, Mapping, Optional, Tuple
+
+class AnalizadorLlamada:
+    """
+    Analizador incremental de una llamada: consume tripletas (token, categoria, puntaje)
+    una sola vez y actualiza a la vez el análisis de sentimiento y la verificación
+    de protocolo, sin materializar listas de tokens.
+
+    Los reportes son idénticos a los de analizar_sentimiento (sobre los tokens en el
+    orden en que se alimentaron) y verificar_protocolo (sobre los tokens del agente).
+
+    Uso:
+      analizador = AnalizadorLlamada(lexicon)
+      analizador.feed_muchos(iterar_tokens(texto_agente, vocab), hablante="agente")
+      analizador.feed_muchos(iterar_tokens(texto_cliente, vocab), hablante="cliente")
+      analizador.reporte_sentimiento(); analizador.reporte_protocolo()
+
+    Con guardar_no_lexico=False no se acumula la lista de tokens fuera del
+    lexicón (sólo su cantidad, en count_no_lexico) y "tokens_no_lexico" sale
+    vacía: la memoria no crece con el largo de la llamada.
+    """
+
+    def __init__(self, lexicon_sentimientos: Mapping[str, int], guardar_no_lexico: bool = True):
+        self.lexicon = lexicon_sentimientos
+        self.guardar_no_lexico = guardar_no_lexico
+
+        # Sentimiento (mismos acumuladores que analizar_sentimiento)
+        self.puntaje_total   = 0
+        self.count_positivas = 0
+        self.count_negativas = 0
+        self.max_pos_word: Optional[str] = None
+        self.max_pos_weight  = 0
+        self.max_neg_word: Optional[str] = None
+        self.max_neg_weight  = 0
+        self.tokens_no_lexico: List[str] = []
+        self.count_no_lexico = 0
+
+        # Protocolo (sólo tokens del agente)
+        self.saludo_ok         = False
+        self.identificacion_ok = False
+        self.despedida_ok      = False
+        self.palabras_rudas: List[str] = []
+
+    def feed(self, token: str, categoria: str, puntaje: int, hablante: str = "agente"):
+        """
+        Procesa un token. 'puntaje' se acepta para mantener la forma de la tripleta
+        del tokenizador; el sentimiento se calcula con el lexicón, igual que
+        analizar_sentimiento.
+        """
+        peso = self.lexicon.get(token)
+        if peso is None:
+            self.count_no_lexico += 1
+            if self.guardar_no_lexico:
+                self.tokens_no_lexico.append(token)
+        else:
+            self.puntaje_total += peso
+            if peso > 0:
+                self.count_positivas += 1
+                if peso > self.max_pos_weight:
+                    self.max_pos_weight = peso
+                    self.max_pos_word   = token
+            elif peso < 0:
+                self.count_negativas += 1
+                if (self.max_neg_weight == 0) or (peso < self.max_neg_weight):
+                    self.max_neg_weight = peso
+                    self.max_neg_word   = token
+
+        if hablante != "agente":
+            return
+        if categoria == "saludo":
+            self.saludo_ok = True
+        elif categoria == "identificacion":
+            self.identificacion_ok = True
+        elif categoria == "palabra_ruda":
+            self.palabras_rudas.append(token)
+        elif categoria == "despedida":
+            self.despedida_ok = True
+
+    def feed_muchos(self, tokens_info: Iterable[Tuple[str,str,int]], hablante: str = "agente"):
+        """
+        Consume un iterable (por ejemplo, el generador iterar_tokens) de tripletas.
+        """
+        for token, categoria, puntaje in tokens_info:
+            self.feed(token, categoria, puntaje, hablante)
+
+    def reporte_sentimiento(self) -> Dict[str, object]:
+        """
+        Mismo formato que analizar_sentimiento.
+        """
+        if self.puntaje_total > 0:
+            sentimiento_general = f"Positivo (+{self.puntaje_total})"
+        elif self.puntaje_total < 0:
+            sentimiento_general = f"Negativo ({self.puntaje_total})"
+        else:
+            sentimiento_general = "Neutral (0)"
+
+        return {
+            "sentimiento_general":   sentimiento_general,
+            "puntaje_total":         self.puntaje_total,
+            "count_positivas":       self.count_positivas,
+            "palabra_mas_positiva":  (self.max_pos_word, self.max_pos_weight) if self.max_pos_word else (None, 0),
+            "count_negativas":       self.count_negativas,
+            "palabra_mas_negativa":  (self.max_neg_word, self.max_neg_weight) if self.max_neg_word else (None, 0),
+            "tokens_no_lexico":      list(self.tokens_no_lexico)
+        }
+
+    def reporte_protocolo(self) -> Dict[str, object]:
+        """
+        Mismo formato que verificar_protocolo.
+        """
+        return {
+            "saludo":         {"ok": self.saludo_ok},
+            "identificacion": {"ok": self.identificacion_ok},
+            "rudas":          {"lista": list(self.palabras_rudas)},
+            "despedida":      {"ok": self.despedida_ok}
+        }
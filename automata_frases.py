@@ -0,0 +1,142 @@
+"""
+Detección de frases del protocolo con un autómata Aho-Corasick sobre tokens.
+
+Las entradas del vocabulario pueden ser frases de varias palabras
+("buenas tardes", "¿en qué le puedo ayudar?", "número de cliente"). Se
+normalizan con extraer_lexemas y se compilan en un autómata cuyo alfabeto son
+los tokens: una pasada por el texto del agente, en tiempo lineal sin importar
+cuántas frases haya, encuentra todas las apariciones (incluso superpuestas) con
+su turno y posición. Eso permite verificaciones por posición, como un saludo
+en el primer turno o una despedida en el último.
+
+Las frases sólo aportan su categoría al protocolo: el sentimiento se calcula
+por token, así que su puntaje en el vocabulario no se usa y se deja en 0.
+
+Uso:
+  automata = AutomataFrases.desde_vocabulario(vocab)
+  coincidencias = automata.buscar_en_turnos(["Hola, buenas tardes", "...", "Que tenga buen día"])
+"""
+
+from collections import deque
+from typing import Dict, Iterable, List, Mapping, NamedTuple, Tuple
+
+from utils import extraer_lexemas
+
+# Categorías que interesan al protocolo ("otros" no se compila)
+CATEGORIAS_PROTOCOLO = ("saludo", "identificacion", "palabra_ruda", "despedida")
+
+
+class Coincidencia(NamedTuple):
+    frase: str
+    categoria: str
+    turno: int
+    posicion: int  # índice del primer token de la frase dentro del turno
+
+
+class AutomataFrases:
+    """
+    Autómata Aho-Corasick cuyas transiciones son tokens normalizados.
+    """
+
+    def __init__(self, frases: Dict[str, str]):
+        """
+        'frases': { frase: categoria }. Cada frase se normaliza con extraer_lexemas.
+        """
+        self._siguiente: List[Dict[str, int]] = [{}]
+        self._falla: List[int] = [0]
+        # Por estado: frases que terminan ahí, como (frase, categoria, largo_en_tokens)
+        self._salida: List[List[Tuple[str, str, int]]] = [[]]
+
+        for frase, categoria in frases.items():
+            tokens = extraer_lexemas(frase)
+            if not tokens:
+                continue
+            estado = 0
+            for tok in tokens:
+                destino = self._siguiente[estado].get(tok)
+                if destino is None:
+                    destino = self._siguiente[estado][tok] = len(self._siguiente)
+                    self._siguiente.append({})
+                    self._falla.append(0)
+                    self._salida.append([])
+                estado = destino
+            self._salida[estado].append((" ".join(tokens), categoria, len(tokens)))
+
+        # Enlaces de falla por BFS; cada estado hereda las salidas de su enlace
+        cola = deque(self._siguiente[0].values())
+        while cola:
+            estado = cola.popleft()
+            for tok, destino in self._siguiente[estado].items():
+                cola.append(destino)
+                f = self._falla[estado]
+                while f and tok not in self._siguiente[f]:
+                    f = self._falla[f]
+                candidato = self._siguiente[f].get(tok, 0)
+                self._falla[destino] = candidato if candidato != destino else 0
+                self._salida[destino] = self._salida[destino] + self._salida[self._falla[destino]]
+
+    @classmethod
+    def desde_vocabulario(cls, vocab: Mapping[str, Tuple[str, int]],
+                          categorias: Iterable[str] = CATEGORIAS_PROTOCOLO) -> "AutomataFrases":
+        """
+        Compila las entradas del vocabulario (de una o varias palabras) cuya
+        categoría sea del protocolo. Acepta un dict o un LexicoCompilado.
+        """
+        categorias = set(categorias)
+        frases = {}
+        for palabra in vocab:
+            categoria = vocab[palabra][0]
+            if categoria in categorias:
+                frases[palabra] = categoria
+        return cls(frases)
+
+    def __len__(self) -> int:
+        return len(self._siguiente)
+
+    def buscar(self, tokens: List[str], turno: int = 0) -> List[Coincidencia]:
+        """
+        Todas las apariciones de frases en la secuencia de tokens normalizados.
+        """
+        siguiente, falla, salida = self._siguiente, self._falla, self._salida
+        coincidencias = []
+        estado = 0
+        for i, tok in enumerate(tokens):
+            while estado and tok not in siguiente[estado]:
+                estado = falla[estado]
+            estado = siguiente[estado].get(tok, 0)
+            for frase, categoria, largo in salida[estado]:
+                coincidencias.append(Coincidencia(frase, categoria, turno, i - largo + 1))
+        return coincidencias
+
+    def buscar_en_turnos(self, turnos: Iterable[str]) -> List[Coincidencia]:
+        """
+        Busca en cada turno por separado (una frase no se extiende entre turnos).
+        """
+        coincidencias = []
+        for i, texto in enumerate(turnos):
+            coincidencias.extend(self.buscar(extraer_lexemas(texto), i))
+        return coincidencias
+
+
+def completar_protocolo(reporte: dict, coincidencias: List[Coincidencia],
+                        turnos: int) -> dict:
+    """
+    Agrega al reporte de verificar_protocolo lo que aportan las frases:
+      - saludo / identificacion / despedida: "ok" también si aparece una frase
+        de esa categoría.
+      - saludo["primer_turno"]: hay un saludo en el primer turno del agente.
+      - despedida["ultimo_turno"]: hay una despedida en el último turno del agente.
+      - rudas: se suman las frases rudas de varias palabras.
+      - frases: las coincidencias, con turno y posición.
+    """
+    categorias = {c.categoria for c in coincidencias}
+    for categoria in ("saludo", "identificacion", "despedida"):
+        reporte[categoria]["ok"] = reporte[categoria]["ok"] or categoria in categorias
+    reporte["saludo"]["primer_turno"] = any(
+        c.categoria == "saludo" and c.turno == 0 for c in coincidencias)
+    reporte["despedida"]["ultimo_turno"] = any(
+        c.categoria == "despedida" and c.turno == turnos - 1 for c in coincidencias)
+    reporte["rudas"]["lista"] = reporte["rudas"]["lista"] + [
+        c.frase for c in coincidencias if c.categoria == "palabra_ruda" and " " in c.frase]
+    reporte["frases"] = [c._asdict() for c in coincidencias]
+    return reporte
@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""
+Benchmark y control del tiempo de arranque (imports) de los puntos de entrada.
+
+Corre cada escenario en un intérprete nuevo con "python -X importtime" y
+reporta el tiempo total de imports (mejor de --repeticiones), el tiempo de
+pared del proceso y los módulos más pesados. Falla (código 1) si:
+
+  - un escenario importa un módulo prohibido (p. ej. torch en "--help", o
+    difflib / numpy en el camino de sólo análisis), o
+  - con --baseline, el tiempo de imports de algún escenario empeoró más de
+    --tolerancia (y más de --margen-ms, para no marcar ruido de microsegundos).
+
+Uso:
+  python benchmarks/bench_arranque.py [--repeticiones 5] [--salida arranque.json]
+                                      [--baseline base.json] [--tolerancia 0.25]
+"""
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+from typing import Dict, List, Tuple
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+PESADOS = {"torch", "whisper", "pydub", "pyannote", "speechbrain"}
+
+# escenario -> (argumentos del intérprete, módulos que no debe importar)
+ESCENARIOS: Dict[str, Tuple[List[str], set]] = {
+    "import main":          (["-c", "import main"],
+                             PESADOS | {"numpy", "difflib", "csv", "json", "argparse"}),
+    "import tokenizacion":  (["-c", "import tokenizacion"],
+                             PESADOS | {"numpy", "difflib", "csv", "json", "argparse"}),
+    "llamadas --help":      (["llamadas.py", "--help"], PESADOS | {"numpy"}),
+    "analizar --help":      (["llamadas.py", "analizar", "--help"], PESADOS | {"numpy"}),
+    "transcribir --help":   (["llamadas.py", "transcribir", "--help"], PESADOS),
+}
+
+
+def parsear_importtime(salida: str) -> Dict[str, Tuple[int, int]]:
+    """
+    { módulo: (propio_us, acumulado_us) } a partir del stderr de -X importtime.
+    """
+    modulos = {}
+    for linea in salida.splitlines():
+        if not linea.startswith("import time:") or "self [us]" in linea:
+            continue
+        propio, acumulado, nombre = linea[len("import time:"):].split("|")
+        modulos[nombre.strip()] = (int(propio), int(acumulado))
+    return modulos
+
+
+def medir_escenario(argumentos: List[str], repeticiones: int) -> dict:
+    """
+    Mejor corrida (menor tiempo total de imports) de 'repeticiones'.
+    """
+    # Sin PYTHONDONTWRITEBYTECODE: la primera corrida deja los .pyc y las
+    # siguientes miden el arranque real (si no, se mediría la compilación)
+    entorno = {k: v for k, v in os.environ.items() if k != "PYTHONDONTWRITEBYTECODE"}
+    mejor = None
+    for _ in range(max(2, repeticiones)):
+        inicio = time.perf_counter()
+        proceso = subprocess.run([sys.executable, "-X", "importtime", *argumentos],
+                                 cwd=RAIZ, env=entorno, capture_output=True, text=True)
+        pared = time.perf_counter() - inicio
+        if proceso.returncode != 0:
+            raise RuntimeError(f"{' '.join(argumentos)} terminó con código {proceso.returncode}:\n"
+                               f"{proceso.stderr[-2000:]}")
+        modulos = parsear_importtime(proceso.stderr)
+        total = sum(propio for propio, _ in modulos.values())
+        if mejor is None or total < mejor["imports_us"]:
+            mejor = {"imports_us": total, "pared_ms": pared * 1000, "modulos": modulos}
+    return mejor
+
+
+def comparar(actual: dict, base: dict, tolerancia: float, margen_ms: float) -> bool:
+    ok = True
+    print(f"\n{'escenario':<24} {'base ms':>9} {'actual ms':>10} {'cambio':>9}")
+    for nombre, datos in actual["escenarios"].items():
+        previo = base.get("escenarios", {}).get(nombre)
+        actual_ms = datos["imports_us"] / 1000
+        if not previo:
+            print(f"{nombre:<24} {'-':>9} {actual_ms:>10.1f} {'nuevo':>9}")
+            continue
+        base_ms = previo["imports_us"] / 1000
+        cambio = actual_ms / base_ms - 1 if base_ms else 0.0
+        marca = ""
+        if cambio > tolerancia and actual_ms - base_ms > margen_ms:
+            marca = "  ⚠ REGRESIÓN"
+            ok = False
+        print(f"{nombre:<24} {base_ms:>9.1f} {actual_ms:>10.1f} {cambio:>+8.1%}{marca}")
+    return ok
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Tiempo de arranque de los puntos de entrada.")
+    parser.add_argument("--repeticiones", type=int, default=5)
+    parser.add_argument("--top", type=int, default=5, help="Módulos más pesados a mostrar")
+    parser.add_argument("--salida", default=None, help="Guardar resultados en JSON")
+    parser.add_argument("--baseline", default=None, help="JSON de una corrida anterior para comparar")
+    parser.add_argument("--tolerancia", type=float, default=0.25,
+                        help="Aumento relativo tolerado del tiempo de imports")
+    parser.add_argument("--margen-ms", type=float, default=3.0,
+                        help="Aumento absoluto tolerado (ms) antes de marcar regresión")
+    args = parser.parse_args()
+
+    resultados = {
+        "entorno": {"python": platform.python_version(), "plataforma": platform.platform()},
+        "escenarios": {},
+    }
+    ok = True
+    print(f"{'escenario':<24} {'imports ms':>10} {'pared ms':>9}  más pesados (acumulado)")
+    for nombre, (argumentos, prohibidos) in ESCENARIOS.items():
+        datos = medir_escenario(argumentos, args.repeticiones)
+        modulos = datos.pop("modulos")
+        # Sólo los de primer nivel ("a.b" cuenta como "a")
+        importados = {m.split(".")[0] for m in modulos}
+        datos["prohibidos"] = sorted(importados & prohibidos)
+        pesados = sorted(modulos.items(), key=lambda m: m[1][1], reverse=True)[:args.top]
+        datos["mas_pesados"] = {m: acumulado for m, (_, acumulado) in pesados}
+        resultados["escenarios"][nombre] = datos
+
+        resumen = ", ".join(f"{m} {us / 1000:.1f}" for m, us in datos["mas_pesados"].items())
+        print(f"{nombre:<24} {datos['imports_us'] / 1000:>10.1f} {datos['pared_ms']:>9.1f}  {resumen}")
+        if datos["prohibidos"]:
+            print(f"  ⚠ importa {', '.join(datos['prohibidos'])}")
+            ok = False
+
+    if args.salida:
+        with open(args.salida, "w", encoding="utf-8") as f:
+            json.dump(resultados, f, indent=2, ensure_ascii=False)
+        print(f"\n💾 Resultados guardados en '{args.salida}'.")
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            base = json.load(f)
+        ok = comparar(resultados, base, args.tolerancia, args.margen_ms) and ok
+
+    if not ok:
+        sys.exit(1)
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Benchmark de re-puntuación de un corpus: analizar_sentimiento por documento
+(con y sin volver a tokenizar) vs. puntuar_corpus (NumPy sobre ids planos + offsets).
+El speedup se reporta respecto del bucle de analizar_sentimiento.
+
+Verifica que ambos resultados sean idénticos antes de reportar tiempos (con los
+tokens lematizados como en main.py: una forma fuera del lexicón cuenta como su lema).
+
+Uso: python benchmarks/bench_corpus.py [--documentos 10000] [--palabras 300] [--oov 0.1]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from tokenizacion import cargar_vocabulario
+from analizador_de_sentimiento import analizar_sentimiento
+from puntaje_corpus import CorpusTokens, puntuar_corpus
+from lematizacion import buscar_lema
+from utils import extraer_lexemas
+from main import separar_hablantes, lexicon_desde_vocabulario
+from bench_pipeline import VOC_LEX_CSV, generar_llamadas
+
+
+def _cronometrar(funcion, repeticiones: int) -> float:
+    mejor = float("inf")
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        funcion()
+        mejor = min(mejor, time.perf_counter() - inicio)
+    return mejor
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--documentos", type=int, default=10000)
+    parser.add_argument("--palabras", type=int, default=300)
+    parser.add_argument("--oov", type=float, default=0.1)
+    parser.add_argument("--repeticiones", type=int, default=3)
+    args = parser.parse_args()
+
+    vocab_catalog = cargar_vocabulario(VOC_LEX_CSV)
+    lexicon = lexicon_desde_vocabulario(vocab_catalog)
+
+    print(f"Generando {args.documentos} transcripciones de ~{args.palabras} palabras...")
+    llamadas = generar_llamadas(list(vocab_catalog), args.documentos, args.palabras, args.oov)
+    documentos = []
+    for texto in llamadas:
+        agente, cliente = separar_hablantes(texto)
+        documentos.append(extraer_lexemas(agente) + extraer_lexemas(cliente))
+
+    inicio = time.perf_counter()
+    corpus = CorpusTokens.desde_tokens(documentos)
+    t_indexar = time.perf_counter() - inicio
+    tokens = len(corpus.ids)
+
+    def lematizar(tokens):
+        return [t if t in lexicon else (buscar_lema(t, lexicon) or t) for t in tokens]
+
+    documentos = [lematizar(d) for d in documentos]
+    esperado = [analizar_sentimiento(d, lexicon) for d in documentos]
+    if puntuar_corpus(corpus, lexicon) != esperado:
+        print("[ERROR] puntuar_corpus difiere de analizar_sentimiento")
+        sys.exit(1)
+
+    def retokenizar_y_puntuar():
+        # Lo que cuesta hoy re-puntuar: volver a tokenizar cada transcripción
+        for texto in llamadas:
+            agente, cliente = separar_hablantes(texto)
+            analizar_sentimiento(lematizar(extraer_lexemas(agente) + extraer_lexemas(cliente)), lexicon)
+
+    t_completo = _cronometrar(retokenizar_y_puntuar, args.repeticiones)
+    t_bucle = _cronometrar(lambda: [analizar_sentimiento(d, lexicon) for d in documentos],
+                           args.repeticiones)
+    t_vector = _cronometrar(lambda: puntuar_corpus(corpus, lexicon), args.repeticiones)
+    t_sin_listas = _cronometrar(lambda: puntuar_corpus(corpus, lexicon, incluir_no_lexico=False),
+                                args.repeticiones)
+
+    print(f"\n{tokens:,} tokens, {len(corpus.palabras):,} distintos "
+          f"(indexado una vez: {t_indexar:.2f} s)")
+    print(f"{'variante':<32}{'s':>10}{'tokens/s':>16}{'speedup':>10}")
+    for nombre, t in (("retokenizar + analizar", t_completo),
+                      ("analizar_sentimiento (bucle)", t_bucle),
+                      ("puntuar_corpus", t_vector),
+                      ("puntuar_corpus sin no_lexico", t_sin_listas)):
+        print(f"{nombre:<32}{t:>10.3f}{tokens / t:>16,.0f}{t_bucle / t:>9.1f}x")
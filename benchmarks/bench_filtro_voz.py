@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+Benchmark del pre-filtro de voz (filtro_voz.py) sobre llamada.wav.
+
+Los segmentos salen de --segmentos (JSON [[start_s, end_s, speaker], ...], el
+mismo formato que segmentos.json de la caché de diarización) o, si no se pasa,
+se simula una diarización fragmentada: turnos de duración aleatoria entre
+--min-s y --max-s, con el hablante que cambia cada tanto.
+
+Reporta el costo del filtro, los segundos de audio que no llegan a Whisper y
+el speedup estimado (ventanas de 30 s). Mide además cuánto del audio completo
+no tiene voz: es la cota de lo que se ahorraría quitando el silencio antes de
+pyannote (ver filtro_voz.py). Con --modelo transcribe ambos conjuntos de
+segmentos con Whisper y reporta el speedup medido.
+
+Uso: python benchmarks/bench_filtro_voz.py [--wav llamada.wav] [--segmentos segmentos.json]
+                                           [--agrupar] [--modelo tiny]
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import time
+import wave
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from filtro_voz import ParametrosFiltro, energia_por_tramos, filtrar_segmentos
+from transcripcion_paralela import SAMPLE_RATE
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def leer_wav(ruta: str) -> np.ndarray:
+    """
+    WAV PCM 16 bits -> float32 mono a 16 kHz (sin pydub ni ffmpeg).
+    """
+    with wave.open(ruta, "rb") as w:
+        canales, sr, ancho = w.getnchannels(), w.getframerate(), w.getsampwidth()
+        datos = w.readframes(w.getnframes())
+    if ancho != 2:
+        raise ValueError("Sólo se soporta WAV PCM de 16 bits")
+    muestras = np.frombuffer(datos, dtype="<i2").astype(np.float32) / 32768.0
+    if canales > 1:
+        muestras = muestras.reshape(-1, canales).mean(axis=1)
+    if sr != SAMPLE_RATE:
+        n = int(round(len(muestras) * SAMPLE_RATE / sr))
+        muestras = np.interp(np.arange(n) * (sr / SAMPLE_RATE), np.arange(len(muestras)),
+                             muestras).astype(np.float32)
+    return muestras
+
+
+def simular_diarizacion(duracion_s: float, min_s: float, max_s: float, semilla: int):
+    rng = random.Random(semilla)
+    segmentos, inicio, hablante = [], 0.0, "SPEAKER_00"
+    while inicio < duracion_s:
+        fin = min(duracion_s, inicio + rng.uniform(min_s, max_s))
+        segmentos.append((round(inicio, 3), round(fin, 3), hablante))
+        if rng.random() < 0.4:
+            hablante = "SPEAKER_01" if hablante == "SPEAKER_00" else "SPEAKER_00"
+        inicio = fin
+    return segmentos
+
+
+def transcribir(muestras, segmentos, modelo) -> float:
+    inicio = time.perf_counter()
+    for a, b, _ in segmentos:
+        modelo.transcribe(muestras[int(a * SAMPLE_RATE):int(b * SAMPLE_RATE)], language="es")
+    return time.perf_counter() - inicio
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--wav", default=os.path.join(RAIZ, "llamada.wav"))
+    parser.add_argument("--segmentos", default=None, help="JSON con los segmentos diarizados")
+    parser.add_argument("--min-s", type=float, default=0.2)
+    parser.add_argument("--max-s", type=float, default=4.0)
+    parser.add_argument("--semilla", type=int, default=1234)
+    parser.add_argument("--agrupar", action="store_true",
+                        help="Estimar el speedup para transcripción por paquetes de 30 s")
+    parser.add_argument("--umbral-db", type=float, default=None)
+    parser.add_argument("--repeticiones", type=int, default=20)
+    parser.add_argument("--modelo", default=None, help="Modelo Whisper para medir el speedup real")
+    args = parser.parse_args()
+
+    muestras = leer_wav(args.wav)
+    duracion = len(muestras) / SAMPLE_RATE
+    if args.segmentos:
+        with open(args.segmentos, encoding="utf-8") as f:
+            segmentos = [tuple(s) for s in json.load(f)]
+    else:
+        segmentos = simular_diarizacion(duracion, args.min_s, args.max_s, args.semilla)
+    print(f"{args.wav}: {duracion:.1f} s de audio, {len(segmentos)} segmentos")
+
+    parametros = ParametrosFiltro(umbral_db=args.umbral_db)
+    mejor = float("inf")
+    for _ in range(args.repeticiones):
+        inicio = time.perf_counter()
+        filtrados, reporte = filtrar_segmentos(muestras, segmentos, parametros, agrupar=args.agrupar)
+        mejor = min(mejor, time.perf_counter() - inicio)
+
+    print(f"Filtro: {mejor * 1000:.2f} ms ({mejor / duracion * 60 * 1000:.2f} ms por minuto de audio)")
+    print(reporte.resumen())
+
+    energias = energia_por_tramos(muestras, parametros.tramo_s)
+    sin_voz_s = float((energias < reporte.umbral_db).sum()) * parametros.tramo_s
+    print(f"Audio sin voz: {sin_voz_s:.1f} de {duracion:.1f} s ({100 * sin_voz_s / duracion:.0f}%): "
+          f"cota del ahorro de pyannote filtrando antes de diarizar")
+
+    if args.modelo:
+        import whisper
+
+        modelo = whisper.load_model(args.modelo, device="cpu")
+        t_sin = transcribir(muestras, segmentos, modelo)
+        t_con = transcribir(muestras, filtrados, modelo)
+        print(f"Whisper '{args.modelo}': {t_sin:.1f} s sin filtro, {t_con:.1f} s con filtro "
+              f"(speedup medido {t_sin / t_con:.2f}x)")
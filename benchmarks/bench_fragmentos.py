@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Benchmark de preparación de fragmentos de audio para Whisper sobre llamada.wav.
+
+Compara, por segmento:
+  1. archivo: AudioSegment -> WAV temporal -> whisper.audio.load_audio (ffmpeg)
+  2. memoria: vista (slice) de NumPy sobre un único buffer decodificado
+
+Por defecto mide sólo la preparación del audio (lo que cambia entre ambos
+caminos). Con --modelo se incluye además la transcripción completa.
+
+Uso: python benchmarks/bench_fragmentos.py [--duracion 3.0] [--modelo tiny]
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import whisper
+from pydub import AudioSegment
+
+from transcripcion import SAMPLE_RATE_WHISPER, audio_a_numpy, transcribir_fragmento_whisper
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def segmentos_fijos(duracion_total_s: float, duracion_s: float):
+    inicio = 0.0
+    while inicio < duracion_total_s:
+        yield inicio, min(inicio + duracion_s, duracion_total_s)
+        inicio += duracion_s
+
+
+def preparar_por_archivo(audio: AudioSegment, inicio_s: float, fin_s: float):
+    fragmento = audio[int(inicio_s * 1000):int(fin_s * 1000)]
+    with tempfile.NamedTemporaryFile(suffix=".wav", delete=False) as tmp:
+        ruta_temp = tmp.name
+        fragmento.export(ruta_temp, format="wav")
+    try:
+        return whisper.audio.load_audio(ruta_temp)
+    finally:
+        os.remove(ruta_temp)
+
+
+def preparar_en_memoria(muestras, inicio_s: float, fin_s: float):
+    return muestras[int(inicio_s * SAMPLE_RATE_WHISPER):int(fin_s * SAMPLE_RATE_WHISPER)]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--wav", default=os.path.join(RAIZ, "llamada.wav"))
+    parser.add_argument("--duracion", type=float, default=3.0, help="Duración de cada segmento (s)")
+    parser.add_argument("--modelo", default=None, help="Modelo Whisper para incluir la transcripción")
+    args = parser.parse_args()
+
+    audio = AudioSegment.from_wav(args.wav)
+    duracion_total = len(audio) / 1000
+    segmentos = list(segmentos_fijos(duracion_total, args.duracion))
+    modelo = whisper.load_model(args.modelo, device="cpu") if args.modelo else None
+    print(f"{args.wav}: {duracion_total:.1f} s de audio, {len(segmentos)} segmentos de {args.duracion} s")
+
+    # Camino por archivo temporal (el original)
+    inicio = time.perf_counter()
+    for a, b in segmentos:
+        if modelo:
+            transcribir_fragmento_whisper(audio[int(a * 1000):int(b * 1000)], modelo)
+        else:
+            preparar_por_archivo(audio, a, b)
+    t_archivo = time.perf_counter() - inicio
+
+    # Camino en memoria: una decodificación + slices sin copia
+    inicio = time.perf_counter()
+    muestras = audio_a_numpy(audio)
+    t_decodificacion = time.perf_counter() - inicio
+    for a, b in segmentos:
+        fragmento = preparar_en_memoria(muestras, a, b)
+        if modelo:
+            transcribir_fragmento_whisper(fragmento, modelo)
+    t_memoria = time.perf_counter() - inicio
+
+    n = len(segmentos)
+    print(f"archivo: {t_archivo:8.3f} s  {n / t_archivo:10.1f} segmentos/s")
+    print(f"memoria: {t_memoria:8.3f} s  {n / t_memoria:10.1f} segmentos/s "
+          f"(decodificación única: {t_decodificacion:.3f} s)")
+    print(f"Aceleración: x{t_archivo / t_memoria:.1f}")
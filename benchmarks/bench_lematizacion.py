@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Benchmark de la lematización (lematizacion.py) sobre las transcripciones incluidas.
+
+Reporta, sin y con lematización:
+  - la tasa de aciertos en el vocabulario (tokens resueltos sin sugerencias),
+  - el costo de buscar_lema por token (caché fría y caliente),
+  - el tiempo de tokenizar_texto, que incluye la búsqueda de sugerencias de
+    los tokens que siguen sin resolverse (con un índice nuevo por archivo,
+    como la primera transcripción de una corrida de main.py).
+
+Uso: python benchmarks/bench_lematizacion.py [archivos...] [--repeticiones 20]
+"""
+
+import argparse
+import glob
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from lematizacion import buscar_lema, candidatos
+from main import separar_hablantes
+from tokenizacion import cargar_vocabulario, tokenizar_texto
+from utils import extraer_lexemas
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+VOC_LEX_CSV = os.path.join(RAIZ, "vocabulario_sentimiento.csv")
+
+
+def leer_textos(rutas):
+    textos = []
+    for ruta in rutas:
+        with open(ruta, encoding="utf-8") as f:
+            textos.append(" ".join(separar_hablantes(f.read())))
+    return textos
+
+
+def _cronometrar(funcion, repeticiones: int) -> float:
+    mejor = float("inf")
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        funcion()
+        mejor = min(mejor, time.perf_counter() - inicio)
+    return mejor
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Tasa de aciertos y costo de la lematización.")
+    parser.add_argument("archivos", nargs="*",
+                        default=sorted(glob.glob(os.path.join(RAIZ, "transcripcion*.txt"))))
+    parser.add_argument("--repeticiones", type=int, default=20)
+    parser.add_argument("--mostrar", type=int, default=15,
+                        help="Cantidad de formas lematizadas a listar")
+    args = parser.parse_args()
+
+    vocab = cargar_vocabulario(VOC_LEX_CSV)
+    textos = leer_textos(args.archivos)
+    tokens = [tok for texto in textos for tok in extraer_lexemas(texto)]
+    desconocidos = [tok for tok in tokens if tok not in vocab]
+    distintos = sorted(set(desconocidos))
+    print(f"{len(args.archivos)} transcripciones, {len(tokens)} tokens, "
+          f"{len(desconocidos)} fuera del vocabulario ({len(distintos)} distintos)")
+
+    # Tasa de aciertos
+    lemas = {tok: buscar_lema(tok, vocab) for tok in distintos}
+    resueltos = sum(1 for tok in desconocidos if lemas[tok])
+    antes = (len(tokens) - len(desconocidos)) / len(tokens)
+    despues = (len(tokens) - len(desconocidos) + resueltos) / len(tokens)
+    print(f"\nAciertos en el vocabulario: {antes:.1%} → {despues:.1%} "
+          f"({resueltos} tokens lematizados, {len(desconocidos) - resueltos} siguen a sugerencias)")
+    ejemplos = [f"{tok}→{lema}" for tok, lema in lemas.items() if lema][:args.mostrar]
+    print(f"  {', '.join(ejemplos)}")
+
+    # Costo por token: caché fría (candidatos se calcula) y caliente (memo)
+    def consultar():
+        for tok in desconocidos:
+            buscar_lema(tok, vocab)
+
+    candidatos.cache_clear()
+    inicio = time.perf_counter()
+    consultar()
+    t_frio = time.perf_counter() - inicio
+    t_caliente = _cronometrar(consultar, args.repeticiones)
+    print(f"\nbuscar_lema: {t_frio / len(desconocidos) * 1e6:.2f} µs/token en frío, "
+          f"{t_caliente / len(desconocidos) * 1e6:.2f} µs/token con la caché "
+          f"({candidatos.cache_info().currsize} formas memorizadas)")
+
+    # Tokenización completa (incluye las sugerencias de los no resueltos)
+    for lematizar in (False, True):
+        t = _cronometrar(lambda: [tokenizar_texto(texto, vocab, lematizar=lematizar)
+                                  for texto in textos], args.repeticiones)
+        sugeridos = sum(len(tokenizar_texto(texto, vocab, lematizar=lematizar)[1]) for texto in textos)
+        print(f"tokenizar_texto {'con' if lematizar else 'sin'} lematización: "
+              f"{t * 1000:7.2f} ms ({sugeridos} búsquedas de sugerencias)")
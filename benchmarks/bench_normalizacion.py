@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Benchmark de tokenización + normalización sobre un corpus sintético.
+
+Compara tres variantes que producen los mismos lexemas:
+  1. original:  re.findall + limpiar_palabra por token
+  2. cache:     re.findall + limpiar_palabra_cache (LRU)
+  3. fusionada: extraer_lexemas (una sola pasada)
+
+Uso: python benchmarks/bench_normalizacion.py [cantidad_palabras]
+"""
+
+import os
+import random
+import re
+import sys
+import time
+from functools import lru_cache
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from tokenizacion import cargar_vocabulario
+from utils import limpiar_palabra, extraer_lexemas
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+VOC_LEX_CSV = os.path.join(RAIZ, "vocabulario_sentimiento.csv")
+PATRON_TOKEN = r"[A-Za-zÑñÁÉÍÓÚáéíóú0-9]+"
+MAX_CACHE_NORMALIZACION = 65536  # palabras distintas recordadas por la variante "cache"
+
+# Variante 2: limpiar_palabra con sus resultados memorizados en una caché LRU
+# acotada (las palabras frecuentes se normalizan una vez)
+limpiar_palabra_cache = lru_cache(maxsize=MAX_CACHE_NORMALIZACION)(limpiar_palabra)
+
+# Palabras de función frecuentes, con mayúsculas/tildes/puntuación como en Whisper
+FRECUENTES = ["el", "de", "su", "la", "que", "en", "y", "no", "es", "por",
+              "Sí,", "Está", "qué", "¿Cómo", "Señor.", "número", "También"]
+
+
+def generar_corpus(cantidad: int, semilla: int = 42) -> str:
+    """
+    Genera un texto de 'cantidad' palabras mezclando palabras de función
+    frecuentes, palabras del vocabulario y algunos números.
+    """
+    rnd = random.Random(semilla)
+    vocab = list(cargar_vocabulario(VOC_LEX_CSV).keys())
+    palabras = []
+    for _ in range(cantidad):
+        r = rnd.random()
+        if r < 0.5:
+            palabras.append(rnd.choice(FRECUENTES))
+        elif r < 0.97:
+            palabra = rnd.choice(vocab)
+            palabras.append(palabra.capitalize() if rnd.random() < 0.1 else palabra)
+        else:
+            palabras.append(str(rnd.randint(0, 99999)))
+    return " ".join(palabras)
+
+
+def tokenizar_original(texto: str) -> list:
+    lexemas = []
+    for tok in re.findall(PATRON_TOKEN, texto):
+        if tok.isdigit():
+            continue
+        limpio = limpiar_palabra(tok)
+        if limpio:
+            lexemas.append(limpio)
+    return lexemas
+
+
+def tokenizar_cache(texto: str) -> list:
+    lexemas = []
+    for tok in re.findall(PATRON_TOKEN, texto):
+        if tok.isdigit():
+            continue
+        limpio = limpiar_palabra_cache(tok)
+        if limpio:
+            lexemas.append(limpio)
+    return lexemas
+
+
+def medir(nombre: str, funcion, texto: str, referencia=None):
+    inicio = time.perf_counter()
+    lexemas = funcion(texto)
+    duracion = time.perf_counter() - inicio
+    if referencia is not None and lexemas != referencia:
+        print(f"[ERROR] '{nombre}' no coincide con la versión original")
+        sys.exit(1)
+    print(f"{nombre:<10} {len(lexemas):>9} tokens  {duracion:8.3f} s  "
+          f"{len(lexemas) / duracion:>12,.0f} tokens/s")
+    return lexemas, duracion
+
+
+if __name__ == "__main__":
+    cantidad = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    print(f"Generando corpus sintético de {cantidad:,} palabras...")
+    texto = generar_corpus(cantidad)
+
+    referencia, t_orig = medir("original", tokenizar_original, texto)
+    _, t_cache = medir("cache", tokenizar_cache, texto, referencia)
+    _, t_fus = medir("fusionada", extraer_lexemas, texto, referencia)
+
+    print(f"\nAceleración cache:     x{t_orig / t_cache:.1f}")
+    print(f"Aceleración fusionada: x{t_orig / t_fus:.1f}")
+    print(f"Caché LRU: {limpiar_palabra_cache.cache_info()}")
@@ -0,0 +1,319 @@
+#!/usr/bin/env python3
+"""
+Benchmark y perfilado del pipeline de análisis de llamadas (parte de texto).
+
+Genera transcripciones sintéticas en español a partir de vocabulario_sentimiento.csv
+(tamaño y tasa de palabras fuera de vocabulario configurables) y mide cada etapa
+por separado:
+
+  limpiar_palabra, separar_hablantes, tokenizar_texto, analizar_sentimiento,
+  verificar_protocolo, analizador_fusionado (AnalizadorLlamada) y las mismas
+  reducciones sobre FlujoTokens (flujo_construir, flujo_sentimiento, flujo_protocolo)
+  y la búsqueda de frases del protocolo con Aho-Corasick (frases_protocolo), y
+  la línea de tiempo del sentimiento con ventanas móviles (linea_tiempo)
+
+Para cada etapa reporta throughput (tokens/s y llamadas/s), latencia por llamada
+(p50/p99) y memoria pico (tracemalloc, en una pasada aparte para no distorsionar
+los tiempos). Los resultados se guardan en JSON y pueden compararse con una
+línea base guardada.
+
+Uso:
+  python benchmarks/bench_pipeline.py [--llamadas 200] [--palabras 300] [--oov 0.1]
+                                      [--salida resultados.json]
+                                      [--baseline base.json] [--tolerancia 0.10]
+                                      [--perfil cprofile|tracemalloc] [--etapa NOMBRE]
+"""
+
+import argparse
+import cProfile
+import json
+import os
+import platform
+import pstats
+import random
+import re
+import sys
+import time
+import tracemalloc
+from typing import Callable, Dict, List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from tokenizacion import cargar_vocabulario, tokenizar_texto
+from sugerencias import IndiceSugerencias
+from analizador_de_sentimiento import analizar_sentimiento
+from protocolo import verificar_protocolo
+from analizador_llamada import AnalizadorLlamada
+from flujo_tokens import FlujoTokens, TablaTokens
+from utils import limpiar_palabra
+from main import separar_hablantes, separar_turnos, lexicon_desde_vocabulario
+from automata_frases import AutomataFrases
+from linea_tiempo import LineaTiempo
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+VOC_LEX_CSV = os.path.join(RAIZ, "vocabulario_sentimiento.csv")
+
+FUNCION = ["el", "la", "de", "que", "y", "en", "su", "por", "no", "es", "un", "con", "para"]
+SILABAS = ["ta", "re", "mi", "so", "lu", "ca", "pe", "do", "fi", "gra", "bra", "ción", "ñe", "za"]
+
+
+# ------------------------------
+# Corpus sintético
+# ------------------------------
+
+def _palabra_oov(rnd: random.Random, vocab: List[str]) -> str:
+    """
+    Palabra fuera de vocabulario: una palabra del vocabulario con un error de
+    tipeo (ejercita el índice de sugerencias) o una palabra inventada.
+    """
+    if rnd.random() < 0.5:
+        p = list(rnd.choice(vocab))
+        i = rnd.randrange(len(p))
+        p[i] = rnd.choice("aeiourstln")
+        return "".join(p)
+    return "".join(rnd.choice(SILABAS) for _ in range(rnd.randint(2, 4)))
+
+
+def generar_llamadas(vocab: List[str], llamadas: int, palabras: int,
+                     oov: float, semilla: int = 1234) -> List[str]:
+    """
+    Genera 'llamadas' transcripciones de ~'palabras' palabras, en turnos
+    "Agente:"/"Cliente:", con una fracción 'oov' de palabras desconocidas.
+    """
+    rnd = random.Random(semilla)
+    resultado = []
+    for _ in range(llamadas):
+        lineas = []
+        restantes = palabras
+        rol = "Agente"
+        while restantes > 0:
+            n = min(restantes, rnd.randint(5, 25))
+            turno = []
+            for _ in range(n):
+                r = rnd.random()
+                if r < oov:
+                    turno.append(_palabra_oov(rnd, vocab))
+                elif r < oov + 0.35:
+                    turno.append(rnd.choice(FUNCION))
+                else:
+                    turno.append(rnd.choice(vocab))
+            texto = " ".join(turno).capitalize() + rnd.choice([".", "?", ",", "!"])
+            lineas.append(f"{rol}: {texto}")
+            restantes -= n
+            rol = "Cliente" if rol == "Agente" else "Agente"
+        resultado.append("\n".join(lineas))
+    return resultado
+
+
+# ------------------------------
+# Etapas
+# ------------------------------
+
+def preparar_etapas(llamadas: List[str], vocab_catalog: dict) -> Dict[str, tuple]:
+    """
+    Devuelve { etapa: (funcion_por_llamada, entradas, tokens_por_entrada) }.
+    Las entradas de cada etapa se calculan de antemano con las etapas previas,
+    para medir cada una aislada.
+    """
+    lexicon = lexicon_desde_vocabulario(vocab_catalog)
+    indice = IndiceSugerencias(vocab_catalog.keys())
+
+    separadas = [separar_hablantes(t) for t in llamadas]
+    crudos = [re.findall(r"[A-Za-zÑñÁÉÍÓÚáéíóú0-9]+", t) for t in llamadas]
+    tokenizadas = [
+        (tokenizar_texto(ag, vocab_catalog, indice=indice)[0],
+         tokenizar_texto(cl, vocab_catalog, indice=indice)[0])
+        for ag, cl in separadas
+    ]
+    planos = [[tok for tok, _, _ in ag + cl] for ag, cl in tokenizadas]
+    n_tokens = [len(p) for p in planos]
+    tabla = TablaTokens()
+    automata = AutomataFrases.desde_vocabulario(vocab_catalog)
+    turnos = [separar_turnos(t)[0] for t in llamadas]
+
+    def etapa_limpiar(tokens):
+        return [limpiar_palabra(t) for t in tokens]
+
+    def etapa_tokenizar(textos):
+        ag, cl = textos
+        tokenizar_texto(ag, vocab_catalog, indice=indice)
+        tokenizar_texto(cl, vocab_catalog, indice=indice)
+
+    def etapa_protocolo(textos_y_tokens):
+        tokens_ag, texto_ag = textos_y_tokens
+        return verificar_protocolo(tokens_ag, texto_ag.lower())
+
+    def etapa_fusionada(tokens):
+        ag, cl = tokens
+        analizador = AnalizadorLlamada(lexicon)
+        analizador.feed_muchos(ag, "agente")
+        analizador.feed_muchos(cl, "cliente")
+        return analizador.reporte_sentimiento(), analizador.reporte_protocolo()
+
+    def etapa_flujo(tokens):
+        ag, cl = tokens
+        flujo = FlujoTokens(tabla)
+        flujo.extender(ag, "agente")
+        flujo.extender(cl, "cliente")
+        return flujo
+
+    def etapa_linea_tiempo(tokens):
+        ag, cl = tokens
+        linea = LineaTiempo(lexicon)
+        linea.agregar_turno(ag, "agente")
+        linea.agregar_turno(cl, "cliente")
+        return linea
+
+    flujos = [etapa_flujo(t) for t in tokenizadas]
+
+    return {
+        "limpiar_palabra":      (etapa_limpiar, crudos, [len(c) for c in crudos]),
+        "separar_hablantes":    (separar_hablantes, llamadas, n_tokens),
+        "tokenizar_texto":      (etapa_tokenizar, separadas, n_tokens),
+        "analizar_sentimiento": (lambda p: analizar_sentimiento(p, lexicon), planos, n_tokens),
+        "verificar_protocolo":  (etapa_protocolo,
+                                 [(ag, sep[0]) for (ag, _), sep in zip(tokenizadas, separadas)],
+                                 [len(ag) for ag, _ in tokenizadas]),
+        "analizador_fusionado": (etapa_fusionada, tokenizadas, n_tokens),
+        "flujo_construir":      (etapa_flujo, tokenizadas, n_tokens),
+        "flujo_sentimiento":    (lambda f: analizar_sentimiento(f, lexicon), flujos, n_tokens),
+        "flujo_protocolo":      (lambda f: verificar_protocolo(f, ""), flujos,
+                                 [len(ag) for ag, _ in tokenizadas]),
+        "frases_protocolo":     (automata.buscar_en_turnos, turnos,
+                                 [len(ag) for ag, _ in tokenizadas]),
+        "linea_tiempo":         (etapa_linea_tiempo, tokenizadas, n_tokens),
+    }
+
+
+def _percentil(ordenados: List[float], p: float) -> float:
+    if not ordenados:
+        return 0.0
+    k = min(len(ordenados) - 1, max(0, int(round(p / 100 * (len(ordenados) - 1)))))
+    return ordenados[k]
+
+
+def medir_etapa(funcion: Callable, entradas: list, tokens: List[int], repeticiones: int) -> dict:
+    """
+    Tiempo por llamada (mejor de 'repeticiones' para cada entrada), throughput
+    y memoria pico de la etapa.
+    """
+    latencias = [float("inf")] * len(entradas)
+    for _ in range(repeticiones):
+        for i, entrada in enumerate(entradas):
+            inicio = time.perf_counter()
+            funcion(entrada)
+            latencias[i] = min(latencias[i], time.perf_counter() - inicio)
+
+    tracemalloc.start()
+    for entrada in entradas:
+        funcion(entrada)
+    _, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    total = sum(latencias)
+    ordenadas = sorted(latencias)
+    return {
+        "llamadas":       len(entradas),
+        "tokens":         sum(tokens),
+        "total_s":        total,
+        "tokens_por_s":   sum(tokens) / total if total else 0.0,
+        "llamadas_por_s": len(entradas) / total if total else 0.0,
+        "p50_ms":         _percentil(ordenadas, 50) * 1e3,
+        "p99_ms":         _percentil(ordenadas, 99) * 1e3,
+        "memoria_pico_kb": pico / 1024,
+    }
+
+
+def perfilar_etapa(nombre: str, funcion: Callable, entradas: list, modo: str, top: int = 15):
+    print(f"\n=== Perfil ({modo}) de '{nombre}' ===")
+    if modo == "cprofile":
+        perfil = cProfile.Profile()
+        perfil.enable()
+        for entrada in entradas:
+            funcion(entrada)
+        perfil.disable()
+        pstats.Stats(perfil).sort_stats("cumulative").print_stats(top)
+    else:
+        tracemalloc.start(10)
+        for entrada in entradas:
+            funcion(entrada)
+        instantanea = tracemalloc.take_snapshot()
+        tracemalloc.stop()
+        for estadistica in instantanea.statistics("lineno")[:top]:
+            print(f"  {estadistica}")
+
+
+def comparar(actual: dict, base: dict, tolerancia: float) -> bool:
+    """
+    Imprime la comparación contra la línea base. Devuelve False si alguna etapa
+    empeoró su throughput más allá de 'tolerancia'.
+    """
+    ok = True
+    print(f"\n{'etapa':<22} {'base tok/s':>14} {'actual tok/s':>14} {'cambio':>9}")
+    for etapa, datos in actual["etapas"].items():
+        previo = base.get("etapas", {}).get(etapa)
+        if not previo or not previo["tokens_por_s"]:
+            print(f"{etapa:<22} {'-':>14} {datos['tokens_por_s']:>14,.0f} {'nuevo':>9}")
+            continue
+        cambio = datos["tokens_por_s"] / previo["tokens_por_s"] - 1
+        marca = ""
+        if cambio < -tolerancia:
+            marca = "  ⚠ REGRESIÓN"
+            ok = False
+        print(f"{etapa:<22} {previo['tokens_por_s']:>14,.0f} {datos['tokens_por_s']:>14,.0f} "
+              f"{cambio:>+8.1%}{marca}")
+    return ok
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark del pipeline de análisis de texto.")
+    parser.add_argument("--llamadas", type=int, default=200)
+    parser.add_argument("--palabras", type=int, default=300, help="Palabras por llamada")
+    parser.add_argument("--oov", type=float, default=0.1, help="Fracción de palabras fuera de vocabulario")
+    parser.add_argument("--repeticiones", type=int, default=3)
+    parser.add_argument("--semilla", type=int, default=1234)
+    parser.add_argument("--salida", default=None, help="Guardar resultados en JSON")
+    parser.add_argument("--baseline", default=None, help="JSON de una corrida anterior para comparar")
+    parser.add_argument("--tolerancia", type=float, default=0.10,
+                        help="Caída de throughput tolerada antes de marcar regresión")
+    parser.add_argument("--perfil", choices=["cprofile", "tracemalloc"], default=None)
+    parser.add_argument("--etapa", default=None, help="Medir/perfilar sólo esta etapa")
+    args = parser.parse_args()
+
+    vocab_catalog = cargar_vocabulario(VOC_LEX_CSV)
+    llamadas = generar_llamadas(list(vocab_catalog.keys()), args.llamadas, args.palabras,
+                                args.oov, args.semilla)
+    etapas = preparar_etapas(llamadas, vocab_catalog)
+    if args.etapa:
+        if args.etapa not in etapas:
+            print(f"[ERROR] Etapa desconocida: {args.etapa}. Opciones: {', '.join(etapas)}")
+            sys.exit(1)
+        etapas = {args.etapa: etapas[args.etapa]}
+
+    resultados = {
+        "parametros": {"llamadas": args.llamadas, "palabras": args.palabras,
+                       "oov": args.oov, "semilla": args.semilla,
+                       "vocabulario": len(vocab_catalog)},
+        "entorno": {"python": platform.python_version(), "plataforma": platform.platform()},
+        "etapas": {},
+    }
+
+    print(f"{'etapa':<22} {'tokens/s':>12} {'llamadas/s':>11} {'p50 ms':>8} {'p99 ms':>8} {'pico KB':>9}")
+    for nombre, (funcion, entradas, tokens) in etapas.items():
+        datos = medir_etapa(funcion, entradas, tokens, args.repeticiones)
+        resultados["etapas"][nombre] = datos
+        print(f"{nombre:<22} {datos['tokens_por_s']:>12,.0f} {datos['llamadas_por_s']:>11,.1f} "
+              f"{datos['p50_ms']:>8.3f} {datos['p99_ms']:>8.3f} {datos['memoria_pico_kb']:>9.1f}")
+        if args.perfil:
+            perfilar_etapa(nombre, funcion, entradas, args.perfil)
+
+    if args.salida:
+        with open(args.salida, "w", encoding="utf-8") as f:
+            json.dump(resultados, f, indent=2, ensure_ascii=False)
+        print(f"\n💾 Resultados guardados en '{args.salida}'.")
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            base = json.load(f)
+        if not comparar(resultados, base, args.tolerancia):
+            sys.exit(1)
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Prueba de carga para servidor_analisis.py.
+
+Abre varias conexiones, mantiene hasta --en-vuelo solicitudes pendientes por
+conexión con transcripciones sintéticas (ver bench_pipeline.generar_llamadas) y
+reporta solicitudes por segundo y latencias (p50/p95/p99/máx) vistas por el cliente.
+
+Uso:
+  python servidor_analisis.py --puerto 8766 &
+  python benchmarks/carga_analisis.py [--puerto 8766 | --unix /tmp/analisis.sock]
+                                      [--solicitudes 2000] [--conexiones 8] [--en-vuelo 4]
+                                      [--palabras 300] [--oov 0.05]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+from typing import List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from tokenizacion import cargar_vocabulario
+from bench_pipeline import VOC_LEX_CSV, generar_llamadas, _percentil
+
+
+async def _conexion(args, textos: List[str], siguiente, latencias: List[float], errores: List[str]):
+    if args.unix:
+        reader, writer = await asyncio.open_unix_connection(args.unix, limit=16 * 1024 * 1024)
+    else:
+        reader, writer = await asyncio.open_connection(args.host, args.puerto, limit=16 * 1024 * 1024)
+
+    enviadas = {}
+    cupo = asyncio.Semaphore(args.en_vuelo)
+    terminado = asyncio.Event()
+    pendientes = 0
+    envio_cerrado = False
+
+    async def leer():
+        nonlocal pendientes
+        while True:
+            linea = await reader.readline()
+            if not linea:
+                break
+            respuesta = json.loads(linea)
+            inicio = enviadas.pop(respuesta.get("id"), None)
+            if inicio is not None:
+                latencias.append(time.perf_counter() - inicio)
+            if "error" in respuesta:
+                errores.append(respuesta["error"])
+            pendientes -= 1
+            cupo.release()
+            if envio_cerrado and pendientes == 0:
+                break
+        terminado.set()
+
+    lector = asyncio.create_task(leer())
+    while True:
+        i = siguiente()
+        if i is None:
+            break
+        await cupo.acquire()
+        enviadas[i] = time.perf_counter()
+        pendientes += 1
+        solicitud = {"id": i, "texto": textos[i % len(textos)]}
+        writer.write((json.dumps(solicitud, ensure_ascii=False) + "\n").encode("utf-8"))
+        await writer.drain()
+    envio_cerrado = True
+    if pendientes:
+        await terminado.wait()
+    lector.cancel()
+    writer.close()
+
+
+async def correr(args):
+    vocab = list(cargar_vocabulario(VOC_LEX_CSV))
+    textos = generar_llamadas(vocab, min(args.solicitudes, 200), args.palabras, args.oov)
+
+    contador = iter(range(args.solicitudes))
+    siguiente = lambda: next(contador, None)
+    latencias: List[float] = []
+    errores: List[str] = []
+
+    inicio = time.perf_counter()
+    await asyncio.gather(*(_conexion(args, textos, siguiente, latencias, errores)
+                           for _ in range(args.conexiones)))
+    duracion = time.perf_counter() - inicio
+
+    ordenadas = sorted(latencias)
+    print(f"{len(latencias)} respuestas en {duracion:.2f} s "
+          f"({args.conexiones} conexiones x {args.en_vuelo} en vuelo), {len(errores)} errores")
+    print(f"  solicitudes/s: {len(latencias) / duracion:,.1f}")
+    for p in (50, 95, 99):
+        print(f"  p{p}: {_percentil(ordenadas, p) * 1000:.1f} ms")
+    if ordenadas:
+        print(f"  máx: {ordenadas[-1] * 1000:.1f} ms")
+    if errores:
+        print(f"  primer error: {errores[0]}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Prueba de carga del servidor de análisis.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--puerto", type=int, default=8766)
+    parser.add_argument("--unix", default=None)
+    parser.add_argument("--solicitudes", type=int, default=2000)
+    parser.add_argument("--conexiones", type=int, default=8)
+    parser.add_argument("--en-vuelo", type=int, default=4)
+    parser.add_argument("--palabras", type=int, default=300)
+    parser.add_argument("--oov", type=float, default=0.05)
+    asyncio.run(correr(parser.parse_args()))
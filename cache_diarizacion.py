@@ -0,0 +1,243 @@
+#!/usr/bin/env python3
+"""
+Caché en disco de diarización y transcripción por segmento.
+
+La clave es un hash SHA-256 del contenido del WAV más los identificadores de los
+modelos usados, así que reprocesar la misma grabación (por ejemplo, tras cambiar
+el vocabulario o después de un corte a mitad de la transcripción) no vuelve a
+correr pyannote y retoma Whisper desde el último segmento completado. Los
+segmentos se guardan bajo la clave del audio y el modelo de diarización, y los
+textos bajo una clave derivada que agrega el modelo Whisper: cambiar de Whisper
+reutiliza la diarización.
+
+Estructura:
+  <directorio>/<clave audio+pyannote>/segmentos.json        [[start_s, end_s, speaker], ...]
+  <directorio>/<clave derivada+whisper>/transcripcion.jsonl {"i": índice, "texto": ...} por línea
+  <directorio>/estadisticas.json           aciertos/fallos acumulados
+
+Uso:
+  python cache_diarizacion.py estadisticas [--dir .cache_diarizacion]
+  python cache_diarizacion.py limpiar [--max-mb 500] [--max-dias 30]
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import time
+from typing import Dict, List, Optional, Tuple
+
+DIRECTORIO_POR_DEFECTO = ".cache_diarizacion"
+MAX_BYTES_POR_DEFECTO = 500 * 10**6       # 500 MB
+MAX_EDAD_S_POR_DEFECTO = 30 * 86400.0     # 30 días sin usarse
+_ESTADISTICAS = "estadisticas.json"
+
+
+def hash_audio(ruta_wav: str, bloque: int = 1 << 20) -> str:
+    """
+    SHA-256 del contenido del archivo, leído por bloques.
+    """
+    h = hashlib.sha256()
+    with open(ruta_wav, "rb") as f:
+        while True:
+            datos = f.read(bloque)
+            if not datos:
+                break
+            h.update(datos)
+    return h.hexdigest()
+
+
+class CacheDiarizacion:
+    """
+    Caché de segmentos diarizados y textos por segmento, con desalojo por
+    tamaño total y/o antigüedad (se desalojan primero las entradas menos usadas).
+    Con max_bytes / max_edad_s en None no se aplica ese límite.
+    """
+
+    def __init__(self, directorio: str = DIRECTORIO_POR_DEFECTO,
+                 max_bytes: Optional[int] = MAX_BYTES_POR_DEFECTO,
+                 max_edad_s: Optional[float] = MAX_EDAD_S_POR_DEFECTO):
+        self.directorio = directorio
+        self.max_bytes = max_bytes
+        self.max_edad_s = max_edad_s
+        self.aciertos = {"segmentos": 0, "transcripciones": 0}
+        self.fallos = {"segmentos": 0, "transcripciones": 0}
+        # Conteos de la sesión ya sumados al acumulado en disco
+        self._guardado = {"aciertos": {}, "fallos": {}}
+        os.makedirs(directorio, exist_ok=True)
+
+    # --- claves ---
+
+    def clave(self, ruta_wav: str, *modelos: str) -> str:
+        """
+        Clave de una grabación: hash del audio + identificadores de modelos.
+        Ej: cache.clave("llamada.wav", "pyannote/speaker-diarization")
+        """
+        h = hashlib.sha256(hash_audio(ruta_wav).encode("ascii"))
+        for modelo in modelos:
+            h.update(b"\0" + modelo.encode("utf-8"))
+        return h.hexdigest()
+
+    def derivar(self, clave: str, *extras: str) -> str:
+        """
+        Clave derivada de otra sin volver a leer el audio (p. ej. para los
+        textos de un modelo Whisper, o de segmentos pre-filtrados con ciertos
+        parámetros).
+        """
+        h = hashlib.sha256(clave.encode("ascii"))
+        for extra in extras:
+            h.update(b"\0" + extra.encode("utf-8"))
+        return h.hexdigest()
+
+    def _entrada(self, clave: str) -> str:
+        return os.path.join(self.directorio, clave)
+
+    def _tocar(self, clave: str):
+        # La fecha de modificación de la entrada marca su último uso (para LRU)
+        os.utime(self._entrada(clave))
+
+    # --- segmentos diarizados ---
+
+    def obtener_segmentos(self, clave: str) -> Optional[List[Tuple[float, float, str]]]:
+        ruta = os.path.join(self._entrada(clave), "segmentos.json")
+        try:
+            with open(ruta, encoding="utf-8") as f:
+                segmentos = [tuple(s) for s in json.load(f)]
+        except (OSError, ValueError):
+            self.fallos["segmentos"] += 1
+            return None
+        self.aciertos["segmentos"] += 1
+        self._tocar(clave)
+        return segmentos
+
+    def guardar_segmentos(self, clave: str, segmentos: List[Tuple[float, float, str]]):
+        entrada = self._entrada(clave)
+        os.makedirs(entrada, exist_ok=True)
+        tmp = os.path.join(entrada, "segmentos.json.tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump([list(s) for s in segmentos], f)
+        os.replace(tmp, os.path.join(entrada, "segmentos.json"))
+
+    # --- transcripciones por segmento ---
+
+    def obtener_transcripciones(self, clave: str, total: Optional[int] = None) -> Dict[int, str]:
+        """
+        Textos ya transcritos { índice: texto }. Una línea incompleta (corte a mitad
+        de escritura) se ignora. Si se indica 'total', cuenta aciertos/fallos por segmento.
+        """
+        textos: Dict[int, str] = {}
+        ruta = os.path.join(self._entrada(clave), "transcripcion.jsonl")
+        if os.path.isfile(ruta):
+            with open(ruta, encoding="utf-8") as f:
+                for linea in f:
+                    try:
+                        registro = json.loads(linea)
+                        textos[registro["i"]] = registro["texto"]
+                    except (ValueError, KeyError):
+                        continue
+        if textos:
+            self._tocar(clave)
+        if total is not None:
+            self.aciertos["transcripciones"] += len(textos)
+            self.fallos["transcripciones"] += max(0, total - len(textos))
+        return textos
+
+    def guardar_transcripcion(self, clave: str, indice: int, texto: str):
+        entrada = self._entrada(clave)
+        os.makedirs(entrada, exist_ok=True)
+        ruta = os.path.join(entrada, "transcripcion.jsonl")
+        with open(ruta, "ab") as f:
+            # Si una corrida anterior se cortó a mitad de línea, se empieza una nueva
+            if f.tell() > 0:
+                with open(ruta, "rb") as lectura:
+                    lectura.seek(-1, os.SEEK_END)
+                    if lectura.read(1) != b"\n":
+                        f.write(b"\n")
+            registro = json.dumps({"i": indice, "texto": texto}, ensure_ascii=False) + "\n"
+            f.write(registro.encode("utf-8"))
+            f.flush()
+
+    # --- desalojo y estadísticas ---
+
+    def _entradas(self) -> List[Tuple[str, float, int]]:
+        """
+        [(clave, último_uso, bytes)] de todas las entradas.
+        """
+        entradas = []
+        for nombre in os.listdir(self.directorio):
+            ruta = os.path.join(self.directorio, nombre)
+            if not os.path.isdir(ruta):
+                continue
+            tam = sum(os.path.getsize(os.path.join(ruta, a)) for a in os.listdir(ruta))
+            entradas.append((nombre, os.path.getmtime(ruta), tam))
+        return entradas
+
+    def desalojar(self) -> int:
+        """
+        Elimina entradas más viejas que 'max_edad_s' y, si el total supera
+        'max_bytes', las menos usadas recientemente. Devuelve cuántas eliminó.
+        """
+        entradas = sorted(self._entradas(), key=lambda e: e[1])
+        ahora = time.time()
+        total = sum(e[2] for e in entradas)
+        eliminadas = 0
+        for clave, uso, tam in entradas:
+            vieja = self.max_edad_s is not None and ahora - uso > self.max_edad_s
+            excede = self.max_bytes is not None and total > self.max_bytes
+            if not (vieja or excede):
+                continue
+            shutil.rmtree(self._entrada(clave), ignore_errors=True)
+            total -= tam
+            eliminadas += 1
+        return eliminadas
+
+    def guardar_estadisticas(self):
+        """
+        Suma los aciertos/fallos de esta sesión a las estadísticas acumuladas.
+        """
+        acumuladas = self.estadisticas_acumuladas()
+        for tipo in ("aciertos", "fallos"):
+            for etapa, n in getattr(self, tipo).items():
+                delta = n - self._guardado[tipo].get(etapa, 0)
+                acumuladas[tipo][etapa] = acumuladas[tipo].get(etapa, 0) + delta
+                self._guardado[tipo][etapa] = n
+        with open(os.path.join(self.directorio, _ESTADISTICAS), "w", encoding="utf-8") as f:
+            json.dump(acumuladas, f)
+
+    def estadisticas_acumuladas(self) -> dict:
+        try:
+            with open(os.path.join(self.directorio, _ESTADISTICAS), encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {"aciertos": {}, "fallos": {}}
+
+    def reporte(self) -> str:
+        entradas = self._entradas()
+        lineas = [f"Caché: {self.directorio} ({len(entradas)} entradas, "
+                  f"{sum(e[2] for e in entradas) / 1e6:.2f} MB)"]
+        for titulo, datos in (("Sesión", {"aciertos": self.aciertos, "fallos": self.fallos}),
+                              ("Acumulado", self.estadisticas_acumuladas())):
+            for etapa in ("segmentos", "transcripciones"):
+                a = datos["aciertos"].get(etapa, 0)
+                f = datos["fallos"].get(etapa, 0)
+                tasa = f"{100 * a / (a + f):.0f}%" if a + f else "-"
+                lineas.append(f"  {titulo:<10} {etapa:<16} aciertos={a:<6} fallos={f:<6} tasa={tasa}")
+        return "\n".join(lineas)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Caché de diarización/transcripción.")
+    parser.add_argument("comando", choices=["estadisticas", "limpiar"])
+    parser.add_argument("--dir", default=DIRECTORIO_POR_DEFECTO)
+    parser.add_argument("--max-mb", type=float, default=MAX_BYTES_POR_DEFECTO / 1e6,
+                        help="Tamaño máximo total (MB)")
+    parser.add_argument("--max-dias", type=float, default=MAX_EDAD_S_POR_DEFECTO / 86400,
+                        help="Antigüedad máxima sin usarse (días)")
+    args = parser.parse_args()
+
+    cache = CacheDiarizacion(args.dir, max_bytes=int(args.max_mb * 1e6),
+                             max_edad_s=args.max_dias * 86400)
+    if args.comando == "limpiar":
+        print(f"🧹 {cache.desalojar()} entradas eliminadas.")
+    print(cache.reporte())
@@ -0,0 +1,190 @@
+"""
+Pre-filtro de voz por energía (VAD) para los segmentos diarizados.
+
+pyannote devuelve turnos que pueden empezar o terminar con silencio, fragmentos
+de menos de un segundo (respiraciones, ruidos) y turnos consecutivos del mismo
+hablante. Whisper cobra cada llamada como una ventana de 30 s y sobre silencio
+o ruido produce texto basura. Antes de transcribir, sobre las muestras ya
+decodificadas (float32, 16 kHz), este módulo:
+
+  1. Calcula la energía (dBFS) por tramos de 'tramo_s' de todo el audio, una vez.
+  2. Recorta el silencio al principio y al final de cada segmento (deja
+     'relleno_s' de margen alrededor de la voz).
+  3. Descarta los segmentos con menos de 'min_voz_s' de tramos con voz o que,
+     recortados, duran menos de 'min_duracion_s'.
+  4. Une turnos consecutivos del mismo hablante separados por menos de
+     'max_pausa_s' (sin pasar de la ventana de Whisper).
+
+El umbral de voz es fijo ('umbral_db') o adaptativo: 'margen_db' por encima del
+piso de ruido (percentil 10 de la energía de los tramos), nunca menos que
+UMBRAL_MINIMO_DB.
+
+El filtro corre después de la diarización, sobre sus segmentos: pyannote sigue
+procesando el audio completo y sólo se ahorra trabajo de Whisper. No se quita
+el silencio antes de pyannote porque:
+  - su modelo de segmentación ya detecta la voz (el silencio no produce
+    turnos), así que sólo se ahorraría la fracción de audio sin voz, que
+    benchmarks/bench_filtro_voz.py mide como cota;
+  - pegar los tramos con voz acerca turnos que estaban separados dentro de las
+    ventanas de segmentación y de embeddings, y empeora la detección de cambios
+    de hablante;
+  - los tiempos de los segmentos habría que remapearlos al audio original
+    (transcripción, línea de tiempo), y la caché de diarización pasaría a
+    depender de los parámetros del filtro.
+El speedup del reporte es una estimación por ventanas de 30 s (Whisper procesa
+cada llamada como una ventana completa), no un tiempo medido: para medirlo, ver
+benchmarks/bench_filtro_voz.py --modelo.
+
+Uso:
+  segmentos, reporte = filtrar_segmentos(muestras, segmentos)
+  print(reporte.resumen())
+"""
+
+import math
+from typing import List, NamedTuple, Optional, Tuple
+
+import numpy as np
+
+from transcripcion_paralela import SAMPLE_RATE, VENTANA_WHISPER_S, agrupar_segmentos
+
+UMBRAL_MINIMO_DB = -55.0
+
+Segmento = Tuple[float, float, str]
+
+
+class ParametrosFiltro(NamedTuple):
+    tramo_s: float = 0.02
+    umbral_db: Optional[float] = None  # None: adaptativo (piso de ruido + margen_db)
+    margen_db: float = 12.0
+    min_voz_s: float = 0.2
+    min_duracion_s: float = 0.4
+    relleno_s: float = 0.15
+    max_pausa_s: float = 0.6
+
+    def firma(self) -> str:
+        """
+        Identificador de los parámetros (para la clave de la caché de textos).
+        """
+        return "vad:" + ",".join(f"{v}" for v in self)
+
+
+class ReporteFiltro(NamedTuple):
+    segmentos_entrada: int
+    segmentos_salida: int
+    descartados: int
+    fusionados: int
+    audio_entrada_s: float
+    audio_salida_s: float
+    umbral_db: float
+    llamadas_antes: int    # trabajo de Whisper estimado en ventanas de 30 s
+    llamadas_despues: int
+
+    @property
+    def saltado_s(self) -> float:
+        return self.audio_entrada_s - self.audio_salida_s
+
+    @property
+    def speedup_estimado(self) -> float:
+        return self.llamadas_antes / self.llamadas_despues if self.llamadas_despues else float("inf")
+
+    def resumen(self) -> str:
+        return (f"{self.segmentos_entrada} → {self.segmentos_salida} segmentos "
+                f"({self.descartados} descartados, {self.fusionados} unidos); "
+                f"{self.saltado_s:.1f} de {self.audio_entrada_s:.1f} s de audio sin transcribir; "
+                f"ventanas de Whisper {self.llamadas_antes} → {self.llamadas_despues} "
+                f"(speedup estimado {self.speedup_estimado:.2f}x, umbral {self.umbral_db:.1f} dBFS)")
+
+
+def energia_por_tramos(muestras: np.ndarray, tramo_s: float = 0.02) -> np.ndarray:
+    """
+    Energía RMS en dBFS de cada tramo de 'tramo_s' (el último tramo incompleto se descarta).
+    """
+    largo = max(1, int(round(tramo_s * SAMPLE_RATE)))
+    n = len(muestras) // largo
+    if not n:
+        return np.empty(0, dtype=np.float32)
+    tramos = np.asarray(muestras[:n * largo], dtype=np.float32).reshape(n, largo)
+    potencia = np.einsum("ij,ij->i", tramos, tramos) / largo
+    return (10.0 * np.log10(potencia + 1e-12)).astype(np.float32)
+
+
+def umbral_adaptativo(energias_db: np.ndarray, margen_db: float = 12.0) -> float:
+    """
+    'margen_db' por encima del piso de ruido (percentil 10), con un mínimo absoluto.
+    """
+    if not len(energias_db):
+        return UMBRAL_MINIMO_DB
+    return max(UMBRAL_MINIMO_DB, float(np.percentile(energias_db, 10)) + margen_db)
+
+
+def _llamadas_whisper(segmentos: List[Segmento], agrupar: bool) -> int:
+    """
+    Ventanas de 30 s que procesa Whisper: una o más por segmento o, agrupando,
+    una por paquete (ver transcripcion_paralela.agrupar_segmentos).
+    """
+    if agrupar:
+        return len(agrupar_segmentos(segmentos))
+    return sum(max(1, math.ceil((fin - inicio) / VENTANA_WHISPER_S)) for inicio, fin, _ in segmentos)
+
+
+def filtrar_segmentos(
+    muestras: np.ndarray,
+    segmentos: List[Segmento],
+    parametros: ParametrosFiltro = ParametrosFiltro(),
+    agrupar: bool = False
+) -> Tuple[List[Segmento], ReporteFiltro]:
+    """
+    Recorta, descarta y une segmentos (start_s, end_s, speaker) según la
+    energía de 'muestras'. 'agrupar' sólo afecta la estimación del speedup
+    (si después se transcribe con paquetes de hasta 30 s).
+    Devuelve (segmentos_filtrados, reporte).
+    """
+    p = parametros
+    energias = energia_por_tramos(muestras, p.tramo_s)
+    umbral = p.umbral_db if p.umbral_db is not None else umbral_adaptativo(energias, p.margen_db)
+    voz = energias >= umbral
+    # Tramos con voz acumulados: la cantidad en [a, b) es acumulado[b] - acumulado[a]
+    acumulado = np.concatenate(([0], np.cumsum(voz)))
+    duracion_total = len(muestras) / SAMPLE_RATE
+    min_tramos_voz = max(1, int(round(p.min_voz_s / p.tramo_s)))
+
+    recortados: List[Segmento] = []
+    descartados = 0
+    for inicio, fin, hablante in segmentos:
+        a = max(0, int(inicio / p.tramo_s))
+        b = min(len(voz), int(math.ceil(fin / p.tramo_s)))
+        if b <= a or acumulado[b] - acumulado[a] < min_tramos_voz:
+            descartados += 1
+            continue
+        indices = np.flatnonzero(voz[a:b])
+        nuevo_inicio = max(inicio, (a + indices[0]) * p.tramo_s - p.relleno_s)
+        nuevo_fin = min(fin, (a + indices[-1] + 1) * p.tramo_s + p.relleno_s, duracion_total)
+        if nuevo_fin - nuevo_inicio < p.min_duracion_s:
+            descartados += 1
+            continue
+        recortados.append((round(nuevo_inicio, 3), round(nuevo_fin, 3), hablante))
+
+    unidos: List[Segmento] = []
+    fusionados = 0
+    for inicio, fin, hablante in recortados:
+        if unidos:
+            previo_inicio, previo_fin, previo_hablante = unidos[-1]
+            if (previo_hablante == hablante and inicio - previo_fin <= p.max_pausa_s
+                    and fin - previo_inicio <= VENTANA_WHISPER_S):
+                unidos[-1] = (previo_inicio, max(previo_fin, fin), hablante)
+                fusionados += 1
+                continue
+        unidos.append((inicio, fin, hablante))
+
+    reporte = ReporteFiltro(
+        segmentos_entrada=len(segmentos),
+        segmentos_salida=len(unidos),
+        descartados=descartados,
+        fusionados=fusionados,
+        audio_entrada_s=sum(fin - inicio for inicio, fin, _ in segmentos),
+        audio_salida_s=sum(fin - inicio for inicio, fin, _ in unidos),
+        umbral_db=umbral,
+        llamadas_antes=_llamadas_whisper(segmentos, agrupar),
+        llamadas_despues=_llamadas_whisper(unidos, agrupar),
+    )
+    return unidos, reporte
@@ -0,0 +1,318 @@
+"""
+Representación compacta de una secuencia de tokens tokenizados.
+
+En lugar de una lista de tuplas (token, categoria, puntaje), con la categoría
+repetida como string en cada token, FlujoTokens guarda columnas tipadas:
+
+  ids         uint32  id del token en una TablaTokens (strings internados)
+  categorias  uint8   código de categoría (CATEGORIAS primero, luego las extra)
+  puntajes    int32   puntaje del vocabulario
+  hablantes   uint8   0 = agente, 1 = cliente
+  turnos      uint32  índice del primer token de cada turno (offsets)
+
+Las columnas son array.array (crecen sin copiar listas de objetos) y se leen
+como np.ndarray sin copia para las reducciones de analizar_sentimiento y
+verificar_protocolo. La API de tuplas sigue disponible: FlujoTokens es una
+secuencia de (token, categoria, puntaje) y tokens() es una vista de strings.
+
+Uso:
+  flujo, sugerencias = tokenizar_flujo(texto_agente, vocab, hablante="agente")
+  tokenizar_flujo(texto_cliente, vocab, hablante="cliente", flujo=flujo)
+  analizar_sentimiento(flujo, lexicon); verificar_protocolo(flujo, texto_agente)
+"""
+
+from array import array
+from typing import Dict, Iterable, Iterator, List, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+
+from tokenizacion import CATEGORIAS, iterar_tokens
+
+HABLANTES = ["agente", "cliente"]
+
+
+class TablaTokens:
+    """
+    Tabla de internado token <-> id. Puede compartirse entre varios flujos
+    (por ejemplo, en un lote) para que cada string se guarde una sola vez.
+    """
+
+    def __init__(self):
+        self.ids: Dict[str, int] = {}
+        self.palabras: List[str] = []
+        self.invalidar_pesos()
+
+    def id(self, token: str) -> int:
+        i = self.ids.get(token)
+        if i is None:
+            i = self.ids[token] = len(self.palabras)
+            self.palabras.append(token)
+        return i
+
+    def __len__(self) -> int:
+        return len(self.palabras)
+
+    def pesos(self, lexicon: Mapping[str, int]) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        (pesos, presentes) indexados por id de token: el peso en 'lexicon' (0 si
+        no está) y si está. Se cachea por lexicón y sólo se consultan los ids
+        nuevos; la caché se invalida si cambia el lexicón o su tamaño (los
+        tokens agregados en modo interactivo). La tabla guarda una referencia
+        al lexicón cacheado (no su id(), que un dict nuevo puede reutilizar si
+        el anterior se liberó). Las ediciones de pesos sobre el mismo dict no se
+        detectan: usar otro lexicón o invalidar_pesos().
+        """
+        if self._lexicon_pesos is not lexicon or self._largo_pesos != len(lexicon):
+            self.invalidar_pesos()
+            self._lexicon_pesos, self._largo_pesos = lexicon, len(lexicon)
+        for palabra in self.palabras[len(self._presentes):]:
+            peso = lexicon.get(palabra)
+            self._pesos.append(0 if peso is None else peso)
+            self._presentes.append(peso is not None)
+        return (np.frombuffer(self._pesos, dtype=np.int64) if self._pesos else np.empty(0, np.int64),
+                np.frombuffer(self._presentes, dtype=bool) if self._presentes else np.empty(0, bool))
+
+    def invalidar_pesos(self):
+        self._lexicon_pesos: Optional[Mapping[str, int]] = None
+        self._largo_pesos = 0
+        self._pesos = array("q")
+        self._presentes = array("B")
+
+
+class _VistaTokens(Sequence):
+    """
+    Vista de sólo lectura de los strings de un flujo (para la API de listas de tokens).
+    """
+
+    def __init__(self, flujo: "FlujoTokens"):
+        self._flujo = flujo
+
+    def __len__(self) -> int:
+        return len(self._flujo)
+
+    def __getitem__(self, i):
+        palabras = self._flujo.tabla.palabras
+        if isinstance(i, slice):
+            return [palabras[j] for j in self._flujo.ids[i]]
+        return palabras[self._flujo.ids[i]]
+
+    def __iter__(self) -> Iterator[str]:
+        palabras = self._flujo.tabla.palabras
+        return (palabras[j] for j in self._flujo.ids)
+
+
+class FlujoTokens(Sequence):
+    """
+    Secuencia de tokens en columnas tipadas (ver docstring del módulo).
+    Indexar o iterar devuelve tuplas (token, categoria, puntaje).
+    """
+
+    def __init__(self, tabla: Optional[TablaTokens] = None):
+        self.tabla = tabla if tabla is not None else TablaTokens()
+        self.categorias_nombres: List[str] = list(CATEGORIAS)
+        self._codigos: Dict[str, int] = {c: i for i, c in enumerate(CATEGORIAS)}
+
+        self.ids        = array("I")
+        self.categorias = array("B")
+        self.puntajes   = array("i")
+        self.hablantes  = array("B")
+        self.turnos     = array("I")
+
+    # --- construcción ---
+
+    def _codigo(self, categoria: str) -> int:
+        codigo = self._codigos.get(categoria)
+        if codigo is None:
+            codigo = self._codigos[categoria] = len(self.categorias_nombres)
+            self.categorias_nombres.append(categoria)
+        return codigo
+
+    def nuevo_turno(self):
+        """
+        Marca el inicio de un turno en la posición actual.
+        """
+        if not self.turnos or self.turnos[-1] != len(self.ids):
+            self.turnos.append(len(self.ids))
+
+    def agregar(self, token: str, categoria: str, puntaje: int, hablante: str = "agente"):
+        self.ids.append(self.tabla.id(token))
+        self.categorias.append(self._codigo(categoria))
+        self.puntajes.append(puntaje)
+        self.hablantes.append(HABLANTES.index(hablante))
+
+    def extender(self, tokens_info: Iterable[Tuple[str,str,int]], hablante: str = "agente"):
+        """
+        Agrega todas las tripletas de 'tokens_info' (por ejemplo, el generador
+        iterar_tokens) como un turno de 'hablante'.
+        """
+        self.nuevo_turno()
+        codigo_hablante = HABLANTES.index(hablante)
+        tabla_ids, codigos = self.tabla.ids, self._codigos
+        ids, categorias, puntajes = self.ids, self.categorias, self.puntajes
+        inicio = len(ids)
+        for token, categoria, puntaje in tokens_info:
+            # Búsquedas en línea: este bucle corre una vez por token
+            i = tabla_ids.get(token)
+            if i is None:
+                i = self.tabla.id(token)
+            c = codigos.get(categoria)
+            if c is None:
+                c = self._codigo(categoria)
+            ids.append(i)
+            categorias.append(c)
+            puntajes.append(puntaje)
+        self.hablantes.extend(array("B", [codigo_hablante]) * (len(ids) - inicio))
+
+    @classmethod
+    def desde_tuplas(cls, tokens_info: Iterable[Tuple[str,str,int]], hablante: str = "agente",
+                     tabla: Optional[TablaTokens] = None) -> "FlujoTokens":
+        flujo = cls(tabla)
+        flujo.extender(tokens_info, hablante)
+        return flujo
+
+    # --- API de secuencia de tuplas ---
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(len(self)))]
+        return (self.tabla.palabras[self.ids[i]],
+                self.categorias_nombres[self.categorias[i]],
+                self.puntajes[i])
+
+    def __iter__(self) -> Iterator[Tuple[str,str,int]]:
+        palabras, nombres = self.tabla.palabras, self.categorias_nombres
+        for i, c, p in zip(self.ids, self.categorias, self.puntajes):
+            yield (palabras[i], nombres[c], p)
+
+    def tokens(self) -> Sequence[str]:
+        """
+        Vista de los tokens como strings (lo que espera analizar_sentimiento).
+        """
+        return _VistaTokens(self)
+
+    def tuplas(self) -> List[Tuple[str,str,int]]:
+        return list(self)
+
+    def del_hablante(self, hablante: str) -> "FlujoTokens":
+        """
+        Sub-flujo con los tokens de un solo hablante (comparte la tabla de tokens).
+        """
+        mascara = self.columna("hablantes") == HABLANTES.index(hablante)
+        sub = FlujoTokens(self.tabla)
+        sub.categorias_nombres = list(self.categorias_nombres)
+        sub._codigos = dict(self._codigos)
+        for nombre in ("ids", "categorias", "puntajes", "hablantes"):
+            getattr(sub, nombre).frombytes(self.columna(nombre)[mascara].tobytes())
+        return sub
+
+    # --- reducciones vectorizadas ---
+
+    def columna(self, nombre: str) -> np.ndarray:
+        """
+        Columna como np.ndarray, sin copia (vista sobre el buffer del array).
+        Mientras la vista exista el array no puede crecer: copiarla si se va a
+        conservar mientras se siguen agregando tokens.
+        """
+        datos = getattr(self, nombre)
+        if not datos:
+            return np.empty(0, dtype=np.dtype(datos.typecode))
+        return np.frombuffer(datos, dtype=np.dtype(datos.typecode))
+
+    def pesos_lexico(self, lexicon: Mapping[str, int]) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Devuelve (pesos, en_lexico) por token: el peso del lexicón (0 si no está)
+        y una máscara de pertenencia. El lexicón se consulta una vez por token
+        distinto, no por ocurrencia.
+        """
+        pesos, presentes = self.tabla.pesos(lexicon)
+        ids = self.columna("ids")
+        return pesos[ids], presentes[ids]
+
+    def analizar_sentimiento(self, lexicon: Mapping[str, int]) -> Dict[str, object]:
+        """
+        Mismo resultado que analizar_sentimiento sobre los tokens en orden.
+        """
+        pesos, en_lexico = self.pesos_lexico(lexicon)
+        palabras = self.tabla.palabras
+        ids = self.columna("ids")
+
+        puntaje_total = int(pesos.sum())
+        positivas = pesos > 0
+        negativas = pesos < 0
+        count_positivas = int(positivas.sum())
+        count_negativas = int(negativas.sum())
+
+        # argmax/argmin devuelven la primera ocurrencia, igual que la
+        # comparación estricta del bucle original
+        mas_positiva, mas_negativa = (None, 0), (None, 0)
+        if count_positivas:
+            i = int(np.argmax(pesos))
+            mas_positiva = (palabras[ids[i]], int(pesos[i]))
+        if count_negativas:
+            i = int(np.argmin(pesos))
+            mas_negativa = (palabras[ids[i]], int(pesos[i]))
+
+        if puntaje_total > 0:
+            sentimiento_general = f"Positivo (+{puntaje_total})"
+        elif puntaje_total < 0:
+            sentimiento_general = f"Negativo ({puntaje_total})"
+        else:
+            sentimiento_general = "Neutral (0)"
+
+        return {
+            "sentimiento_general":   sentimiento_general,
+            "puntaje_total":         puntaje_total,
+            "count_positivas":       count_positivas,
+            "palabra_mas_positiva":  mas_positiva,
+            "count_negativas":       count_negativas,
+            "palabra_mas_negativa":  mas_negativa,
+            "tokens_no_lexico":      [palabras[i] for i in ids[~en_lexico].tolist()]
+        }
+
+    def verificar_protocolo(self) -> Dict[str, object]:
+        """
+        Mismo resultado que verificar_protocolo sobre los tokens del agente.
+        """
+        agente = self.columna("hablantes") == HABLANTES.index("agente")
+        categorias = self.columna("categorias")[agente]
+        presentes = np.bincount(categorias, minlength=len(self.categorias_nombres))
+        ruda = self._codigos["palabra_ruda"]
+        ids_rudas = self.columna("ids")[agente][categorias == ruda]
+        palabras = self.tabla.palabras
+        return {
+            "saludo":         {"ok": bool(presentes[self._codigos["saludo"]])},
+            "identificacion": {"ok": bool(presentes[self._codigos["identificacion"]])},
+            "rudas":          {"lista": [palabras[i] for i in ids_rudas.tolist()]},
+            "despedida":      {"ok": bool(presentes[self._codigos["despedida"]])}
+        }
+
+    def bytes_usados(self) -> int:
+        """
+        Memoria de las columnas (sin contar la tabla de tokens compartida).
+        """
+        return sum(a.itemsize * len(a) for a in
+                   (self.ids, self.categorias, self.puntajes, self.hablantes, self.turnos))
+
+
+def tokenizar_flujo(
+    texto_transcrito: str,
+    vocabulario: Dict[str, Tuple[str,int]],
+    hablante: str = "agente",
+    flujo: Optional[FlujoTokens] = None,
+    **opciones
+) -> Tuple[FlujoTokens, Dict[str, List[str]]]:
+    """
+    Como tokenizar_texto, pero vuelca los tokens en un FlujoTokens (nuevo, o
+    'flujo' si se pasa, como un turno más de 'hablante') en lugar de una lista
+    de tuplas. 'opciones' se pasan a iterar_tokens (max_sugerencias, cutoff,
+    interactivo, indice).
+    Retorna (flujo, sugerencias).
+    """
+    if flujo is None:
+        flujo = FlujoTokens()
+    sugerencias: Dict[str, List[str]] = {}
+    flujo.extender(iterar_tokens(texto_transcrito, vocabulario, sugerencias, **opciones), hablante)
+    return flujo, sugerencias
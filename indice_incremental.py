@@ -0,0 +1,543 @@
+#!/usr/bin/env python3
+"""
+Índice persistente de conteos de tokens por transcripción, para re-puntuar
+incrementalmente cuando cambia vocabulario_sentimiento.csv.
+
+Al indexar, cada transcripción se tokeniza una vez (como main.py en modo no
+interactivo) y se guarda en SQLite:
+
+  ocurrencias(doc, palabra, agente, cliente, primera, posiciones_agente)
+      conteos por hablante, primera posición del token en la llamada y las
+      posiciones en el turno del agente (para el orden de las palabras rudas)
+  documentos(...)
+      el estado del análisis: puntaje_total, conteos, extremos, banderas de protocolo
+  lexico(palabra, categoria, puntaje)
+      la versión del vocabulario con la que está puntuado el índice
+
+Las ocurrencias guardan las formas tal como aparecen; cada forma se puntúa con
+su entrada "efectiva" en el vocabulario: la propia o, si no está, la de su lema
+(lematizacion.buscar_lema, como tokenizacion.iterar_tokens), y se reporta como
+ese lema.
+
+Al indexar, además, se guardan los lemas candidatos de cada forma nueva
+(lematizacion.candidatos, que no depende del vocabulario) en la tabla
+lemas(lema, forma).
+
+Aplicar un cambio del vocabulario compara el CSV con la tabla 'lexico'. Una
+forma sólo puede cambiar de entrada efectiva si la palabra modificada es ella
+misma o uno de sus candidatos, así que las formas a revisar salen de la
+diferencia (ocurrencias y lemas, por índice), no de recorrer las formas del
+índice. Se traen sólo sus ocurrencias y se ajusta cada documento afectado con
+la diferencia de esas formas. Los extremos y la lista de palabras rudas se
+recalculan sólo en los documentos donde la palabra modificada era (o pasa a
+ser) relevante. El costo crece con el tamaño del cambio y las ocurrencias de
+esas palabras, no con el corpus.
+
+El protocolo del índice es el de los tokens sueltos (verificar_protocolo sin
+autómata): no busca las frases de varias palabras (automata_frases.py), que
+necesitan el texto por turno. Por eso no incluye "frases", primer_turno ni
+ultimo_turno, y un saludo/despedida/identificación que sólo aparece como frase
+(o una frase ruda) no se refleja acá aunque main.py lo informe.
+
+Uso:
+  python indice_incremental.py indexar <directorio|glob> [--indice indice.sqlite]
+  python indice_incremental.py aplicar [vocabulario_sentimiento.csv] [--indice indice.sqlite]
+  python indice_incremental.py reporte <archivo> [--indice indice.sqlite]
+"""
+
+import argparse
+import json
+import os
+import sqlite3
+import sys
+from collections import defaultdict
+from typing import Dict, Iterable, List, Mapping, Optional, Tuple
+
+from utils import extraer_lexemas
+from lematizacion import buscar_lema, candidatos
+from tokenizacion import cargar_vocabulario
+
+INDICE_POR_DEFECTO = "indice_conteos.sqlite"
+CATEGORIAS_PROTOCOLO = ("saludo", "identificacion", "despedida")
+
+_ESQUEMA = """
+CREATE TABLE IF NOT EXISTS documentos (
+    id INTEGER PRIMARY KEY,
+    archivo TEXT UNIQUE NOT NULL,
+    mtime REAL,
+    n_agente INTEGER, n_cliente INTEGER,
+    puntaje_total INTEGER, count_positivas INTEGER, count_negativas INTEGER, no_lexico INTEGER,
+    pos_palabra TEXT, pos_peso INTEGER, pos_primera INTEGER,
+    neg_palabra TEXT, neg_peso INTEGER, neg_primera INTEGER,
+    n_saludo INTEGER, n_identificacion INTEGER, n_despedida INTEGER,
+    rudas TEXT
+);
+CREATE TABLE IF NOT EXISTS ocurrencias (
+    doc INTEGER NOT NULL, palabra TEXT NOT NULL,
+    agente INTEGER, cliente INTEGER, primera INTEGER, posiciones_agente TEXT,
+    PRIMARY KEY (doc, palabra)
+);
+CREATE INDEX IF NOT EXISTS ocurrencias_palabra ON ocurrencias (palabra);
+CREATE TABLE IF NOT EXISTS lexico (
+    palabra TEXT PRIMARY KEY, categoria TEXT, puntaje INTEGER
+);
+CREATE TABLE IF NOT EXISTS lemas (
+    lema TEXT NOT NULL, forma TEXT NOT NULL,
+    PRIMARY KEY (lema, forma)
+) WITHOUT ROWID;
+"""
+# PRAGMA user_version desde el que la tabla 'lemas' cubre todas las formas
+_VERSION_LEMAS = 1
+
+# (palabra, agente, cliente, primera, posiciones_agente)
+Fila = Tuple[str, int, int, int, str]
+Entrada = Optional[Tuple[str, int]]
+# (palabra efectiva, entrada): la forma o su lema, y su entrada en el vocabulario
+Resuelta = Tuple[str, Entrada]
+
+
+def clase_sentimiento(puntaje_total: int) -> str:
+    if puntaje_total > 0:
+        return "Positivo"
+    if puntaje_total < 0:
+        return "Negativo"
+    return "Neutral"
+
+
+def resolver(forma: str, vocab: Dict[str, Tuple[str,int]]) -> Resuelta:
+    """
+    Palabra con la que 'forma' se puntúa y su entrada: la forma misma si está
+    en el vocabulario, si no su lema (si está), y si no (forma, None).
+    """
+    entrada = vocab.get(forma)
+    if entrada is None:
+        lema = buscar_lema(forma, vocab)
+        if lema is not None:
+            return lema, vocab[lema]
+    return forma, entrada
+
+
+def _filas_de_tokens(tokens_agente: List[str], tokens_cliente: List[str]) -> List[Fila]:
+    conteos: Dict[str, list] = {}
+    for pos, tok in enumerate(tokens_agente + tokens_cliente):
+        datos = conteos.get(tok)
+        if datos is None:
+            datos = conteos[tok] = [0, 0, pos, []]
+        if pos < len(tokens_agente):
+            datos[0] += 1
+            datos[3].append(pos)
+        else:
+            datos[1] += 1
+    return [(tok, a, c, primera, " ".join(map(str, posiciones)))
+            for tok, (a, c, primera, posiciones) in conteos.items()]
+
+
+def _extremo(filas: Iterable[Fila], vocab: Dict[str, Tuple[str,int]], signo: int):
+    """
+    (palabra, peso, primera) del extremo positivo (signo=1) o negativo (signo=-1):
+    mayor |peso| y, a igualdad, primera aparición (como analizar_sentimiento).
+    """
+    mejor = (None, 0, -1)
+    for forma, _, _, primera, _ in filas:
+        palabra, entrada = resolver(forma, vocab)
+        if entrada is None or entrada[1] * signo <= 0:
+            continue
+        peso = entrada[1]
+        if (mejor[0] is None or peso * signo > mejor[1] * signo
+                or (peso == mejor[1] and primera < mejor[2])):
+            mejor = (palabra, peso, primera)
+    return mejor
+
+
+def _rudas(filas: Iterable[Fila], vocab: Dict[str, Tuple[str,int]]) -> List[str]:
+    """
+    Palabras rudas del agente en orden de aparición (como verificar_protocolo).
+    """
+    posiciones = []
+    for forma, agente, _, _, pos_agente in filas:
+        if not agente:
+            continue
+        palabra, entrada = resolver(forma, vocab)
+        if entrada is not None and entrada[0] == "palabra_ruda":
+            posiciones.extend((int(p), palabra) for p in pos_agente.split())
+    return [palabra for _, palabra in sorted(posiciones)]
+
+
+class _VocabularioAnterior(Mapping):
+    """
+    El vocabulario previo a un cambio, visto como 'vocab_nuevo' con las
+    entradas anteriores de las palabras de 'cambios' (sin copiar el resto).
+    """
+
+    def __init__(self, vocab_nuevo: Dict[str, Tuple[str,int]],
+                 cambios: Dict[str, Tuple[Entrada, Entrada]]):
+        self.nuevo = vocab_nuevo
+        self.cambios = cambios
+
+    def __getitem__(self, palabra: str) -> Tuple[str,int]:
+        cambio = self.cambios.get(palabra)
+        entrada = self.nuevo[palabra] if cambio is None else cambio[0]
+        if entrada is None:
+            raise KeyError(palabra)
+        return entrada
+
+    def __contains__(self, palabra) -> bool:
+        cambio = self.cambios.get(palabra)
+        return palabra in self.nuevo if cambio is None else cambio[0] is not None
+
+    def __iter__(self):
+        for palabra in self.nuevo:
+            if palabra in self:
+                yield palabra
+        for palabra, (viejo, nuevo) in self.cambios.items():
+            if nuevo is None and viejo is not None:
+                yield palabra
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+
+
+class IndiceConteos:
+    """
+    Índice de conteos por transcripción con re-puntuación incremental.
+    """
+
+    def __init__(self, ruta: str = INDICE_POR_DEFECTO):
+        self.ruta = ruta
+        self.conexion = sqlite3.connect(ruta)
+        self.conexion.executescript(_ESQUEMA)
+        if self.conexion.execute("PRAGMA user_version").fetchone()[0] < _VERSION_LEMAS:
+            # Índice creado antes de la tabla de lemas: se completa una vez
+            with self.conexion:
+                self._guardar_lemas(p for (p,) in self.conexion.execute(
+                    "SELECT DISTINCT palabra FROM ocurrencias").fetchall())
+                self.conexion.execute(f"PRAGMA user_version = {_VERSION_LEMAS}")
+
+    def cerrar(self):
+        self.conexion.close()
+
+    # --- vocabulario con el que está puntuado el índice ---
+
+    def vocabulario(self) -> Dict[str, Tuple[str,int]]:
+        return {p: (c, s) for p, c, s in self.conexion.execute(
+            "SELECT palabra, categoria, puntaje FROM lexico")}
+
+    def _guardar_vocabulario(self, cambios: Dict[str, Entrada]):
+        for palabra, entrada in cambios.items():
+            if entrada is None:
+                self.conexion.execute("DELETE FROM lexico WHERE palabra = ?", (palabra,))
+            else:
+                self.conexion.execute("INSERT OR REPLACE INTO lexico VALUES (?, ?, ?)",
+                                      (palabra, *entrada))
+
+    def _guardar_lemas(self, formas: Iterable[str]):
+        self.conexion.executemany(
+            "INSERT OR IGNORE INTO lemas VALUES (?, ?)",
+            [(lema, forma) for forma in formas for lema in candidatos(forma)])
+
+    # --- indexado ---
+
+    def indexar(self, rutas: List[str], vocab: Dict[str, Tuple[str,int]]) -> int:
+        """
+        Indexa (o re-indexa si cambió su mtime) cada transcripción de 'rutas'.
+        Si el índice estaba puntuado con otro vocabulario, primero hay que
+        aplicar ese cambio (aplicar_vocabulario) para que todo quede coherente.
+        Devuelve la cantidad de documentos (re)indexados.
+        """
+        from main import separar_hablantes
+
+        if not self.conexion.execute("SELECT 1 FROM lexico LIMIT 1").fetchone():
+            self._guardar_vocabulario(vocab)
+        elif self.vocabulario() != vocab:
+            raise ValueError("El índice está puntuado con otra versión del vocabulario; "
+                             "aplique el cambio antes de indexar.")
+
+        indexados = 0
+        with self.conexion:
+            for ruta in rutas:
+                mtime = os.path.getmtime(ruta)
+                previo = self.conexion.execute(
+                    "SELECT id, mtime FROM documentos WHERE archivo = ?", (ruta,)).fetchone()
+                if previo and previo[1] == mtime:
+                    continue
+                with open(ruta, encoding="utf-8") as f:
+                    texto_agente, texto_cliente = separar_hablantes(f.read())
+                tokens_agente = extraer_lexemas(texto_agente)
+                tokens_cliente = extraer_lexemas(texto_cliente)
+                filas = _filas_de_tokens(tokens_agente, tokens_cliente)
+
+                if previo:
+                    self.conexion.execute("DELETE FROM ocurrencias WHERE doc = ?", (previo[0],))
+                    self.conexion.execute("DELETE FROM documentos WHERE id = ?", (previo[0],))
+                cursor = self.conexion.execute(
+                    "INSERT INTO documentos (archivo, mtime, n_agente, n_cliente) VALUES (?, ?, ?, ?)",
+                    (ruta, mtime, len(tokens_agente), len(tokens_cliente)))
+                doc = cursor.lastrowid
+                self.conexion.executemany(
+                    "INSERT INTO ocurrencias VALUES (?, ?, ?, ?, ?, ?)",
+                    [(doc, *fila) for fila in filas])
+                self._guardar_lemas(fila[0] for fila in filas)
+                self._puntuar_documento(doc, filas, vocab)
+                indexados += 1
+        return indexados
+
+    def _puntuar_documento(self, doc: int, filas: List[Fila], vocab: Dict[str, Tuple[str,int]]):
+        """
+        Calcula desde cero el estado de un documento.
+        """
+        total = positivas = negativas = no_lexico = 0
+        categorias = defaultdict(int)
+        for forma, agente, cliente, _, _ in filas:
+            _, entrada = resolver(forma, vocab)
+            n = agente + cliente
+            if entrada is None:
+                no_lexico += n
+                categorias["otros"] += agente
+                continue
+            categoria, peso = entrada
+            total += n * peso
+            positivas += n * (peso > 0)
+            negativas += n * (peso < 0)
+            categorias[categoria] += agente
+        pos = _extremo(filas, vocab, 1)
+        neg = _extremo(filas, vocab, -1)
+        self.conexion.execute(
+            "UPDATE documentos SET puntaje_total = ?, count_positivas = ?, count_negativas = ?, "
+            "no_lexico = ?, pos_palabra = ?, pos_peso = ?, pos_primera = ?, "
+            "neg_palabra = ?, neg_peso = ?, neg_primera = ?, "
+            "n_saludo = ?, n_identificacion = ?, n_despedida = ?, rudas = ? WHERE id = ?",
+            (total, positivas, negativas, no_lexico, *pos, *neg,
+             categorias["saludo"], categorias["identificacion"], categorias["despedida"],
+             json.dumps(_rudas(filas, vocab), ensure_ascii=False), doc))
+
+    # --- re-puntuación incremental ---
+
+    def diferencia(self, vocab_nuevo: Dict[str, Tuple[str,int]]) -> Dict[str, Tuple[Entrada, Entrada]]:
+        """
+        { palabra: (entrada_anterior, entrada_nueva) } de las palabras agregadas,
+        eliminadas o modificadas respecto del vocabulario del índice.
+        """
+        viejo = self.vocabulario()
+        return {p: (viejo.get(p), vocab_nuevo.get(p))
+                for p in viejo.keys() | vocab_nuevo.keys()
+                if viejo.get(p) != vocab_nuevo.get(p)}
+
+    def _formas_afectadas(self, cambios: Dict[str, Tuple[Entrada, Entrada]],
+                          vocab_nuevo: Dict[str, Tuple[str,int]]) -> Dict[str, Tuple[Resuelta, Resuelta]]:
+        """
+        { forma: (resuelta_anterior, resuelta_nueva) } de las formas del índice
+        cuya palabra efectiva o entrada cambia. Sólo se revisan las palabras
+        modificadas y las formas que las tienen como lema candidato.
+        """
+        vocab_viejo = _VocabularioAnterior(vocab_nuevo, cambios)
+        palabras = list(cambios)
+        formas = set()
+        for i in range(0, len(palabras), 500):
+            lote = palabras[i:i + 500]
+            marcas = ",".join("?" * len(lote))
+            formas.update(p for (p,) in self.conexion.execute(
+                f"SELECT DISTINCT palabra FROM ocurrencias WHERE palabra IN ({marcas})", lote))
+            formas.update(f for (f,) in self.conexion.execute(
+                f"SELECT forma FROM lemas WHERE lema IN ({marcas})", lote))
+        afectadas = {}
+        for forma in formas:
+            antes, despues = resolver(forma, vocab_viejo), resolver(forma, vocab_nuevo)
+            if antes != despues:
+                afectadas[forma] = (antes, despues)
+        return afectadas
+
+    def aplicar_vocabulario(self, vocab_nuevo: Dict[str, Tuple[str,int]],
+                            cambios: Optional[Dict[str, Tuple[Entrada, Entrada]]] = None
+                            ) -> List[Tuple[str, str, str]]:
+        """
+        Aplica el cambio de vocabulario a los documentos afectados, en tiempo
+        proporcional a las palabras modificadas y sus ocurrencias. 'cambios' es
+        el resultado de diferencia(vocab_nuevo), si ya se calculó.
+        Devuelve [(archivo, clase_anterior, clase_nueva)] de las llamadas que
+        cambiaron de clase de sentimiento.
+        """
+        if cambios is None:
+            cambios = self.diferencia(vocab_nuevo)
+        if not cambios:
+            return []
+        afectadas = self._formas_afectadas(cambios, vocab_nuevo)
+
+        # Ocurrencias de las formas afectadas, agrupadas por documento
+        por_doc: Dict[int, List[Fila]] = defaultdict(list)
+        palabras = list(afectadas)
+        for i in range(0, len(palabras), 500):
+            lote = palabras[i:i + 500]
+            for doc, *fila in self.conexion.execute(
+                    "SELECT doc, palabra, agente, cliente, primera, posiciones_agente FROM ocurrencias "
+                    f"WHERE palabra IN ({','.join('?' * len(lote))})", lote):
+                por_doc[doc].append(tuple(fila))
+
+        cambiaron = []
+        with self.conexion:
+            for doc, filas in por_doc.items():
+                antes = self._estado(doc)
+                despues = self._ajustar(doc, dict(antes), filas, afectadas, vocab_nuevo)
+                if clase_sentimiento(antes["puntaje_total"]) != clase_sentimiento(despues["puntaje_total"]):
+                    cambiaron.append((antes["archivo"], clase_sentimiento(antes["puntaje_total"]),
+                                      clase_sentimiento(despues["puntaje_total"])))
+            self._guardar_vocabulario({p: nuevo for p, (_, nuevo) in cambios.items()})
+        return sorted(cambiaron)
+
+    def _estado(self, doc: int) -> dict:
+        cursor = self.conexion.execute("SELECT * FROM documentos WHERE id = ?", (doc,))
+        columnas = [d[0] for d in cursor.description]
+        return dict(zip(columnas, cursor.fetchone()))
+
+    def _filas(self, doc: int) -> List[Fila]:
+        return self.conexion.execute(
+            "SELECT palabra, agente, cliente, primera, posiciones_agente "
+            "FROM ocurrencias WHERE doc = ?", (doc,)).fetchall()
+
+    def _ajustar(self, doc: int, estado: dict, filas: List[Fila],
+                 afectadas: Dict[str, Tuple[Resuelta, Resuelta]],
+                 vocab_nuevo: Dict[str, Tuple[str,int]]) -> dict:
+        """
+        Suma al estado del documento la diferencia de las formas afectadas.
+        """
+        recalcular = {1: False, -1: False}
+        rudas_cambiaron = False
+        for forma, agente, cliente, primera, _ in filas:
+            (palabra_vieja, viejo), (palabra, nuevo) = afectadas[forma]
+            n = agente + cliente
+            peso_viejo = viejo[1] if viejo else 0
+            peso_nuevo = nuevo[1] if nuevo else 0
+            estado["puntaje_total"]   += n * (peso_nuevo - peso_viejo)
+            estado["count_positivas"] += n * ((peso_nuevo > 0) - (peso_viejo > 0))
+            estado["count_negativas"] += n * ((peso_nuevo < 0) - (peso_viejo < 0))
+            estado["no_lexico"]       += n * ((nuevo is None) - (viejo is None))
+
+            cat_vieja = viejo[0] if viejo else "otros"
+            cat_nueva = nuevo[0] if nuevo else "otros"
+            if agente and cat_vieja != cat_nueva:
+                for categoria, delta in ((cat_vieja, -agente), (cat_nueva, agente)):
+                    if categoria in CATEGORIAS_PROTOCOLO:
+                        estado[f"n_{categoria}"] += delta
+                rudas_cambiaron |= "palabra_ruda" in (cat_vieja, cat_nueva)
+            elif agente and palabra_vieja != palabra and cat_nueva == "palabra_ruda":
+                rudas_cambiaron = True  # sigue siendo ruda, pero se reporta con otro lema
+
+            # Extremos: si la palabra era el extremo y empeoró (o la forma pasó
+            # a otro lema, o a éste desde otro), se recalcula el documento; si
+            # no, basta con compararla contra el extremo actual
+            for signo, prefijo in ((1, "pos"), (-1, "neg")):
+                actual = estado[f"{prefijo}_palabra"]
+                if actual in (palabra_vieja, palabra):
+                    if palabra_vieja != palabra or peso_nuevo * signo < peso_viejo * signo:
+                        recalcular[signo] = True
+                    else:
+                        estado[f"{prefijo}_peso"] = peso_nuevo
+                elif peso_nuevo * signo > 0 and (
+                        actual is None or peso_nuevo * signo > estado[f"{prefijo}_peso"] * signo
+                        or (peso_nuevo == estado[f"{prefijo}_peso"] and primera < estado[f"{prefijo}_primera"])):
+                    estado[f"{prefijo}_palabra"] = palabra
+                    estado[f"{prefijo}_peso"] = peso_nuevo
+                    estado[f"{prefijo}_primera"] = primera
+
+        if recalcular[1] or recalcular[-1] or rudas_cambiaron:
+            todas = self._filas(doc)
+            for signo, prefijo in ((1, "pos"), (-1, "neg")):
+                if recalcular[signo]:
+                    (estado[f"{prefijo}_palabra"], estado[f"{prefijo}_peso"],
+                     estado[f"{prefijo}_primera"]) = _extremo(todas, vocab_nuevo, signo)
+            if rudas_cambiaron:
+                estado["rudas"] = json.dumps(_rudas(todas, vocab_nuevo), ensure_ascii=False)
+
+        columnas = [c for c in estado if c not in ("id", "archivo", "mtime", "n_agente", "n_cliente")]
+        self.conexion.execute(
+            f"UPDATE documentos SET {', '.join(f'{c} = ?' for c in columnas)} WHERE id = ?",
+            [estado[c] for c in columnas] + [doc])
+        return estado
+
+    # --- consulta ---
+
+    def reporte(self, archivo: str) -> Optional[dict]:
+        """
+        Sentimiento y protocolo de una transcripción, con el formato de
+        analizar_sentimiento / verificar_protocolo ("tokens_no_lexico" se
+        reemplaza por su cantidad, "count_no_lexico").
+        """
+        fila = self.conexion.execute("SELECT id FROM documentos WHERE archivo = ?", (archivo,)).fetchone()
+        if fila is None:
+            return None
+        e = self._estado(fila[0])
+        total = e["puntaje_total"]
+        if total > 0:
+            sentimiento_general = f"Positivo (+{total})"
+        elif total < 0:
+            sentimiento_general = f"Negativo ({total})"
+        else:
+            sentimiento_general = "Neutral (0)"
+        return {
+            "sentimiento": {
+                "sentimiento_general":  sentimiento_general,
+                "puntaje_total":        total,
+                "count_positivas":      e["count_positivas"],
+                "palabra_mas_positiva": (e["pos_palabra"], e["pos_peso"]) if e["pos_palabra"] else (None, 0),
+                "count_negativas":      e["count_negativas"],
+                "palabra_mas_negativa": (e["neg_palabra"], e["neg_peso"]) if e["neg_palabra"] else (None, 0),
+                "count_no_lexico":      e["no_lexico"],
+            },
+            "protocolo": {
+                "saludo":         {"ok": e["n_saludo"] > 0},
+                "identificacion": {"ok": e["n_identificacion"] > 0},
+                "rudas":          {"lista": json.loads(e["rudas"])},
+                "despedida":      {"ok": e["n_despedida"] > 0}
+            }
+        }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Índice de conteos y re-puntuación incremental.")
+    sub = parser.add_subparsers(dest="comando", required=True)
+    p_idx = sub.add_parser("indexar", help="Indexar transcripciones (nuevas o modificadas)")
+    p_idx.add_argument("entrada", help="Directorio (se toman los *.txt) o glob de transcripciones")
+    p_apl = sub.add_parser("aplicar", help="Aplicar los cambios del CSV de vocabulario al índice")
+    p_apl.add_argument("csv", nargs="?", default="vocabulario_sentimiento.csv")
+    p_rep = sub.add_parser("reporte", help="Mostrar el análisis indexado de una transcripción")
+    p_rep.add_argument("archivo")
+    for p in (p_idx, p_apl, p_rep):
+        p.add_argument("--indice", default=INDICE_POR_DEFECTO)
+    args = parser.parse_args()
+
+    indice = IndiceConteos(args.indice)
+    try:
+        if args.comando == "indexar":
+            from lote import listar_transcripciones
+            from main import VOC_LEX_CSV
+
+            rutas = listar_transcripciones(args.entrada)
+            if not rutas:
+                print(f"[ERROR] No se encontraron transcripciones en {args.entrada}")
+                sys.exit(1)
+            try:
+                n = indice.indexar(rutas, cargar_vocabulario(VOC_LEX_CSV, usar_compilado=False))
+            except ValueError as e:
+                print(f"[ERROR] {e}")
+                sys.exit(1)
+            print(f"✅ {n} transcripciones indexadas en '{args.indice}'.")
+
+        elif args.comando == "aplicar":
+            vocab = cargar_vocabulario(args.csv, usar_compilado=False)
+            cambios = indice.diferencia(vocab)
+            cambiaron = indice.aplicar_vocabulario(vocab, cambios)
+            print(f"🔄 {len(cambios)} palabras modificadas en el vocabulario.")
+            if cambiaron:
+                print(f"\n--- LLAMADAS QUE CAMBIARON DE CLASE ({len(cambiaron)}) ---")
+                for archivo, antes, despues in cambiaron:
+                    print(f"  {archivo}: {antes} → {despues}")
+            else:
+                print("Ninguna llamada cambió de clase de sentimiento.")
+
+        else:
+            reporte = indice.reporte(args.archivo)
+            if reporte is None:
+                print(f"[ERROR] {args.archivo} no está indexado.")
+                sys.exit(1)
+            print(json.dumps(reporte, indent=2, ensure_ascii=False))
+    finally:
+        indice.cerrar()
@@ -0,0 +1,266 @@
+"""
+Lematización rápida del español entre la normalización (utils.extraer_lexemas)
+y la consulta al vocabulario.
+
+El vocabulario guarda formas base ("revisar", "esperar", "tarde", "idiota"),
+pero en una llamada aparecen flexionadas ("revisaré", "espere", "tardes",
+"idiotas"): sin este paso caen en la búsqueda de sugerencias (la etapa cara de
+tokenizacion.iterar_tokens) y puntúan 0.
+
+Los lemas candidatos de una forma (ya normalizada: minúsculas, sin tildes) salen de:
+
+  1. FORMAS_IRREGULARES: tabla forma -> lemas de los verbos irregulares más
+     frecuentes ("voy" -> "ir", "puede" -> "poder", "sido" -> "ser").
+  2. Una tabla de terminaciones precalculada al importar el módulo a partir de
+     los paradigmas de conjugación regular (-ar, -er, -ir), los cambios
+     ortográficos de la raíz (indique -> indicar, llegue -> llegar,
+     agradezco -> agradecer), los pronombres enclíticos (ayudarle,
+     describirme) y la flexión nominal de número y género (tardes -> tarde,
+     atenta -> atento, veces -> vez). Se prueban de la terminación más larga a
+     la más corta, así que cada forma cuesta unas pocas consultas a diccionario.
+
+Sin análisis sintáctico no se sabe la categoría de una forma, así que se evitan
+los casos en que el lema cambiaría de clase de palabra (y de puntaje):
+
+  - La primera persona del presente regular (-o) no se lematiza: coincide con
+    sustantivos ("cargo", "pago", "cambio") y en boca del hablante cambia de
+    sentido ("lamento las molestias" es una disculpa, no "lamentar").
+  - NO_LEMATIZAR lista sustantivos y determinantes frecuentes en las llamadas
+    que coinciden con una forma verbal o con un adjetivo femenino ("cuenta" no
+    es "contar", "falta" no es "falto", "estado" no es "estar").
+
+Los candidatos no dependen del vocabulario y se memorizan por forma en una
+caché LRU acotada: buscar el lema de una forma ya vista es una consulta a la
+caché más una a la tabla de vocabulario por candidato, hasta el primero que
+exista. Como el vocabulario se consulta en cada llamada, las palabras que se
+agregan (modo interactivo, WAL) se ven sin invalidar nada.
+
+Uso:
+  lema = buscar_lema("revisare", vocabulario)   # -> "revisar" si está en el vocabulario
+"""
+
+from functools import lru_cache
+from typing import Container, Dict, List, Optional, Tuple
+
+# Tamaño máximo de la caché de candidatos (formas distintas recordadas)
+MAX_CACHE_LEMAS = 65536
+# Las formas más cortas (artículos, pronombres, "mas", "les") no se recortan:
+# sólo se resuelven por la tabla de irregulares
+LARGO_MINIMO = 4
+# Letras que deben quedar de la raíz al quitar una terminación
+RAIZ_MINIMA = 2
+
+# Formas que se dejan como están aunque tengan lema candidato (ver arriba)
+NO_LEMATIZAR = frozenset("""
+    cuenta cuentas cuento cuentos falta faltas alta altas baja bajas estado estados
+    esta estas este estos ayuda ayudas encuentro encuentros llamada llamadas espera
+    queja quejas consulta consultas vuelta vueltas salida salidas entrada entradas
+    compra compras venta ventas factura facturas cobro cobros lamento lamentos
+    """.split())
+
+FORMAS_IRREGULARES: Dict[str, Tuple[str, ...]] = {}
+
+_IRREGULARES = {
+    "ser":    "soy eres es somos sois son fui fuiste fue fuimos fuisteis fueron era eras "
+              "eramos erais eran sere seras sera seremos sereis seran seria serias seriamos "
+              "seriais serian sea seas seamos seais sean fuera fueras fueramos fuerais "
+              "fueran fuese sido siendo",
+    "estar":  "estoy estas esta estamos estais estan estuve estuviste estuvo estuvimos "
+              "estuvisteis estuvieron estaba estabas estabamos estaban este estes esten "
+              "estado estando estuviera estuvieran",
+    "ir":     "voy vas va vamos vais van iba ibas ibamos iban ire iras iremos iran "
+              "iria irian vaya vayas vayamos vayan ido yendo",
+    "haber":  "he has ha hemos habeis han hay habia habias habiamos habian hube hubo "
+              "hubieron habra habran habria habrian haya hayas hayamos hayan hubiera "
+              "hubieran habido",
+    "tener":  "tengo tienes tiene tenemos teneis tienen tuve tuviste tuvo tuvimos "
+              "tuvieron tendre tendra tendremos tendran tendria tendrian tenga tengas "
+              "tengamos tengan tuviera tuvieran ten",
+    "hacer":  "hago haces hace hacemos haceis hacen hice hiciste hizo hicimos hicieron "
+              "hare haras hara haremos haran haria harian haga hagas hagamos hagan "
+              "hiciera hicieran hecho haz",
+    "poder":  "puedo puedes puede podemos podeis pueden pude pudiste pudo pudimos "
+              "pudieron podre podras podra podremos podran podria podrias podriamos "
+              "podrian pueda puedas podamos puedan pudiera pudieran pudiendo",
+    "decir":  "digo dices dice decimos decis dicen dije dijiste dijo dijimos dijeron "
+              "dire diras dira diremos diran diria dirian diga digas digamos digan "
+              "dijera dijeran dicho diciendo",
+    "ver":    "veo ves ve vemos veis ven vi viste vio vimos vieron vere veras vera veremos "
+              "veran veria verian vea veas veamos vean viera vieran visto viendo",
+    "dar":    "doy das da damos dais dan di diste dio dimos dieron dare daras dara "
+              "daremos daran daria darian des demos den diera dieran dado dando",
+    "saber":  "sabes sabe sabemos sabeis saben supe supiste supo supimos supieron "
+              "sabre sabra sabremos sabran sabria sabrian sepa sepas sepamos sepan "
+              "supiera supieran",
+    "querer": "quiero quieres quiere queremos quereis quieren quise quisiste quiso "
+              "quisimos quisieron querre querra querremos querran querria querrian "
+              "quiera quieras queramos quieran quisiera quisieran",
+    "poner":  "pongo pones pone ponemos poneis ponen puse pusiste puso pusimos pusieron "
+              "pondre pondra pondremos pondran pondria pondrian ponga pongas pongamos "
+              "pongan pusiera pusieran puesto pon",
+    "venir":  "vengo vienes viene venimos venis vienen vine viniste vinimos "
+              "vinieron vendre vendra vendremos vendran vendria vendrian venga vengas "
+              "vengamos vengan viniera vinieran viniendo",
+    "salir":  "salgo sales sale salimos salis salen saldre saldra saldremos saldran "
+              "saldria saldrian salga salgas salgamos salgan",
+    "traer":  "traigo traes trae traemos traen traje trajiste trajo trajimos trajeron "
+              "traiga traigas traigamos traigan trajera trajeran trayendo",
+    "seguir": "sigo sigues sigue seguimos siguen siguio siguieron siga sigas sigamos "
+              "sigan siguiendo",
+    "pedir":  "pido pides pide pedimos piden pidio pidieron pida pidas pidamos pidan "
+              "pidiera pidieran pidiendo",
+    "sentir": "siento sientes siente sentimos sienten sintio sintieron sienta sientas "
+              "sintamos sientan sintiera sintiendo",
+    "volver": "vuelvo vuelves vuelve volvemos vuelven vuelva vuelvas volvamos vuelvan "
+              "vuelto",
+    "encontrar": "encuentro encuentras encuentra encontramos encuentran encuentre "
+                 "encuentres encuentren",
+    "entender":  "entiendo entiendes entiende entendemos entienden entienda entiendas "
+                 "entiendan",
+    "pensar":    "pienso piensas piensa pensamos piensan piense pienses piensen",
+    "contar":    "cuento cuentas cuenta contamos cuentan cuente cuentes cuenten",
+    "resolver":  "resuelvo resuelves resuelve resolvemos resuelven resuelva resuelvan "
+                 "resuelto",
+}
+
+for _lema, _formas in _IRREGULARES.items():
+    for _forma in _formas.split():
+        FORMAS_IRREGULARES[_forma] = FORMAS_IRREGULARES.get(_forma, ()) + (_lema,)
+
+# Terminaciones de la conjugación regular (sin tildes), por terminación del infinitivo
+_PARADIGMAS = {
+    "ar": "as a amos ais an "                                     # presente (sin "-o")
+          "e aste amos asteis aron "                              # pretérito (sin "-ó" = "-o")
+          "aba abas abamos abais aban "                           # imperfecto
+          "are aras ara aremos areis aran "                       # futuro
+          "aria arias ariamos ariais arian "                      # condicional
+          "e es emos eis en "                                     # subjuntivo
+          "ara aras aramos arais aran ase ases asemos aseis asen "
+          "ad ando ado ada ados adas",                            # imperativo y no personales
+    "er": "es e emos eis en "
+          "i iste io imos isteis ieron "
+          "ia ias iamos iais ian "
+          "ere eras era eremos ereis eran "
+          "eria erias eriamos eriais erian "
+          "a as amos ais an "
+          "iera ieras ieramos ierais ieran iese ieses iesemos ieseis iesen "
+          "ed iendo ido ida idos idas",
+    "ir": "es e imos is en "
+          "i iste io imos isteis ieron "
+          "ia ias iamos iais ian "
+          "ire iras ira iremos ireis iran "
+          "iria irias iriamos iriais irian "
+          "a as amos ais an "
+          "iera ieras ieramos ierais ieran iese ieses iesemos ieseis iesen "
+          "id iendo ido ida idos idas",
+}
+
+# Formas que admiten pronombres enclíticos: infinitivo, gerundio e imperativos
+_CON_ENCLITICOS = {
+    "ar": "ar ando a e en",
+    "er": "er iendo e a an",
+    "ir": "ir iendo e a an",
+}
+_ENCLITICOS = "me te se le les lo los la las nos melo mela selo sela"
+
+# Cambios ortográficos de la raíz delante de ciertas vocales:
+# (terminación del infinitivo, raíz en el lema, raíz en la forma, vocal inicial)
+_ORTOGRAFICOS = (
+    ("car", "c", "qu", "e"),    # indicar -> indique
+    ("gar", "g", "gu", "e"),    # llegar -> llegue
+    ("zar", "z", "c", "e"),     # organizar -> organice
+    ("ger", "g", "j", "ao"),    # escoger -> escoja
+    ("gir", "g", "j", "ao"),    # dirigir -> dirija
+    ("guir", "gu", "g", "ao"),  # distinguir -> distinga
+    ("cer", "c", "zc", "ao"),   # agradecer -> agradezco
+    ("cir", "c", "zc", "ao"),   # conducir -> conduzca
+)
+
+# Flexión nominal: (terminación de la forma, terminación del lema)
+_NOMINALES = (
+    ("amente", "o"), ("mente", ""),      # atentamente -> atento, amablemente -> amable
+    ("ces", "z"),                        # veces -> vez
+    ("ones", "on"),                      # facturaciones -> facturacion
+    ("as", "o"), ("os", "o"), ("a", "o"),
+    ("es", ""), ("s", ""),
+)
+
+
+def _construir_sufijos() -> Dict[str, Tuple[str, ...]]:
+    """
+    Tabla { terminación de la forma: terminaciones posibles del lema }.
+    """
+    sufijos: Dict[str, List[str]] = {}
+
+    def agregar(terminacion: str, lema: str):
+        opciones = sufijos.setdefault(terminacion, [])
+        if lema not in opciones:
+            opciones.append(lema)
+
+    for infinitivo, terminaciones in _PARADIGMAS.items():
+        for terminacion in terminaciones.split():
+            agregar(terminacion, infinitivo)
+        for base in _CON_ENCLITICOS[infinitivo].split():
+            for pronombre in _ENCLITICOS.split():
+                agregar(base + pronombre, infinitivo)
+
+    for infinitivo, raiz_lema, raiz_forma, vocales in _ORTOGRAFICOS:
+        for terminacion in _PARADIGMAS[infinitivo[-2:]].split():
+            if terminacion[0] in vocales:
+                agregar(raiz_forma + terminacion, raiz_lema + infinitivo[-2:])
+        if "o" in vocales:
+            # Primera persona con la raíz cambiada (agradezco, escojo): sólo verbal
+            agregar(raiz_forma + "o", infinitivo)
+        if vocales == "e":
+            # Imperativo de cortesía con enclítico: indiqueme, expliquele
+            for pronombre in _ENCLITICOS.split():
+                agregar(raiz_forma + "e" + pronombre, infinitivo)
+
+    for terminacion, lema in _NOMINALES:
+        agregar(terminacion, lema)
+    return {terminacion: tuple(lemas) for terminacion, lemas in sufijos.items()}
+
+
+_SUFIJOS = _construir_sufijos()
+_MAX_SUFIJO = max(map(len, _SUFIJOS))
+
+
+@lru_cache(maxsize=MAX_CACHE_LEMAS)
+def candidatos(forma: str) -> Tuple[str, ...]:
+    """
+    Lemas candidatos de 'forma' (normalizada), en orden de preferencia. Las
+    formas de la tabla de irregulares sólo tienen esos lemas; las demás, el
+    singular (si terminan en "s") y luego los de las terminaciones, de la más
+    larga a la más corta. No incluye a la forma misma; las de NO_LEMATIZAR no
+    tienen candidatos.
+    """
+    if forma in NO_LEMATIZAR:
+        return ()
+    if forma in FORMAS_IRREGULARES:
+        return FORMAS_IRREGULARES[forma]
+    resultado = []
+    if len(forma) >= LARGO_MINIMO:
+        if forma[-1] == "s":
+            # El plural simple va primero: "formas" es antes "forma" que "formar"
+            resultado.append(forma[:-1])
+        for largo in range(min(_MAX_SUFIJO, len(forma) - RAIZ_MINIMA), 0, -1):
+            lemas = _SUFIJOS.get(forma[-largo:])
+            if not lemas:
+                continue
+            raiz = forma[:-largo]
+            for terminacion in lemas:
+                lema = raiz + terminacion
+                if lema != forma and lema not in resultado:
+                    resultado.append(lema)
+    return tuple(resultado)
+
+
+def buscar_lema(forma: str, vocabulario: Container[str]) -> Optional[str]:
+    """
+    Primer lema candidato de 'forma' que está en 'vocabulario', o None.
+    Ej: buscar_lema("revisare", vocab) -> "revisar"
+    """
+    for lema in candidatos(forma):
+        if lema in vocabulario:
+            return lema
+    return None
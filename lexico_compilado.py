@@ -0,0 +1,283 @@
+#!/usr/bin/env python3
+"""
+Formato binario compilado del vocabulario (palabra, categoría, puntaje).
+
+El archivo se genera a partir de vocabulario_sentimiento.csv y se abre con mmap,
+de modo que varios procesos comparten una única copia en memoria (las páginas
+del sistema operativo) y el arranque no necesita parsear el CSV.
+
+Estructura (little-endian, secciones alineadas a 4 bytes):
+  cabecera:    MAGIA, versión, n_palabras, n_categorias, n_slots,
+               y el offset de cada sección
+  categorias:  nombres de categoría separados por '\\n' (UTF-8)
+  offsets:     uint32[n_palabras + 1], inicio de cada palabra en 'textos'
+  cat_ids:     uint8[n_palabras], índice de la categoría de cada palabra
+  puntajes:    int32[n_palabras]
+  slots:       uint32[n_slots], tabla hash (direccionamiento abierto, índice+1)
+  textos:      palabras separadas por '\\n' (UTF-8), en el orden del CSV
+
+Uso:
+  python lexico_compilado.py compile [vocabulario.csv] [-o salida.lexc]
+"""
+
+import mmap
+import os
+import struct
+import sys
+import zlib
+from array import array
+from collections.abc import Mapping
+from typing import Dict, Iterator, Optional, Tuple
+
+from almacen_lexico import ruta_wal
+
+MAGIA = b"LEXC"
+VERSION = 1
+# magia, versión, n_palabras, n_categorias, n_slots, y 6 offsets de sección
+_CABECERA = struct.Struct("<4sIIII6I")
+EXTENSION = ".lexc"
+
+
+def ruta_compilada(path_csv: str) -> str:
+    """
+    Ruta del artefacto compilado asociado a un CSV.
+    Ej: "vocabulario_sentimiento.csv" -> "vocabulario_sentimiento.lexc"
+    """
+    return os.path.splitext(path_csv)[0] + EXTENSION
+
+
+def compilado_vigente(path_csv: str) -> Optional[str]:
+    """
+    Devuelve la ruta del compilado si existe y es al menos tan nuevo como el CSV
+    (o si el CSV no existe) y que las palabras pendientes del WAL; si no, None.
+    """
+    ruta = ruta_compilada(path_csv)
+    if not os.path.isfile(ruta):
+        return None
+    mtime = os.path.getmtime(ruta)
+    if os.path.isfile(path_csv) and mtime < os.path.getmtime(path_csv):
+        return None
+    wal = ruta_wal(path_csv)
+    if os.path.isfile(wal) and os.path.getsize(wal) and mtime < os.path.getmtime(wal):
+        return None
+    return ruta
+
+
+def _alinear(n: int) -> int:
+    return (n + 3) & ~3
+
+
+def _hash(palabra: bytes) -> int:
+    # crc32 es estable entre procesos (a diferencia de hash()) y corre en C
+    return zlib.crc32(palabra)
+
+
+def compilar_lexico(vocab: Dict[str, Tuple[str,int]], path_salida: str) -> int:
+    """
+    Escribe 'vocab' ({ palabra: (categoria, puntaje) }) en formato compilado.
+    La escritura es atómica (archivo temporal + os.replace).
+    Devuelve la cantidad de palabras escritas.
+    """
+    if sys.byteorder != "little":
+        raise RuntimeError("El formato compilado sólo se genera en plataformas little-endian")
+
+    categorias = []
+    cat_index = {}
+    textos = bytearray()
+    offsets = array("I")
+    cat_ids = array("B")
+    puntajes = array("i")
+    palabras_bytes = []
+
+    for palabra, (categoria, puntaje) in vocab.items():
+        if "\n" in palabra or "\n" in categoria:
+            raise ValueError(f"Entrada inválida en el vocabulario: {palabra!r}")
+        if categoria not in cat_index:
+            if len(categorias) > 255:
+                raise ValueError("Demasiadas categorías para el formato compilado")
+            cat_index[categoria] = len(categorias)
+            categorias.append(categoria)
+        b = palabra.encode("utf-8")
+        palabras_bytes.append(b)
+        offsets.append(len(textos))
+        textos += b + b"\n"
+        cat_ids.append(cat_index[categoria])
+        puntajes.append(puntaje)
+    offsets.append(len(textos))
+
+    # Tabla hash con factor de carga <= 0.5
+    n = len(palabras_bytes)
+    n_slots = 1
+    while n_slots < 2 * n:
+        n_slots *= 2
+    mascara = n_slots - 1
+    slots = array("I", bytes(4 * n_slots))
+    for i, b in enumerate(palabras_bytes):
+        j = _hash(b) & mascara
+        while slots[j]:
+            j = (j + 1) & mascara
+        slots[j] = i + 1
+
+    secciones = [
+        "\n".join(categorias).encode("utf-8"),
+        offsets.tobytes(),
+        cat_ids.tobytes(),
+        puntajes.tobytes(),
+        slots.tobytes(),
+        bytes(textos),
+    ]
+    posiciones = []
+    pos = _CABECERA.size
+    for datos in secciones:
+        posiciones.append(pos)
+        pos = _alinear(pos + len(datos))
+
+    tmp = path_salida + ".tmp"
+    with open(tmp, "wb") as f:
+        f.write(_CABECERA.pack(MAGIA, VERSION, n, len(categorias), n_slots, *posiciones))
+        for inicio, datos in zip(posiciones, secciones):
+            f.write(b"\0" * (inicio - f.tell()))
+            f.write(datos)
+    os.replace(tmp, path_salida)
+    return n
+
+
+class LexicoCompilado(Mapping):
+    """
+    Vista de sólo lectura, respaldada por mmap, de un vocabulario compilado.
+    Se comporta como el dict de cargar_vocabulario: { palabra: (categoria, puntaje) }.
+    """
+
+    def __init__(self, ruta: str):
+        self.ruta = ruta
+        with open(ruta, "rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        (magia, version, n, n_cat, n_slots,
+         p_cat, p_off, p_ids, p_punt, p_slots, p_txt) = _CABECERA.unpack_from(self._mm, 0)
+        if magia != MAGIA or version != VERSION:
+            raise ValueError(f"{ruta} no es un vocabulario compilado válido")
+
+        vista = memoryview(self._mm)
+        self._n = n
+        # La sección de categorías puede terminar con relleno de alineación
+        tabla_cat = bytes(vista[p_cat:p_off]).rstrip(b"\0")
+        self._categorias = tabla_cat.decode("utf-8").split("\n") if n_cat else []
+        self._offsets = vista[p_off:p_off + 4 * (n + 1)].cast("I")
+        self._cat_ids = vista[p_ids:p_ids + n]
+        self._puntajes = vista[p_punt:p_punt + 4 * n].cast("i")
+        self._slots = vista[p_slots:p_slots + 4 * n_slots].cast("I")
+        self._mascara = n_slots - 1
+        self._p_txt = p_txt
+
+    def _palabra_bytes(self, i: int) -> bytes:
+        inicio = self._p_txt + self._offsets[i]
+        fin = self._p_txt + self._offsets[i + 1] - 1  # sin el '\n'
+        return self._mm[inicio:fin]
+
+    def _buscar(self, palabra) -> int:
+        """
+        Índice de 'palabra' en el vocabulario, o -1 si no está.
+        """
+        if not isinstance(palabra, str) or not self._n:
+            return -1
+        b = palabra.encode("utf-8")
+        j = _hash(b) & self._mascara
+        while True:
+            idx = self._slots[j]
+            if not idx:
+                return -1
+            if self._palabra_bytes(idx - 1) == b:
+                return idx - 1
+            j = (j + 1) & self._mascara
+
+    def __getitem__(self, palabra: str) -> Tuple[str,int]:
+        i = self._buscar(palabra)
+        if i < 0:
+            raise KeyError(palabra)
+        return self._categorias[self._cat_ids[i]], self._puntajes[i]
+
+    def __contains__(self, palabra) -> bool:
+        return self._buscar(palabra) >= 0
+
+    def __len__(self) -> int:
+        return self._n
+
+    def palabras(self):
+        """
+        Lista de palabras en el orden original del CSV (un único decode).
+        """
+        if not self._n:
+            return []
+        fin = self._p_txt + self._offsets[self._n] - 1
+        return self._mm[self._p_txt:fin].decode("utf-8").split("\n")
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.palabras())
+
+    def puntajes(self) -> "VistaPuntajes":
+        """
+        Vista { palabra: puntaje } (el lexicón de análisis de sentimiento).
+        """
+        return VistaPuntajes(self)
+
+    def a_dict(self) -> Dict[str, Tuple[str,int]]:
+        """
+        Materializa el vocabulario como dict { palabra: (categoria, puntaje) }.
+        """
+        cats = [self._categorias[c] for c in self._cat_ids]
+        return dict(zip(self.palabras(), zip(cats, self._puntajes.tolist())))
+
+    def cerrar(self):
+        self._offsets.release()
+        self._cat_ids.release()
+        self._puntajes.release()
+        self._slots.release()
+        self._mm.close()
+
+
+class VistaPuntajes(Mapping):
+    """
+    Vista { palabra: puntaje } sobre un LexicoCompilado.
+    """
+
+    def __init__(self, lexico: LexicoCompilado):
+        self._lexico = lexico
+
+    def __getitem__(self, palabra: str) -> int:
+        i = self._lexico._buscar(palabra)
+        if i < 0:
+            raise KeyError(palabra)
+        return self._lexico._puntajes[i]
+
+    def __contains__(self, palabra) -> bool:
+        return self._lexico._buscar(palabra) >= 0
+
+    def __len__(self) -> int:
+        return len(self._lexico)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._lexico)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Vocabulario compilado (binario, mmap).")
+    sub = parser.add_subparsers(dest="comando", required=True)
+    p_comp = sub.add_parser("compile", aliases=["compilar"],
+                            help="Compila el CSV de vocabulario a formato binario")
+    p_comp.add_argument("csv", nargs="?", default="vocabulario_sentimiento.csv")
+    p_comp.add_argument("-o", "--salida", default=None,
+                        help=f"Archivo de salida (por defecto, el CSV con extensión {EXTENSION})")
+    args = parser.parse_args()
+
+    from tokenizacion import cargar_vocabulario
+
+    if not os.path.isfile(args.csv):
+        print(f"[ERROR] No se encontró {args.csv}")
+        sys.exit(1)
+
+    salida = args.salida or ruta_compilada(args.csv)
+    n = compilar_lexico(cargar_vocabulario(args.csv, usar_compilado=False), salida)
+    print(f"✅ {n} palabras compiladas en '{salida}'.")
@@ -0,0 +1,247 @@
+"""
+Línea de tiempo del sentimiento de una llamada, por turno y por ventana deslizante.
+
+analizar_sentimiento da un único total para toda la llamada; para saber en qué
+momento se arruinó, LineaTiempo acumula un punto por turno (en orden
+cronológico, agente y cliente intercalados) con:
+
+  puntaje         suma de los pesos del turno
+  ventana         suma de los pesos de los últimos 'ventana_tokens' tokens de la
+                  llamada al terminar el turno (de ambos hablantes)
+  ventana_min     el mínimo de esa suma dentro del turno (dónde tocó fondo)
+  ventana_tiempo  suma de los puntajes de los turnos que terminaron en los
+                  'ventana_s' segundos previos al último fin visto (sólo con
+                  tiempos de diarización)
+  acumulado       suma de todos los pesos hasta el final del turno
+
+Las sumas móviles se actualizan en O(1) por token (una deque con la suma
+corriente: al entrar un peso se suma y se resta el que sale) y en O(log n)
+por turno la ventana por tiempo (un heap por fin de turno: con turnos
+superpuestos o anidados los fines no llegan en orden), así que la línea se
+arma incrementalmente a medida que llegan los turnos
+(transcripcion_streaming.py) sin recorrer de nuevo lo ya procesado.
+
+Los tiempos de cada turno son los de la diarización (transcribir_con_diarizacion
+los guarda junto a la transcripción, ver guardar_tiempos); sin ellos los puntos
+quedan indexados sólo por número de turno.
+
+Uso:
+  linea = LineaTiempo(lexicon)
+  analizador.feed_muchos(linea.registrar(iterar_tokens(texto, vocab), "agente", 0.0, 3.2),
+                         hablante="agente")
+  linea.guardar("linea_tiempo.json")
+"""
+
+import heapq
+import os
+from collections import deque
+from typing import Dict, Iterable, Iterator, List, Mapping, NamedTuple, Optional, Tuple
+
+VENTANA_TOKENS = 30
+VENTANA_S = 30.0
+EXTENSION_TIEMPOS = ".tiempos.json"
+
+
+class PuntoTurno(NamedTuple):
+    turno: int
+    hablante: str
+    inicio_s: Optional[float]
+    fin_s: Optional[float]
+    tokens: int
+    puntaje: int
+    ventana: int
+    ventana_min: int
+    ventana_tiempo: Optional[int]
+    acumulado: int
+
+
+class LineaTiempo:
+    """
+    Línea de tiempo incremental: un PuntoTurno por turno registrado.
+    Los pesos salen del lexicón, como en AnalizadorLlamada (los tokens fuera
+    del lexicón pesan 0 pero ocupan su lugar en la ventana).
+    """
+
+    def __init__(self, lexicon: Mapping[str, int], ventana_tokens: int = VENTANA_TOKENS,
+                 ventana_s: float = VENTANA_S):
+        if ventana_tokens < 1:
+            raise ValueError("ventana_tokens debe ser al menos 1")
+        self.lexicon = lexicon
+        self.ventana_tokens = ventana_tokens
+        self.ventana_s = ventana_s
+        self.puntos: List[PuntoTurno] = []
+
+        self._pesos: deque = deque(maxlen=ventana_tokens)
+        self._suma_ventana = 0
+        self._acumulado = 0
+        # Turnos con tiempo dentro de la ventana por tiempo: heap de (fin_s, turno, puntaje)
+        self._recientes: List[Tuple[float, int, int]] = []
+        self._suma_recientes = 0
+        self._ultimo_fin_s: Optional[float] = None
+        # Estado del turno en curso
+        self._tokens_turno = 0
+        self._puntaje_turno = 0
+        self._min_turno = 0
+
+    def __len__(self) -> int:
+        return len(self.puntos)
+
+    def registrar(
+        self,
+        tokens_info: Iterable[Tuple[str, str, int]],
+        hablante: str,
+        inicio_s: Optional[float] = None,
+        fin_s: Optional[float] = None
+    ) -> Iterator[Tuple[str, str, int]]:
+        """
+        Registra un turno a medida que se consumen sus tripletas y las vuelve a
+        producir sin cambios, para encadenarlo con AnalizadorLlamada.feed_muchos
+        (una sola pasada por los tokens). El punto del turno se agrega al
+        agotarse (o cerrarse) el generador.
+        """
+        self._abrir_turno()
+        try:
+            for tripleta in tokens_info:
+                self._sumar(self.lexicon.get(tripleta[0], 0))
+                yield tripleta
+        finally:
+            self._cerrar_turno(hablante, inicio_s, fin_s)
+
+    def agregar_turno(
+        self,
+        tokens_info: Iterable[Tuple[str, str, int]],
+        hablante: str,
+        inicio_s: Optional[float] = None,
+        fin_s: Optional[float] = None
+    ) -> PuntoTurno:
+        """
+        Consume las tripletas de un turno y devuelve su punto.
+        """
+        for _ in self.registrar(tokens_info, hablante, inicio_s, fin_s):
+            pass
+        return self.puntos[-1]
+
+    def peor_momento(self) -> Optional[PuntoTurno]:
+        """
+        Turno donde la ventana por tokens tocó su mínimo (el primero, si hay
+        empate), o None si la ventana nunca fue negativa.
+        """
+        peor = min(self.puntos, key=lambda p: p.ventana_min, default=None)
+        return peor if peor is not None and peor.ventana_min < 0 else None
+
+    def serie(self) -> Dict[str, object]:
+        """
+        Serie compacta (columnas en listas paralelas, una posición por turno).
+        'hablantes' es un string con la inicial de cada turno ("A"gente, "C"liente).
+        Las columnas de tiempo sólo se incluyen si algún turno tiene tiempos.
+        """
+        serie: Dict[str, object] = {
+            "ventana_tokens": self.ventana_tokens,
+            "turnos":         len(self.puntos),
+            "hablantes":      "".join(p.hablante[:1].upper() for p in self.puntos),
+            "tokens":         [p.tokens for p in self.puntos],
+            "puntaje":        [p.puntaje for p in self.puntos],
+            "ventana":        [p.ventana for p in self.puntos],
+            "ventana_min":    [p.ventana_min for p in self.puntos],
+            "acumulado":      [p.acumulado for p in self.puntos],
+        }
+        if any(p.fin_s is not None for p in self.puntos):
+            serie["ventana_s"] = self.ventana_s
+            serie["inicio_s"] = [_redondear(p.inicio_s) for p in self.puntos]
+            serie["fin_s"] = [_redondear(p.fin_s) for p in self.puntos]
+            serie["ventana_tiempo"] = [p.ventana_tiempo for p in self.puntos]
+        peor = self.peor_momento()
+        serie["peor_turno"] = peor.turno if peor else None
+        return serie
+
+    def guardar(self, ruta: str):
+        """
+        Escribe la serie compacta en JSON (una línea, sin espacios).
+        """
+        import json  # sólo al exportar
+
+        with open(ruta, "w", encoding="utf-8") as f:
+            json.dump(self.serie(), f, ensure_ascii=False, separators=(",", ":"))
+            f.write("\n")
+
+    # --- internos ---
+
+    def _abrir_turno(self):
+        self._tokens_turno = 0
+        self._puntaje_turno = 0
+        self._min_turno = self._suma_ventana
+
+    def _sumar(self, peso: int):
+        if len(self._pesos) == self.ventana_tokens:
+            self._suma_ventana -= self._pesos[0]  # la deque lo descarta al agregar
+        self._pesos.append(peso)
+        self._suma_ventana += peso
+        self._acumulado += peso
+        self._tokens_turno += 1
+        self._puntaje_turno += peso
+        if self._suma_ventana < self._min_turno:
+            self._min_turno = self._suma_ventana
+
+    def _cerrar_turno(self, hablante: str, inicio_s: Optional[float], fin_s: Optional[float]):
+        ventana_tiempo = None
+        if fin_s is not None:
+            heapq.heappush(self._recientes, (fin_s, len(self.puntos), self._puntaje_turno))
+            self._suma_recientes += self._puntaje_turno
+            # La ventana termina en el último fin visto, no en el de este turno
+            # (un turno anidado termina antes que el que lo contiene)
+            if self._ultimo_fin_s is None or fin_s > self._ultimo_fin_s:
+                self._ultimo_fin_s = fin_s
+            while self._recientes[0][0] < self._ultimo_fin_s - self.ventana_s:
+                self._suma_recientes -= heapq.heappop(self._recientes)[2]
+            ventana_tiempo = self._suma_recientes
+        self.puntos.append(PuntoTurno(
+            turno=len(self.puntos),
+            hablante=hablante,
+            inicio_s=inicio_s,
+            fin_s=fin_s,
+            tokens=self._tokens_turno,
+            puntaje=self._puntaje_turno,
+            ventana=self._suma_ventana,
+            ventana_min=self._min_turno,
+            ventana_tiempo=ventana_tiempo,
+            acumulado=self._acumulado,
+        ))
+
+
+def _redondear(valor: Optional[float]) -> Optional[float]:
+    return None if valor is None else round(valor, 2)
+
+
+def ruta_tiempos(ruta_transcripcion: str) -> str:
+    """
+    Archivo con los tiempos de diarización de una transcripción:
+    "transcripcion.txt" -> "transcripcion.tiempos.json".
+    """
+    return os.path.splitext(ruta_transcripcion)[0] + EXTENSION_TIEMPOS
+
+
+def guardar_tiempos(ruta_transcripcion: str, tiempos: List[Tuple[float, float]]):
+    """
+    Guarda [inicio_s, fin_s] de cada línea de la transcripción, en orden.
+    """
+    import json
+
+    with open(ruta_tiempos(ruta_transcripcion), "w", encoding="utf-8") as f:
+        json.dump([[_redondear(a), _redondear(b)] for a, b in tiempos], f, separators=(",", ":"))
+
+
+def leer_tiempos(ruta_transcripcion: str) -> Optional[List[Tuple[float, float]]]:
+    """
+    Tiempos guardados por guardar_tiempos para la transcripción, o None si no
+    hay o son más viejos que la transcripción (se editó o se regeneró sin ellos).
+    """
+    import json
+
+    ruta = ruta_tiempos(ruta_transcripcion)
+    try:
+        if os.path.getmtime(ruta) < os.path.getmtime(ruta_transcripcion):
+            return None
+        with open(ruta, encoding="utf-8") as f:
+            return [(a, b) for a, b in json.load(f)]
+    except (OSError, ValueError):
+        return None
@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+Punto de entrada único: un subcomando por herramienta del proyecto.
+
+Este módulo no importa nada del proyecto: cada subcomando ejecuta el script
+correspondiente (como si se lo llamara directamente, con los mismos argumentos)
+recién cuando se lo elige. Así "llamadas.py --help" o "llamadas.py analizar"
+no pagan el import de torch / whisper / pyannote, que sólo se cargan al
+transcribir audio.
+
+Uso:
+  python llamadas.py analizar [transcripcion.txt] [--interactivo]
+  python llamadas.py transcribir llamada.wav [--workers N] [--servidor URL]
+  python llamadas.py <subcomando> --help
+"""
+
+import os
+import runpy
+import sys
+
+# subcomando -> (módulo, descripción)
+SUBCOMANDOS = {
+    "analizar":    ("main", "Sentimiento y protocolo de una transcripción de texto"),
+    "transcribir": ("transcripcion", "Diarización y transcripción de un WAV (Whisper + pyannote)"),
+    "streaming":   ("transcripcion_streaming", "Transcripción y análisis en streaming"),
+    "lote":        ("lote", "Análisis de muchas transcripciones en paralelo"),
+    "servidor":    ("servidor_analisis", "Servicio de análisis de texto (JSON por línea)"),
+    "modelos":     ("servidor_modelos", "Servidor con Whisper y pyannote ya cargados"),
+    "compilar":    ("lexico_compilado", "Vocabulario compilado (binario, mmap)"),
+    "vocabulario": ("almacen_lexico", "WAL del vocabulario: estado y compactación"),
+    "corpus":      ("puntaje_corpus", "Indexado y puntuación vectorizada de un corpus"),
+    "indice":      ("indice_incremental", "Índice de conteos con re-puntuación incremental"),
+    "cache":       ("cache_diarizacion", "Caché de diarización y transcripción"),
+}
+
+
+def uso() -> str:
+    programa = os.path.basename(sys.argv[0])
+    lineas = [f"uso: {programa} <subcomando> [argumentos...]", "", "subcomandos:"]
+    for nombre, (_, descripcion) in SUBCOMANDOS.items():
+        lineas.append(f"  {nombre:<13}{descripcion}")
+    lineas.append("")
+    lineas.append(f"Ayuda de cada uno: {programa} <subcomando> --help")
+    return "\n".join(lineas)
+
+
+def main(argv=None) -> None:
+    argv = sys.argv[1:] if argv is None else argv
+    if not argv or argv[0] in ("-h", "--help"):
+        print(uso())
+        return
+    nombre, resto = argv[0], argv[1:]
+    if nombre not in SUBCOMANDOS:
+        print(f"[ERROR] Subcomando desconocido: '{nombre}'\n\n{uso()}", file=sys.stderr)
+        sys.exit(2)
+
+    modulo, _ = SUBCOMANDOS[nombre]
+    # El script ve sólo sus propios argumentos (runpy pone su ruta en sys.argv[0])
+    sys.argv = [sys.argv[0], *resto]
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    runpy.run_module(modulo, run_name="__main__", alter_sys=True)
+
+
+if __name__ == "__main__":
+    main()
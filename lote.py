@@ -0,0 +1,211 @@
+#!/usr/bin/env python3
+"""
+Procesamiento por lotes de transcripciones.
+
+Carga el vocabulario una sola vez, reparte el pipeline (tokenización,
+sentimiento y protocolo) entre varios procesos y escribe un reporte agregado
+en JSONL o CSV. El orden de salida sigue el orden (alfabético) de los archivos,
+sin importar la cantidad de procesos.
+
+Uso:
+  python lote.py <directorio|glob> [--salida reporte.jsonl|reporte.csv] [--workers N]
+"""
+
+import argparse
+import csv
+import glob
+import json
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Tuple
+
+from tokenizacion import cargar_vocabulario
+from sugerencias import IndiceSugerencias
+from lexico_compilado import LexicoCompilado, compilado_vigente
+from automata_frases import AutomataFrases
+from almacen_lexico import AlmacenLexico
+from main import VOC_LEX_CSV, analizar_transcripcion, lexicon_desde_vocabulario
+
+# Estado compartido de cada proceso (se carga una vez en _inicializar_worker)
+_vocab_catalog: Dict[str, Tuple[str,int]] = {}
+_lexicon: Dict[str, int] = {}
+_indice: IndiceSugerencias = None
+_automata: AutomataFrases = None
+_almacen: AlmacenLexico = None
+
+COLUMNAS_CSV = [
+    "archivo", "sentimiento_general", "puntaje_total",
+    "count_positivas", "palabra_mas_positiva", "count_negativas", "palabra_mas_negativa",
+    "saludo", "identificacion", "rudas", "despedida", "tokens_no_reconocidos"
+]
+
+
+def listar_transcripciones(patron: str) -> List[str]:
+    """
+    Devuelve las rutas a procesar, ordenadas. 'patron' puede ser un directorio
+    (se toman sus archivos *.txt) o un glob.
+    """
+    if os.path.isdir(patron):
+        patron = os.path.join(patron, "*.txt")
+    return sorted(p for p in glob.glob(patron) if os.path.isfile(p))
+
+
+def _inicializar_worker(vocab_catalog: Dict[str, Tuple[str,int]], lexicon: Dict[str,int],
+                        ruta_compilada: str = None):
+    """
+    Recibe el vocabulario ya cargado por el proceso principal (o abre el
+    vocabulario compilado con mmap, compartido entre todos los workers) y
+    construye el índice de sugerencias y el autómata de frases una vez por worker.
+    """
+    global _vocab_catalog, _lexicon, _indice, _automata, _almacen
+    if ruta_compilada:
+        lexico = LexicoCompilado(ruta_compilada)
+        vocab_catalog, lexicon = lexico, lexico.puntajes()
+    _vocab_catalog = vocab_catalog
+    _lexicon = lexicon
+    _indice = IndiceSugerencias(vocab_catalog.keys())
+    _automata = AutomataFrases.desde_vocabulario(vocab_catalog)
+    _almacen = AlmacenLexico(VOC_LEX_CSV)
+    _almacen.sincronizado()
+
+
+def _refrescar_vocabulario():
+    """
+    Incorpora las palabras que otros procesos agregaron al vocabulario (WAL o
+    compactación) desde la última solicitud. Sin cambios cuesta dos stat().
+    """
+    global _vocab_catalog, _lexicon, _automata
+    if not _almacen.hay_cambios():
+        return
+    if not isinstance(_vocab_catalog, dict):
+        # El vocabulario compilado es de sólo lectura: pasar a un dict
+        _vocab_catalog = _vocab_catalog.a_dict()
+        _lexicon = lexicon_desde_vocabulario(_vocab_catalog)
+    cambios = _almacen.actualizar(_vocab_catalog)
+    for palabra, (categoria, puntaje) in cambios.items():
+        _lexicon[palabra] = puntaje
+        _indice.agregar(palabra)
+    if any(categoria != "otros" for categoria, _ in cambios.values()):
+        _automata = AutomataFrases.desde_vocabulario(_vocab_catalog)
+
+
+def procesar_texto(full_transcript: str) -> dict:
+    """
+    Analiza el texto de una transcripción con el vocabulario del worker y
+    devuelve sentimiento, protocolo y tokens no reconocidos (serializable a JSON).
+    """
+    _refrescar_vocabulario()
+    resultado = analizar_transcripcion(full_transcript, _vocab_catalog, _lexicon,
+                                       indice=_indice, automata=_automata)
+    return {
+        "sentimiento": resultado["sentimiento"],
+        "protocolo":   resultado["protocolo"],
+        "tokens_no_reconocidos": {
+            **resultado["sugerencias_agente"], **resultado["sugerencias_cliente"]
+        }
+    }
+
+
+def procesar_archivo(ruta: str) -> dict:
+    """
+    Analiza una transcripción y devuelve un registro serializable a JSON.
+    """
+    try:
+        with open(ruta, encoding="utf-8") as f:
+            full_transcript = f.read()
+        return {"archivo": ruta, **procesar_texto(full_transcript)}
+    except Exception as e:
+        return {"archivo": ruta, "error": str(e)}
+
+
+def procesar_lote(rutas: List[str], vocab_catalog: Dict[str, Tuple[str,int]],
+                  lexicon: Dict[str,int], workers: int = None, ruta_compilada: str = None):
+    """
+    Procesa 'rutas' con un pool de procesos. Devuelve un generador de registros
+    en el mismo orden que 'rutas'. Si se indica 'ruta_compilada', los workers
+    mapean ese archivo en lugar de recibir una copia de los diccionarios.
+    """
+    if workers == 1:
+        _inicializar_worker(vocab_catalog, lexicon, ruta_compilada)
+        yield from map(procesar_archivo, rutas)
+        return
+
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        initializer=_inicializar_worker,
+        initargs=(vocab_catalog, lexicon, ruta_compilada)
+    ) as pool:
+        # chunksize > 1 reduce la comunicación entre procesos en lotes grandes
+        chunksize = max(1, len(rutas) // (4 * (workers or os.cpu_count() or 1)))
+        yield from pool.map(procesar_archivo, rutas, chunksize=chunksize)
+
+
+def _fila_csv(registro: dict) -> dict:
+    if "error" in registro:
+        return {"archivo": registro["archivo"], "sentimiento_general": f"ERROR: {registro['error']}"}
+    sent = registro["sentimiento"]
+    prot = registro["protocolo"]
+    return {
+        "archivo":              registro["archivo"],
+        "sentimiento_general":  sent["sentimiento_general"],
+        "puntaje_total":        sent["puntaje_total"],
+        "count_positivas":      sent["count_positivas"],
+        "palabra_mas_positiva": sent["palabra_mas_positiva"][0] or "",
+        "count_negativas":      sent["count_negativas"],
+        "palabra_mas_negativa": sent["palabra_mas_negativa"][0] or "",
+        "saludo":               prot["saludo"]["ok"],
+        "identificacion":       prot["identificacion"]["ok"],
+        "rudas":                " ".join(prot["rudas"]["lista"]),
+        "despedida":            prot["despedida"]["ok"],
+        "tokens_no_reconocidos": len(registro["tokens_no_reconocidos"])
+    }
+
+
+def escribir_reporte(registros, ruta_salida: str) -> int:
+    """
+    Escribe los registros en 'ruta_salida' (CSV si termina en .csv, si no JSONL).
+    Devuelve la cantidad de registros escritos.
+    """
+    total = 0
+    with open(ruta_salida, "w", encoding="utf-8", newline="") as f:
+        if ruta_salida.lower().endswith(".csv"):
+            writer = csv.DictWriter(f, fieldnames=COLUMNAS_CSV)
+            writer.writeheader()
+            for registro in registros:
+                writer.writerow(_fila_csv(registro))
+                total += 1
+        else:
+            for registro in registros:
+                f.write(json.dumps(registro, ensure_ascii=False) + "\n")
+                total += 1
+    return total
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Análisis por lotes de transcripciones.")
+    parser.add_argument("entrada", help="Directorio (se toman los *.txt) o glob de transcripciones")
+    parser.add_argument("--salida", default="reporte_lote.jsonl",
+                        help="Archivo de reporte (.jsonl o .csv)")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="Cantidad de procesos (por defecto, uno por núcleo)")
+    args = parser.parse_args()
+
+    rutas = listar_transcripciones(args.entrada)
+    if not rutas:
+        print(f"[ERROR] No se encontraron transcripciones en {args.entrada}")
+        sys.exit(1)
+
+    # El vocabulario se carga una sola vez y se comparte con los workers:
+    # si hay un compilado vigente, cada worker lo mapea en memoria.
+    ruta_lexc = compilado_vigente(VOC_LEX_CSV)
+    if ruta_lexc:
+        vocab_catalog, lexicon = None, None
+    else:
+        vocab_catalog = cargar_vocabulario(VOC_LEX_CSV)
+        lexicon = lexicon_desde_vocabulario(vocab_catalog)
+
+    print(f"📂 Procesando {len(rutas)} transcripciones...")
+    registros = procesar_lote(rutas, vocab_catalog, lexicon, args.workers, ruta_lexc)
+    total = escribir_reporte(registros, args.salida)
+    print(f"✅ Reporte de {total} transcripciones guardado en '{args.salida}'.")
@@ -1,9 +1,15 @@
 import os
 import sys
-import csv
-from tokenizacion import cargar_vocabulario, tokenizar_texto
-from analizador_de_sentimiento import analizar_sentimiento
-from protocolo import verificar_protocolo
+from typing import Iterable, Iterator
+import metricas
+from tokenizacion import cargar_vocabulario, iterar_tokens
+from utils import extraer_lexemas
+from analizador_llamada import AnalizadorLlamada
+from sugerencias import IndiceSugerencias
+from lexico_compilado import compilado_vigente
+from automata_frases import AutomataFrases, completar_protocolo
+from almacen_lexico import AlmacenLexico, leer_wal
+from linea_tiempo import LineaTiempo, leer_tiempos
 
 # ------------------------------
 # Configuración general
@@ -11,17 +17,26 @@ from protocolo import verificar_protocolo
 VOC_LEX_CSV        = "vocabulario_sentimiento.csv"
 TRANSCRIPTION_FILE = "transcripcion.txt"
 INTERACTIVO        = False  # Cambiar a True para validación interactiva de nuevos tokens
+STREAMING_MB       = 64  # Transcripciones más grandes se leen por líneas (memoria constante)
 
 
 def load_lexicon(path: str) -> dict[str,int]:
     """
     Carga un CSV con columnas: palabra,categoria,puntaje
     Devuelve un dict { palabra: puntaje } para análisis de sentimiento.
+    Usa el vocabulario compilado si es más nuevo que el CSV. Incluye las
+    palabras del WAL todavía no compactadas (ver almacen_lexico.py).
     """
+    ruta = compilado_vigente(path)
+    if ruta:
+        return lexicon_desde_vocabulario(cargar_vocabulario(path))
+
     lexicon = {}
     if not os.path.isfile(path):
         return lexicon
 
+    import csv  # sólo sin vocabulario compilado vigente
+
     with open(path, encoding="utf-8") as f:
         reader = csv.reader(f)
         for row in reader:
@@ -33,9 +48,326 @@ def load_lexicon(path: str) -> dict[str,int]:
             except ValueError:
                 continue
             lexicon[palabra] = peso
+    for palabra, _, peso in leer_wal(path)[0]:
+        lexicon[palabra] = peso
     return lexicon
 
 
+def lexicon_desde_vocabulario(vocab_catalog: dict[str, tuple[str,int]]) -> dict[str,int]:
+    """
+    Deriva el lexicón { palabra: puntaje } del vocabulario ya cargado, sin volver
+    a leer el CSV (equivale a load_lexicon sobre el mismo archivo).
+    """
+    return {palabra: puntaje for palabra, (_, puntaje) in vocab_catalog.items()}
+
+
+def separar_turnos(full_transcript: str) -> tuple[list[str], list[str]]:
+    """
+    Separa las líneas de Agente y Cliente (ya empiezan con “Agente:” / “Cliente:”).
+    Las líneas sin prefijo se concatenan al último hablante.
+    Devuelve (turnos_agente, turnos_cliente), un texto por línea con prefijo.
+    """
+    agente_lines  = []
+    cliente_lines = []
+    for line in full_transcript.splitlines():
+        l = line.strip()
+        if not l:
+            continue
+        if l.lower().startswith("agente:"):
+            agente_lines.append(l[len("agente:"):].strip())
+        elif l.lower().startswith("cliente:"):
+            cliente_lines.append(l[len("cliente:"):].strip())
+        else:
+            # Si no hay prefijo, se concatena al último hablante
+            if agente_lines and (len(agente_lines) > len(cliente_lines)):
+                agente_lines[-1] += " " + l
+            else:
+                cliente_lines[-1] += " " + l
+
+    return agente_lines, cliente_lines
+
+
+def separar_hablantes(full_transcript: str) -> tuple[str, str]:
+    """
+    Como separar_turnos, pero devuelve (texto_agente, texto_cliente) con los
+    turnos de cada hablante unidos.
+    """
+    agente_lines, cliente_lines = separar_turnos(full_transcript)
+    return " ".join(agente_lines), " ".join(cliente_lines)
+
+
+def iterar_turnos(ruta: str, hablante: str) -> Iterator[str]:
+    """
+    Lee la transcripción línea por línea (sin cargarla entera) y produce el
+    texto de cada turno de 'hablante' ("agente" o "cliente"), los mismos que
+    separar_turnos: una línea sin prefijo continúa el último turno del agente si
+    éste tiene más líneas que el cliente, y el del cliente en otro caso. Sólo se
+    retiene el turno en curso, que termina con la próxima línea con prefijo del
+    mismo hablante (o al final del archivo).
+    """
+    lineas_agente = lineas_cliente = 0
+    turno = None
+    with open(ruta, encoding="utf-8") as f:
+        for line in f:
+            l = line.strip()
+            if not l:
+                continue
+            if l.lower().startswith("agente:"):
+                lineas_agente += 1
+                dueño, texto = "agente", l[len("agente:"):].strip()
+            elif l.lower().startswith("cliente:"):
+                lineas_cliente += 1
+                dueño, texto = "cliente", l[len("cliente:"):].strip()
+            else:
+                dueño = "agente" if lineas_agente and lineas_agente > lineas_cliente else "cliente"
+                if dueño == hablante:
+                    turno = l if turno is None else turno + " " + l
+                continue
+            if dueño == hablante:
+                if turno is not None:
+                    yield turno
+                turno = texto
+    if turno is not None:
+        yield turno
+
+
+def iterar_turnos_en_orden(lineas: Iterable[str]) -> Iterator[tuple[str, str]]:
+    """
+    Produce (hablante, texto) de cada turno en orden cronológico, agente y
+    cliente intercalados, a partir de las líneas de la transcripción (una lista
+    o el archivo abierto, que se lee de a una línea). Una línea sin prefijo
+    continúa al hablante que indica la regla de separar_turnos; si no es el del
+    turno en curso, forma un turno propio.
+    """
+    pendiente = None
+    lineas_agente = lineas_cliente = 0
+    for line in lineas:
+        l = line.strip()
+        if not l:
+            continue
+        if l.lower().startswith("agente:"):
+            lineas_agente += 1
+            turno = ("agente", l[len("agente:"):].strip())
+        elif l.lower().startswith("cliente:"):
+            lineas_cliente += 1
+            turno = ("cliente", l[len("cliente:"):].strip())
+        else:
+            dueño = "agente" if lineas_agente and lineas_agente > lineas_cliente else "cliente"
+            if pendiente and pendiente[0] == dueño:
+                pendiente = (dueño, pendiente[1] + " " + l)
+                continue
+            turno = (dueño, l)
+        if pendiente:
+            yield pendiente
+        pendiente = turno
+    if pendiente:
+        yield pendiente
+
+
+def linea_tiempo_transcripcion(
+    lineas: Iterable[str],
+    vocab_catalog: dict[str, tuple[str,int]],
+    lexicon: dict[str,int],
+    tiempos: list[tuple[float, float]] | None = None,
+    indice: IndiceSugerencias | None = None,
+    sugerencias: dict | None = None
+) -> LineaTiempo:
+    """
+    Línea de tiempo del sentimiento (ver linea_tiempo.py) de una transcripción,
+    turno a turno en orden cronológico. 'tiempos' son los (inicio_s, fin_s) de
+    la diarización, uno por turno; si no coinciden con la cantidad de turnos se
+    descartan. Pasar las 'sugerencias' ya calculadas por analizar_transcripcion
+    evita volver a buscarlas para los tokens desconocidos.
+    """
+    linea = LineaTiempo(lexicon)
+    sugerencias = dict(sugerencias or {})
+    turnos = list(iterar_turnos_en_orden(lineas)) if tiempos else iterar_turnos_en_orden(lineas)
+    if tiempos and len(tiempos) != len(turnos):
+        print(f"[AVISO] {len(tiempos)} tiempos para {len(turnos)} turnos; se ignoran los tiempos.")
+        tiempos = None
+    with metricas.temporizador("main.linea_tiempo"):
+        for i, (hablante, texto) in enumerate(turnos):
+            inicio_s, fin_s = tiempos[i] if tiempos else (None, None)
+            linea.agregar_turno(iterar_tokens(texto, vocab_catalog, sugerencias, indice=indice),
+                                hablante, inicio_s, fin_s)
+    return linea
+
+
+def agregar_tokens_sugeridos(sugerencias: dict, vocab_catalog: dict, lexicon: dict,
+                             indice: IndiceSugerencias, almacen: AlmacenLexico | None = None):
+    """
+    Modo interactivo: procesa las invitaciones "AGREGAR_COMO(peso)" de las
+    sugerencias y agrega esos tokens al vocabulario (memoria y almacén). Si no
+    se pasa 'almacen', se usa el de VOC_LEX_CSV y se confirma al terminar.
+    """
+    propio = almacen is None
+    if propio:
+        almacen = AlmacenLexico(VOC_LEX_CSV)
+    for tok, opts in sugerencias.items():
+        for opt in opts:
+            if isinstance(opt, str) and opt.startswith("AGREGAR_COMO("):
+                try:
+                    peso = int(opt[len("AGREGAR_COMO(") : -1])
+                    if tok not in vocab_catalog:
+                        # Categoría por defecto “otros” si no se preguntó
+                        almacen.agregar(tok, "otros", peso)
+                        vocab_catalog[tok] = ("otros", peso)
+                        lexicon[tok] = peso
+                        indice.agregar(tok)
+                        print(f"→ Se agregó '{tok}' con puntaje {peso} al vocabulario.")
+                except ValueError:
+                    pass
+    if propio:
+        almacen.confirmar()
+
+
+def analizar_transcripcion(
+    full_transcript: str,
+    vocab_catalog: dict[str, tuple[str,int]],
+    lexicon: dict[str,int],
+    indice: IndiceSugerencias | None = None,
+    interactivo: bool = False,
+    automata: AutomataFrases | None = None
+) -> dict:
+    """
+    Ejecuta el pipeline completo sobre el texto de una transcripción:
+    separación de hablantes, tokenización, análisis de sentimiento y
+    verificación de protocolo (estos tres en una sola pasada, con AnalizadorLlamada).
+    Las frases del protocolo ("buenas tardes", "número de cliente", ...) se
+    buscan en los turnos del agente con 'automata' (si no se pasa, se compila
+    desde vocab_catalog).
+    Retorna:
+      {
+        "sentimiento": dict (ver analizar_sentimiento),
+        "protocolo": dict (ver verificar_protocolo),
+        "sugerencias_agente": Dict[str, List[str]],
+        "sugerencias_cliente": Dict[str, List[str]]
+      }
+    """
+    if indice is None:
+        indice = IndiceSugerencias(vocab_catalog.keys())
+    if automata is None:
+        automata = AutomataFrases.desde_vocabulario(vocab_catalog)
+
+    with metricas.temporizador("main.separar_hablantes"):
+        turnos_agente, turnos_cliente = separar_turnos(full_transcript)
+        texto_agente, texto_cliente = " ".join(turnos_agente), " ".join(turnos_cliente)
+
+    # Tokenizar y analizar en una sola pasada: los tokens del generador se
+    # consumen directamente, primero los del agente y luego los del cliente.
+    # Modo interactivo: las palabras nuevas se escriben en un solo lote al final
+    almacen = AlmacenLexico(VOC_LEX_CSV) if interactivo else None
+    analizador = AnalizadorLlamada(lexicon)
+    sugerencias_ag: dict = {}
+    sugerencias_cl: dict = {}
+    with metricas.temporizador("main.analisis"):
+        analizador.feed_muchos(
+            iterar_tokens(texto_agente, vocab_catalog, sugerencias_ag,
+                          interactivo=interactivo, indice=indice, almacen=almacen),
+            hablante="agente"
+        )
+        analizador.feed_muchos(
+            iterar_tokens(texto_cliente, vocab_catalog, sugerencias_cl,
+                          interactivo=interactivo, indice=indice, almacen=almacen),
+            hablante="cliente"
+        )
+    with metricas.temporizador("main.frases"):
+        frases = automata.buscar_en_turnos(turnos_agente)
+    metricas.contar("main.transcripciones")
+
+    # Si modo interactivo, procesar invitación a agregar nuevos tokens
+    if interactivo:
+        agregar_tokens_sugeridos({**sugerencias_ag, **sugerencias_cl},
+                                 vocab_catalog, lexicon, indice, almacen)
+        almacen.confirmar()
+
+    return {
+        "sentimiento":         analizador.reporte_sentimiento(),
+        "protocolo":           completar_protocolo(analizador.reporte_protocolo(),
+                                                   frases, len(turnos_agente)),
+        "sugerencias_agente":  sugerencias_ag,
+        "sugerencias_cliente": sugerencias_cl
+    }
+
+
+def analizar_archivo(
+    ruta: str,
+    vocab_catalog: dict[str, tuple[str,int]],
+    lexicon: dict[str,int],
+    indice: IndiceSugerencias | None = None,
+    interactivo: bool = False,
+    automata: AutomataFrases | None = None
+) -> dict:
+    """
+    Como analizar_transcripcion, pero leyendo 'ruta' en streaming: cada turno se
+    tokeniza y se analiza a medida que se lee, sin armar los textos completos de
+    cada hablante. Se hacen dos pasadas por el archivo (agente y luego cliente)
+    con los mismos turnos que separar_turnos (las líneas sin prefijo se unen al
+    turno que continúan), para conservar el orden de tokens y las frases de
+    analizar_transcripcion: el reporte es el mismo salvo "tokens_no_lexico", que
+    no se acumula y sale vacío (la memoria sólo crece con el turno en curso y
+    las palabras desconocidas distintas, por las sugerencias).
+    """
+    if indice is None:
+        indice = IndiceSugerencias(vocab_catalog.keys())
+    if automata is None:
+        automata = AutomataFrases.desde_vocabulario(vocab_catalog)
+
+    almacen = AlmacenLexico(VOC_LEX_CSV) if interactivo else None
+    analizador = AnalizadorLlamada(lexicon, guardar_no_lexico=False)
+    sugerencias = {"agente": {}, "cliente": {}}
+    frases = []
+    turnos_agente = 0
+    with metricas.temporizador("main.analisis"):
+        for hablante in ("agente", "cliente"):
+            for texto in iterar_turnos(ruta, hablante):
+                analizador.feed_muchos(
+                    iterar_tokens(texto, vocab_catalog, sugerencias[hablante],
+                                  interactivo=interactivo, indice=indice, almacen=almacen),
+                    hablante=hablante
+                )
+                if hablante == "agente":
+                    frases.extend(automata.buscar(extraer_lexemas(texto), turnos_agente))
+                    turnos_agente += 1
+    metricas.contar("main.transcripciones")
+
+    if interactivo:
+        agregar_tokens_sugeridos({**sugerencias["agente"], **sugerencias["cliente"]},
+                                 vocab_catalog, lexicon, indice, almacen)
+        almacen.confirmar()
+
+    return {
+        "sentimiento":         analizador.reporte_sentimiento(),
+        "protocolo":           completar_protocolo(analizador.reporte_protocolo(),
+                                                   frases, turnos_agente),
+        "sugerencias_agente":  sugerencias["agente"],
+        "sugerencias_cliente": sugerencias["cliente"]
+    }
+
+
+def analizar_ruta(
+    ruta: str,
+    vocab_catalog: dict[str, tuple[str,int]],
+    lexicon: dict[str,int],
+    indice: IndiceSugerencias | None = None,
+    interactivo: bool = False,
+    automata: AutomataFrases | None = None
+) -> dict:
+    """
+    Analiza la transcripción guardada en 'ruta': en memoria con
+    analizar_transcripcion o, si pasa de STREAMING_MB, por líneas con
+    analizar_archivo. Es el reporte que generan main.py y
+    transcripcion_streaming.py.
+    """
+    if os.path.getsize(ruta) > STREAMING_MB * 1024 * 1024:
+        return analizar_archivo(ruta, vocab_catalog, lexicon, indice=indice,
+                                interactivo=interactivo, automata=automata)
+    with metricas.temporizador("main.lectura"), open(ruta, encoding="utf-8") as f:
+        full_transcript = f.read()
+    return analizar_transcripcion(full_transcript, vocab_catalog, lexicon, indice=indice,
+                                  interactivo=interactivo, automata=automata)
+
+
 def generar_reporte(sentiment_report: dict, protocolo_report: dict, sugerencias_ag: dict, sugerencias_cl: dict):
     """
     Imprime por consola el reporte final combinando:
@@ -79,7 +411,10 @@ def generar_reporte(sentiment_report: dict, protocolo_report: dict, sugerencias_
     # 3) Verificación de Protocolo (Agente)
     print("\n--- VERIFICACIÓN DEL PROTOCOLO (Agente) ---")
     saludo_ok = protocolo_report["saludo"]["ok"]
-    print(f"Saludo inicial: {'OK' if saludo_ok else 'Faltante'}")
+    if saludo_ok and protocolo_report["saludo"].get("primer_turno") is False:
+        print("Saludo inicial: OK (fuera del primer turno)")
+    else:
+        print(f"Saludo inicial: {'OK' if saludo_ok else 'Faltante'}")
 
     id_ok = protocolo_report["identificacion"]["ok"]
     print(f"Identificación del cliente: {'OK' if id_ok else 'Faltante'}")
@@ -91,83 +426,66 @@ def generar_reporte(sentiment_report: dict, protocolo_report: dict, sugerencias_
         print("Uso de palabras rudas: Ninguna detectada")
 
     despedida_ok = protocolo_report["despedida"]["ok"]
-    print(f"Despedida amable: {'OK' if despedida_ok else 'Faltante'}")
+    if despedida_ok and protocolo_report["despedida"].get("ultimo_turno") is False:
+        print("Despedida amable: OK (fuera del último turno)")
+    else:
+        print(f"Despedida amable: {'OK' if despedida_ok else 'Faltante'}")
 
     print("\n===================== FIN REPORTE =====================\n")
 
 
 if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Análisis de sentimiento y protocolo de una transcripción.")
+    parser.add_argument("transcripcion", nargs="?", default=TRANSCRIPTION_FILE,
+                        help=f"Archivo de texto (por defecto, {TRANSCRIPTION_FILE})")
+    parser.add_argument("--interactivo", action="store_true", default=INTERACTIVO,
+                        help="Preguntar por cada token desconocido y agregarlo al vocabulario")
+    parser.add_argument("--linea-tiempo", default=None, metavar="SALIDA",
+                        help="Exportar la línea de tiempo del sentimiento por turno (JSON)")
+    args = parser.parse_args()
+
     # 1) Cargar vocabulario completo (palabra->(categoría,puntaje))
     vocab_catalog = cargar_vocabulario(VOC_LEX_CSV)
-    vocabulario = set(vocab_catalog.keys())  # solo llaves para tokenizar
-    # 2) Cargar lexicón (palabra->puntaje) para análisis de sentimiento
-    lexicon = load_lexicon(VOC_LEX_CSV)
+    indice_sugerencias = IndiceSugerencias(vocab_catalog.keys())
+    # 2) Lexicón (palabra->puntaje) para análisis de sentimiento, sin releer el CSV
+    lexicon = lexicon_desde_vocabulario(vocab_catalog)
+    # Frases del protocolo (entradas de una o varias palabras), compiladas una vez
+    automata = AutomataFrases.desde_vocabulario(vocab_catalog)
 
     # 3) Leer transcripción completa
-    if not os.path.isfile(TRANSCRIPTION_FILE):
-        print(f"[ERROR] No se encontró {TRANSCRIPTION_FILE}")
+    if not os.path.isfile(args.transcripcion):
+        print(f"[ERROR] No se encontró {args.transcripcion}")
         sys.exit(1)
 
-    with open(TRANSCRIPTION_FILE, encoding="utf-8") as f:
-        full_transcript = f.read()
-
-    # 4) Separar líneas de Agente y Cliente (ya empiezan con “Agente:” / “Cliente:”)
-    agente_lines  = []
-    cliente_lines = []
-    for line in full_transcript.splitlines():
-        l = line.strip()
-        if not l:
-            continue
-        if l.lower().startswith("agente:"):
-            agente_lines.append(l[len("agente:"):].strip())
-        elif l.lower().startswith("cliente:"):
-            cliente_lines.append(l[len("cliente:"):].strip())
-        else:
-            # Si no hay prefijo, se concatena al último hablante
-            if agente_lines and (len(agente_lines) > len(cliente_lines)):
-                agente_lines[-1] += " " + l
-            else:
-                cliente_lines[-1] += " " + l
+    # 4) Separar hablantes, tokenizar, analizar sentimiento y verificar protocolo
+    #    (archivos grandes: por líneas, sin cargar la transcripción en memoria)
+    resultado = analizar_ruta(
+        args.transcripcion, vocab_catalog, lexicon,
+        indice=indice_sugerencias, interactivo=args.interactivo, automata=automata
+    )
 
-    texto_agente  = " ".join(agente_lines)
-    texto_cliente = " ".join(cliente_lines)
+    # 5) Generar y mostrar reporte
+    generar_reporte(resultado["sentimiento"], resultado["protocolo"],
+                    resultado["sugerencias_agente"], resultado["sugerencias_cliente"])
 
-    # 5) Tokenizar los dos textos
-    tokens_info_agente, sugerencias_ag = tokenizar_texto(
-        texto_agente, vocab_catalog, interactivo=INTERACTIVO
-    )
-    tokens_info_cliente, sugerencias_cl = tokenizar_texto(
-        texto_cliente, vocab_catalog, interactivo=INTERACTIVO
-    )
+    # 6) Línea de tiempo por turno, con los tiempos de la diarización si los hay
+    if args.linea_tiempo:
+        sugerencias = {**resultado["sugerencias_agente"], **resultado["sugerencias_cliente"]}
+        with open(args.transcripcion, encoding="utf-8") as f:
+            linea = linea_tiempo_transcripcion(f, vocab_catalog, lexicon,
+                                               tiempos=leer_tiempos(args.transcripcion),
+                                               indice=indice_sugerencias, sugerencias=sugerencias)
+        linea.guardar(args.linea_tiempo)
+        peor = linea.peor_momento()
+        if peor:
+            cuando = ""
+            if peor.inicio_s is not None:
+                cuando = f" [{int(peor.inicio_s // 60):02d}:{peor.inicio_s % 60:05.2f}]"
+            print(f"📉 Peor momento: turno {peor.turno + 1}{cuando} ({peor.hablante}), "
+                  f"ventana {peor.ventana_min}")
+        print(f"📈 Línea de tiempo de {len(linea)} turnos guardada en '{args.linea_tiempo}'.")
 
-    # 6) Si modo interactivo, procesar invitación a agregar nuevos tokens
-    if INTERACTIVO:
-        combined_sug = {**sugerencias_ag, **sugerencias_cl}
-        for tok, opts in combined_sug.items():
-            for opt in opts:
-                if isinstance(opt, str) and opt.startswith("AGREGAR_COMO("):
-                    try:
-                        peso = int(opt[len("AGREGAR_COMO(") : -1])
-                        if tok not in vocabulario:
-                            with open(VOC_LEX_CSV, "a", encoding="utf-8", newline="") as fcsv:
-                                writer = csv.writer(fcsv)
-                                # Categoría por defecto “otros” si no se preguntó
-                                writer.writerow([tok, "otros", str(peso)])
-                            vocab_catalog[tok] = ("otros", peso)
-                            lexicon[tok] = peso
-                            vocabulario.add(tok)
-                            print(f"→ Se agregó '{tok}' con puntaje {peso} al vocabulario.")
-                    except ValueError:
-                        pass
-
-    # 7) Preparar lista de tokens “planos” para el analizador de sentimiento
-    tokens_plano = [tok for (tok, _, _) in tokens_info_agente + tokens_info_cliente]
-
-    # 8) Análisis de Sentimiento
-    sentiment_report = analizar_sentimiento(tokens_plano, lexicon)
-
-    # 9) Verificación de Protocolo (usando tokens_info_agente y texto_agente)
-    protocolo_report = verificar_protocolo(tokens_info_agente, texto_agente.lower())
-
-    # 10) Generar y mostrar reporte
-    generar_reporte(sentiment_report, protocolo_report, sugerencias_ag, sugerencias_cl)
+    # 7) Métricas por etapa (sólo si se definió METRICAS_ARCHIVO)
+    metricas.exportar_a_archivo()
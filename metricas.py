@@ -0,0 +1,264 @@
+"""
+Instrumentación liviana del pipeline: temporizadores, contadores, medidores e
+histogramas, exportables como JSON o en formato de texto de Prometheus.
+
+Deshabilitada por defecto: en ese caso temporizador() devuelve un contexto nulo
+compartido y contar()/observar() retornan de inmediato, así que el costo es una
+comparación por llamada. Se habilita con habilitar() o con la variable de entorno
+METRICAS=1 (o METRICAS_ARCHIVO=ruta, ver exportar_a_archivo).
+
+Uso:
+  import metricas
+  with metricas.temporizador("transcripcion.diarizacion"):
+      ...
+  metricas.contar("tokenizacion.tokens", len(tokens))
+  print(metricas.exportar_prometheus())
+"""
+
+import math
+import os
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+# Límites (segundos) de los buckets de los histogramas de tiempo
+BUCKETS_POR_DEFECTO: Tuple[float, ...] = (
+    0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 10.0, 30.0, 60.0, math.inf
+)
+PREFIJO_PROMETHEUS = "llamadas_"
+
+# Métricas derivadas: nombre -> (numerador, denominador). De un histograma se
+# toma la suma (tiempo total acumulado en esa etapa).
+DERIVADAS = {
+    "tokenizacion.tasa_desconocidos":    ("tokenizacion.tokens_desconocidos", "tokenizacion.tokens"),
+    "transcripcion.segmentos_por_s":     ("transcripcion.segmentos", "transcripcion.whisper"),
+    "transcripcion.audio_s_por_s_reloj": ("transcripcion.audio_s", "transcripcion.total"),
+}
+
+
+class Histograma:
+    """
+    Histograma acumulativo con buckets fijos, más suma, cantidad, mínimo y máximo.
+    """
+
+    __slots__ = ("buckets", "conteos", "suma", "cantidad", "minimo", "maximo")
+
+    def __init__(self, buckets: Tuple[float, ...] = BUCKETS_POR_DEFECTO):
+        self.buckets = buckets
+        self.conteos = [0] * len(buckets)
+        self.suma = 0.0
+        self.cantidad = 0
+        self.minimo = math.inf
+        self.maximo = -math.inf
+
+    def observar(self, valor: float):
+        for i, limite in enumerate(self.buckets):
+            if valor <= limite:
+                self.conteos[i] += 1
+                break
+        self.suma += valor
+        self.cantidad += 1
+        self.minimo = min(self.minimo, valor)
+        self.maximo = max(self.maximo, valor)
+
+    def a_dict(self) -> dict:
+        return {
+            "cantidad": self.cantidad,
+            "suma":     self.suma,
+            "media":    self.suma / self.cantidad if self.cantidad else 0.0,
+            "min":      self.minimo if self.cantidad else 0.0,
+            "max":      self.maximo if self.cantidad else 0.0,
+            "buckets":  {("+Inf" if math.isinf(b) else repr(b)): c
+                         for b, c in zip(self.buckets, self.conteos)},
+        }
+
+
+class _Temporizador:
+    __slots__ = ("registro", "nombre", "inicio")
+
+    def __init__(self, registro: "Registro", nombre: str):
+        self.registro = registro
+        self.nombre = nombre
+
+    def __enter__(self):
+        self.inicio = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.registro.observar(self.nombre, time.perf_counter() - self.inicio)
+        return False
+
+
+class _TemporizadorNulo:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULO = _TemporizadorNulo()
+
+
+class Registro:
+    """
+    Conjunto de métricas de un proceso. Thread-safe.
+    """
+
+    def __init__(self, habilitado: bool = False):
+        self.habilitado = habilitado
+        self._lock = threading.Lock()
+        self.contadores: Dict[str, float] = {}
+        self.medidores: Dict[str, float] = {}
+        self.histogramas: Dict[str, Histograma] = {}
+
+    def temporizador(self, nombre: str):
+        """
+        Context manager que registra la duración del bloque en el histograma 'nombre'.
+        """
+        if not self.habilitado:
+            return _NULO
+        return _Temporizador(self, nombre)
+
+    def contar(self, nombre: str, n: float = 1):
+        if not self.habilitado:
+            return
+        with self._lock:
+            self.contadores[nombre] = self.contadores.get(nombre, 0) + n
+
+    def fijar(self, nombre: str, valor: float):
+        if not self.habilitado:
+            return
+        with self._lock:
+            self.medidores[nombre] = valor
+
+    def observar(self, nombre: str, valor: float):
+        if not self.habilitado:
+            return
+        with self._lock:
+            histograma = self.histogramas.get(nombre)
+            if histograma is None:
+                histograma = self.histogramas[nombre] = Histograma()
+            histograma.observar(valor)
+
+    def reiniciar(self):
+        with self._lock:
+            self.contadores.clear()
+            self.medidores.clear()
+            self.histogramas.clear()
+
+    def _valor(self, nombre: str) -> Optional[float]:
+        if nombre in self.contadores:
+            return self.contadores[nombre]
+        if nombre in self.medidores:
+            return self.medidores[nombre]
+        if nombre in self.histogramas:
+            return self.histogramas[nombre].suma
+        return None
+
+    def instantanea(self) -> dict:
+        """
+        Copia de todas las métricas, más las derivadas que se puedan calcular.
+        """
+        with self._lock:
+            derivadas = {}
+            for nombre, (num, den) in DERIVADAS.items():
+                a, b = self._valor(num), self._valor(den)
+                if a is not None and b:
+                    derivadas[nombre] = a / b
+            return {
+                "timestamp":   time.time(),
+                "contadores":  dict(self.contadores),
+                "medidores":   {**self.medidores, **derivadas},
+                "histogramas": {n: h.a_dict() for n, h in self.histogramas.items()},
+            }
+
+    def exportar_json(self) -> str:
+        import json
+        return json.dumps(self.instantanea(), indent=2, ensure_ascii=False)
+
+    def exportar_prometheus(self) -> str:
+        """
+        Formato de exposición de texto de Prometheus.
+        """
+        datos = self.instantanea()
+        lineas: List[str] = []
+        for nombre, valor in sorted(datos["contadores"].items()):
+            n = _nombre_prometheus(nombre) + "_total"
+            lineas += [f"# TYPE {n} counter", f"{n} {valor}"]
+        for nombre, valor in sorted(datos["medidores"].items()):
+            n = _nombre_prometheus(nombre)
+            lineas += [f"# TYPE {n} gauge", f"{n} {valor}"]
+        for nombre, hist in sorted(datos["histogramas"].items()):
+            n = _nombre_prometheus(nombre) + "_segundos"
+            lineas.append(f"# TYPE {n} histogram")
+            acumulado = 0
+            for limite, conteo in hist["buckets"].items():
+                acumulado += conteo
+                lineas.append(f'{n}_bucket{{le="{limite}"}} {acumulado}')
+            lineas += [f"{n}_sum {hist['suma']}", f"{n}_count {hist['cantidad']}"]
+        return "\n".join(lineas) + "\n"
+
+
+def _nombre_prometheus(nombre: str) -> str:
+    limpio = "".join(c if c.isalnum() else "_" for c in nombre)
+    return PREFIJO_PROMETHEUS + limpio
+
+
+# ------------------------------
+# Registro global del proceso
+# ------------------------------
+
+REGISTRO = Registro(habilitado=bool(os.getenv("METRICAS") or os.getenv("METRICAS_ARCHIVO")))
+
+
+def habilitar(habilitado: bool = True):
+    REGISTRO.habilitado = habilitado
+
+
+def habilitado() -> bool:
+    return REGISTRO.habilitado
+
+
+def temporizador(nombre: str):
+    return REGISTRO.temporizador(nombre)
+
+
+def contar(nombre: str, n: float = 1):
+    REGISTRO.contar(nombre, n)
+
+
+def fijar(nombre: str, valor: float):
+    REGISTRO.fijar(nombre, valor)
+
+
+def observar(nombre: str, valor: float):
+    REGISTRO.observar(nombre, valor)
+
+
+def instantanea() -> dict:
+    return REGISTRO.instantanea()
+
+
+def exportar_json() -> str:
+    return REGISTRO.exportar_json()
+
+
+def exportar_prometheus() -> str:
+    return REGISTRO.exportar_prometheus()
+
+
+def exportar_a_archivo(ruta: Optional[str] = None):
+    """
+    Escribe la instantánea en 'ruta' (por defecto, $METRICAS_ARCHIVO): formato
+    Prometheus si termina en .prom, si no JSON. No hace nada si no hay ruta o si
+    la instrumentación está deshabilitada.
+    """
+    ruta = ruta or os.getenv("METRICAS_ARCHIVO")
+    if not ruta or not REGISTRO.habilitado:
+        return
+    contenido = exportar_prometheus() if ruta.endswith(".prom") else exportar_json()
+    with open(ruta, "w", encoding="utf-8") as f:
+        f.write(contenido)
@@ -1,8 +1,12 @@
-from typing import List, Tuple, Dict
+from typing import List, Optional, Tuple, Dict, Union
+from flujo_tokens import FlujoTokens
+from automata_frases import AutomataFrases, completar_protocolo
 
 def verificar_protocolo(
-    tokens_info_agente: List[Tuple[str,str,int]],
-    texto_agente_completo: str
+    tokens_info_agente: Union[List[Tuple[str,str,int]], FlujoTokens],
+    texto_agente_completo: str,
+    automata: Optional[AutomataFrases] = None,
+    turnos_agente: Optional[List[str]] = None
 ) -> Dict[str, object]:
     """
     Verifica si el agente cumplió las fases del protocolo usando la categoría pragmática
@@ -13,6 +17,14 @@ def verificar_protocolo(
       - Uso de palabras rudas: detecta tokens cuya categoría sea "palabra_ruda".
       - Despedida amable: basta con un token de categoría "despedida".
 
+    Si se pasa un FlujoTokens, se consideran sus tokens del agente y las
+    categorías se reducen con NumPy sobre los códigos enteros.
+
+    Si se pasa 'automata' (ver automata_frases.py), además se buscan las frases
+    de varias palabras en los turnos del agente ('turnos_agente', o todo
+    'texto_agente_completo' como un único turno) y el reporte incluye
+    saludo["primer_turno"], despedida["ultimo_turno"] y "frases".
+
     Retorna un diccionario con:
       {
         "saludo": {"ok": bool},
@@ -21,6 +33,21 @@ def verificar_protocolo(
         "despedida": {"ok": bool}
       }
     """
+    if isinstance(tokens_info_agente, FlujoTokens):
+        reporte = tokens_info_agente.verificar_protocolo()
+    else:
+        reporte = _verificar_tokens(tokens_info_agente)
+
+    if automata is not None:
+        turnos = turnos_agente if turnos_agente is not None else [texto_agente_completo]
+        completar_protocolo(reporte, automata.buscar_en_turnos(turnos), len(turnos))
+    return reporte
+
+
+def _verificar_tokens(tokens_info_agente: List[Tuple[str,str,int]]) -> Dict[str, object]:
+    """
+    Verificación por categoría de cada token (lista de tuplas).
+    """
     # 1) Saludo inicial
     saludo_ok = any(categoria == "saludo" for (_, categoria, _) in tokens_info_agente)
 
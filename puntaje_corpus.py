@@ -0,0 +1,222 @@
+#!/usr/bin/env python3
+"""
+Puntaje de sentimiento vectorizado para corpus grandes de transcripciones.
+
+Re-puntuar el archivo de llamadas tras cada edición del lexicón con
+analizar_sentimiento recorre cada token en Python. Aquí el corpus se tokeniza
+una sola vez a un arreglo plano de ids (uint32) más los offsets de cada
+documento, y se guarda en .npz. Puntuar con un lexicón es entonces:
+
+  1. pesos por id de token (una consulta al lexicón por palabra distinta),
+  2. pesos[ids] y np.add.reduceat por documento para totales y conteos,
+  3. máximos/mínimos por documento con un reduceat sobre claves (peso, posición),
+     que da la primera ocurrencia de cada extremo (mismo desempate que el
+     bucle de analizar_sentimiento).
+
+Los resultados son idénticos a analizar_sentimiento sobre los tokens de cada
+documento (agente y luego cliente, como en main.py en modo no interactivo). El
+corpus guarda las formas tal como aparecen; la lematización (lematizacion.py)
+depende del lexicón, así que se resuelve al puntuar, una vez por palabra
+distinta, igual que tokenizacion.iterar_tokens: una forma fuera del lexicón
+cuenta como su lema si éste está en el lexicón.
+
+Uso:
+  python puntaje_corpus.py indexar <directorio|glob> [-o corpus.npz]
+  python puntaje_corpus.py puntuar corpus.npz [--lexico vocabulario_sentimiento.csv]
+                                              [--salida puntajes.jsonl]
+"""
+
+import argparse
+import json
+import sys
+from typing import Dict, Iterable, List, Mapping, Optional
+
+import numpy as np
+
+from utils import extraer_lexemas
+from flujo_tokens import TablaTokens
+from lematizacion import buscar_lema
+
+# Claves (peso, posición) en int64: posiciones de 32 bits (corpus de hasta
+# ~4.000 M tokens) y pesos de hasta ±2^31
+_MASCARA_POSICION = (1 << 32) - 1
+
+
+class CorpusTokens:
+    """
+    Corpus tokenizado: 'ids' plano (uint32) y 'offsets' (int64, len = documentos + 1),
+    donde los tokens del documento d son ids[offsets[d]:offsets[d+1]].
+    """
+
+    def __init__(self, ids: np.ndarray, offsets: np.ndarray, palabras: List[str],
+                 documentos: Optional[List[str]] = None):
+        self.ids = ids
+        self.offsets = offsets
+        self.palabras = palabras
+        self.documentos = documentos or [str(d) for d in range(len(offsets) - 1)]
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    @classmethod
+    def desde_tokens(cls, documentos_tokens: Iterable[List[str]],
+                     documentos: Optional[List[str]] = None) -> "CorpusTokens":
+        """
+        Construye el corpus a partir de una lista de tokens por documento.
+        """
+        tabla = TablaTokens()
+        ids: List[int] = []
+        offsets = [0]
+        for tokens in documentos_tokens:
+            ids.extend(tabla.id(t) for t in tokens)
+            offsets.append(len(ids))
+        return cls(np.array(ids, dtype=np.uint32), np.array(offsets, dtype=np.int64),
+                   tabla.palabras, documentos)
+
+    @classmethod
+    def desde_archivos(cls, rutas: List[str]) -> "CorpusTokens":
+        """
+        Tokeniza transcripciones ("Agente: ..." / "Cliente: ...") como main.py:
+        primero los lexemas del agente, luego los del cliente.
+        """
+        from main import separar_hablantes
+
+        def tokens_de(ruta: str) -> List[str]:
+            with open(ruta, encoding="utf-8") as f:
+                texto_agente, texto_cliente = separar_hablantes(f.read())
+            return extraer_lexemas(texto_agente) + extraer_lexemas(texto_cliente)
+
+        return cls.desde_tokens((tokens_de(r) for r in rutas), list(rutas))
+
+    def guardar(self, ruta: str):
+        np.savez(ruta, ids=self.ids, offsets=self.offsets,
+                 palabras=np.array(self.palabras, dtype=str),
+                 documentos=np.array(self.documentos, dtype=str))
+
+    @classmethod
+    def cargar(cls, ruta: str) -> "CorpusTokens":
+        with np.load(ruta) as datos:
+            return cls(datos["ids"], datos["offsets"],
+                       datos["palabras"].tolist(), datos["documentos"].tolist())
+
+
+def puntuar_corpus(corpus: CorpusTokens, lexicon: Mapping[str, int],
+                   incluir_no_lexico: bool = True,
+                   lematizar: bool = True) -> List[Dict[str, object]]:
+    """
+    Devuelve, por documento, el mismo dict que analizar_sentimiento.
+    Con 'incluir_no_lexico' en False, "tokens_no_lexico" queda vacío (evita
+    construir las listas de strings cuando sólo interesan los puntajes).
+    Con 'lematizar' (como en main.py) las formas fuera del lexicón se puntúan y
+    se reportan como su lema, si está en el lexicón.
+    """
+    cantidad = len(corpus)
+    palabras = corpus.palabras
+    if lematizar:
+        palabras = [p if p in lexicon else (buscar_lema(p, lexicon) or p) for p in palabras]
+    consulta = [lexicon.get(palabra) for palabra in palabras]
+    pesos_palabra = np.array([p or 0 for p in consulta], dtype=np.int64)
+    presentes_palabra = np.array([p is not None for p in consulta], dtype=bool)
+
+    ids, offsets = corpus.ids, corpus.offsets
+    pesos = pesos_palabra[ids]
+    largos = np.diff(offsets)
+
+    # reduceat no admite segmentos vacíos: se reduce sobre los documentos no
+    # vacíos y los vacíos quedan con los valores neutros
+    no_vacios = largos > 0
+    inicios = offsets[:-1][no_vacios]
+    totales = np.zeros(cantidad, dtype=np.int64)
+    count_pos = np.zeros(cantidad, dtype=np.int64)
+    count_neg = np.zeros(cantidad, dtype=np.int64)
+    idx_pos = np.full(cantidad, -1, dtype=np.int64)
+    idx_neg = np.full(cantidad, -1, dtype=np.int64)
+
+    if len(inicios):
+        totales[no_vacios] = np.add.reduceat(pesos, inicios)
+        count_pos[no_vacios] = np.add.reduceat(pesos > 0, inicios, dtype=np.int64)
+        count_neg[no_vacios] = np.add.reduceat(pesos < 0, inicios, dtype=np.int64)
+
+        # Extremos con desempate por primera ocurrencia en una sola reducción:
+        # clave = peso en los 32 bits altos y la posición en los bajos
+        # (complementada para el máximo, así gana la posición menor)
+        posiciones = np.arange(len(ids), dtype=np.int64)
+        clave_max = np.maximum.reduceat((pesos << 32) | (_MASCARA_POSICION - posiciones), inicios)
+        clave_min = np.minimum.reduceat((pesos << 32) | posiciones, inicios)
+        con_pos = (clave_max >> 32) > 0
+        con_neg = (clave_min >> 32) < 0
+        idx_pos[np.flatnonzero(no_vacios)[con_pos]] = _MASCARA_POSICION - (clave_max[con_pos] & _MASCARA_POSICION)
+        idx_neg[np.flatnonzero(no_vacios)[con_neg]] = clave_min[con_neg] & _MASCARA_POSICION
+
+    if incluir_no_lexico:
+        ausentes = np.flatnonzero(~presentes_palabra[ids])
+        cortes = np.searchsorted(ausentes, offsets).tolist()
+        palabras_ausentes = [palabras[i] for i in ids[ausentes].tolist()]
+
+    # Palabra y peso de los extremos, resueltos en bloque (-1 = sin extremo)
+    extremos = []
+    for indices in (idx_pos, idx_neg):
+        if not len(ids):
+            extremos.append([(None, 0)] * cantidad)
+            continue
+        validos = np.maximum(indices, 0)
+        extremos.append([(palabras[i], w) if k >= 0 else (None, 0) for k, i, w in zip(
+            indices.tolist(), ids[validos].tolist(), pesos[validos].tolist())])
+
+    resultados = []
+    for d, (total, pos, neg, mas_pos, mas_neg) in enumerate(zip(
+            totales.tolist(), count_pos.tolist(), count_neg.tolist(), *extremos)):
+        if total > 0:
+            sentimiento_general = f"Positivo (+{total})"
+        elif total < 0:
+            sentimiento_general = f"Negativo ({total})"
+        else:
+            sentimiento_general = "Neutral (0)"
+        resultados.append({
+            "sentimiento_general":   sentimiento_general,
+            "puntaje_total":         total,
+            "count_positivas":       pos,
+            "palabra_mas_positiva":  mas_pos,
+            "count_negativas":       neg,
+            "palabra_mas_negativa":  mas_neg,
+            "tokens_no_lexico":      (palabras_ausentes[cortes[d]:cortes[d + 1]]
+                                      if incluir_no_lexico else [])
+        })
+    return resultados
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Puntaje de sentimiento vectorizado por corpus.")
+    sub = parser.add_subparsers(dest="comando", required=True)
+
+    p_idx = sub.add_parser("indexar", help="Tokenizar transcripciones a un corpus .npz")
+    p_idx.add_argument("entrada", help="Directorio (se toman los *.txt) o glob de transcripciones")
+    p_idx.add_argument("-o", "--salida", default="corpus.npz")
+
+    p_pun = sub.add_parser("puntuar", help="Puntuar un corpus .npz con el lexicón actual")
+    p_pun.add_argument("corpus")
+    p_pun.add_argument("--lexico", default="vocabulario_sentimiento.csv")
+    p_pun.add_argument("--salida", default="puntajes.jsonl")
+    args = parser.parse_args()
+
+    if args.comando == "indexar":
+        from lote import listar_transcripciones
+
+        rutas = listar_transcripciones(args.entrada)
+        if not rutas:
+            print(f"[ERROR] No se encontraron transcripciones en {args.entrada}")
+            sys.exit(1)
+        corpus = CorpusTokens.desde_archivos(rutas)
+        corpus.guardar(args.salida)
+        print(f"✅ {len(corpus)} transcripciones, {len(corpus.ids)} tokens "
+              f"({len(corpus.palabras)} distintos) guardados en '{args.salida}'.")
+    else:
+        from main import load_lexicon
+
+        corpus = CorpusTokens.cargar(args.corpus)
+        resultados = puntuar_corpus(corpus, load_lexicon(args.lexico))
+        with open(args.salida, "w", encoding="utf-8") as f:
+            for documento, resultado in zip(corpus.documentos, resultados):
+                f.write(json.dumps({"archivo": documento, "sentimiento": resultado},
+                                   ensure_ascii=False) + "\n")
+        print(f"✅ Puntajes de {len(resultados)} transcripciones guardados en '{args.salida}'.")
@@ -0,0 +1,204 @@
+#!/usr/bin/env python3
+"""
+Servicio asíncrono de análisis de texto (tokenización + sentimiento + protocolo).
+
+Protocolo: JSON por línea sobre TCP o socket Unix. Cada línea es una solicitud
+
+  {"id": 17, "texto": "Agente: Buenas tardes...\\nCliente: ..."}
+
+y se responde (posiblemente en otro orden, por eso el "id") con
+
+  {"id": 17, "sentimiento": {...}, "protocolo": {...}, "tokens_no_reconocidos": {...},
+   "tiempos": {"cola_s": ..., "proceso_s": ..., "total_s": ...}}
+
+o {"id": 17, "error": "..."}. La solicitud {"comando": "estado"} devuelve
+contadores y latencias del servidor.
+
+El vocabulario se carga una vez y queda residente en un pool de procesos (el
+mismo worker de lote.py). Las solicitudes pasan por una cola acotada: cuando
+está llena, el servidor deja de leer de las conexiones hasta que se libere
+lugar (contrapresión por TCP) en lugar de acumular trabajo sin límite.
+
+Uso:
+  python servidor_analisis.py [--host 127.0.0.1] [--puerto 8766] [--unix /tmp/analisis.sock]
+                              [--workers N] [--cola 64]
+  python benchmarks/carga_analisis.py --puerto 8766
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional
+
+from tokenizacion import cargar_vocabulario
+from lexico_compilado import compilado_vigente
+from lote import _inicializar_worker, procesar_texto
+from main import VOC_LEX_CSV, lexicon_desde_vocabulario
+
+PUERTO_POR_DEFECTO = 8766
+MAX_SOLICITUD_BYTES = 16 * 1024 * 1024
+
+
+class ServidorAnalisis:
+    """
+    Recibe solicitudes de varias conexiones, las encola (cola acotada) y las
+    reparte en un pool de procesos con el vocabulario ya cargado.
+    """
+
+    def __init__(self, workers: Optional[int] = None, max_cola: int = 64,
+                 ruta_compilada: Optional[str] = None):
+        self.workers = workers or os.cpu_count() or 1
+        vocab_catalog = lexicon = None
+        if not ruta_compilada:
+            vocab_catalog = cargar_vocabulario(VOC_LEX_CSV)
+            lexicon = lexicon_desde_vocabulario(vocab_catalog)
+        self.pool = ProcessPoolExecutor(
+            max_workers=self.workers,
+            initializer=_inicializar_worker,
+            initargs=(vocab_catalog, lexicon, ruta_compilada)
+        )
+        self.max_cola = max_cola
+        self.cola: Optional[asyncio.Queue] = None
+        self.atendidas = 0
+        self.errores = 0
+        self.latencias = deque(maxlen=10000)
+
+    async def iniciar(self):
+        self.cola = asyncio.Queue(self.max_cola)
+        # Un consumidor por worker (más uno, para que el pool no quede ocioso
+        # mientras se entrega un resultado): el resto espera en la cola
+        self._consumidores = [asyncio.create_task(self._consumir()) for _ in range(self.workers + 1)]
+
+    async def detener(self):
+        for tarea in self._consumidores:
+            tarea.cancel()
+        self.pool.shutdown(cancel_futures=True)
+
+    async def _consumir(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            texto, futuro, encolada = await self.cola.get()
+            inicio = time.perf_counter()
+            try:
+                resultado = await loop.run_in_executor(self.pool, procesar_texto, texto)
+            except Exception as e:
+                resultado = {"error": str(e)}
+            fin = time.perf_counter()
+            resultado["tiempos"] = {"cola_s": inicio - encolada, "proceso_s": fin - inicio}
+            if not futuro.cancelled():
+                futuro.set_result(resultado)
+            self.cola.task_done()
+
+    def estado(self) -> dict:
+        ordenadas = sorted(self.latencias)
+        datos = {"atendidas": self.atendidas, "errores": self.errores,
+                 "en_cola": self.cola.qsize(), "max_cola": self.max_cola, "workers": self.workers}
+        if ordenadas:
+            datos["latencia_p50_s"] = ordenadas[len(ordenadas) // 2]
+            datos["latencia_p99_s"] = ordenadas[min(len(ordenadas) - 1, int(len(ordenadas) * 0.99))]
+            datos["latencia_media_s"] = statistics.fmean(ordenadas)
+        return datos
+
+    async def _responder(self, writer: asyncio.StreamWriter, lock: asyncio.Lock, datos: dict):
+        linea = (json.dumps(datos, ensure_ascii=False) + "\n").encode("utf-8")
+        async with lock:
+            writer.write(linea)
+            await writer.drain()
+
+    async def _esperar_y_responder(self, writer, lock, id_solicitud, futuro, llegada: float):
+        resultado = await futuro
+        total = time.perf_counter() - llegada
+        resultado["tiempos"]["total_s"] = total
+        self.latencias.append(total)
+        if "error" in resultado:
+            self.errores += 1
+        else:
+            self.atendidas += 1
+        await self._responder(writer, lock, {"id": id_solicitud, **resultado})
+
+    async def atender(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """
+        Atiende una conexión: lee solicitudes mientras haya lugar en la cola y
+        responde cada una apenas termina.
+        """
+        loop = asyncio.get_running_loop()
+        lock = asyncio.Lock()
+        pendientes = set()
+        try:
+            while True:
+                try:
+                    linea = await reader.readline()
+                except ValueError:
+                    await self._responder(writer, lock, {"error": "solicitud demasiado grande"})
+                    break
+                if not linea:
+                    break
+                llegada = time.perf_counter()
+                try:
+                    solicitud = json.loads(linea)
+                    if solicitud.get("comando") == "estado":
+                        await self._responder(writer, lock, {"id": solicitud.get("id"), **self.estado()})
+                        continue
+                    texto = solicitud["texto"]
+                    if not isinstance(texto, str):
+                        raise ValueError("'texto' debe ser un string")
+                except (ValueError, KeyError, AttributeError) as e:
+                    await self._responder(writer, lock, {"error": f"Solicitud inválida: {e}"})
+                    continue
+
+                futuro = loop.create_future()
+                # Si la cola está llena se espera acá: no se leen más solicitudes
+                # de esta conexión hasta que haya lugar
+                await self.cola.put((texto, futuro, llegada))
+                tarea = asyncio.create_task(
+                    self._esperar_y_responder(writer, lock, solicitud.get("id"), futuro, llegada))
+                pendientes.add(tarea)
+                tarea.add_done_callback(pendientes.discard)
+            if pendientes:
+                await asyncio.gather(*pendientes, return_exceptions=True)
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+
+async def servir(args):
+    servidor_analisis = ServidorAnalisis(args.workers, args.cola, compilado_vigente(VOC_LEX_CSV))
+    await servidor_analisis.iniciar()
+    if args.unix:
+        servidor = await asyncio.start_unix_server(servidor_analisis.atender, path=args.unix,
+                                                   limit=MAX_SOLICITUD_BYTES)
+        direccion = f"unix:{args.unix}"
+    else:
+        servidor = await asyncio.start_server(servidor_analisis.atender, args.host, args.puerto,
+                                              limit=MAX_SOLICITUD_BYTES)
+        direccion = f"{args.host}:{args.puerto}"
+    print(f"🚀 Escuchando en {direccion} ({servidor_analisis.workers} workers, "
+          f"cola de {args.cola})", flush=True)
+    try:
+        async with servidor:
+            await servidor.serve_forever()
+    finally:
+        await servidor_analisis.detener()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Servicio de análisis de transcripciones (JSON por línea).")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--puerto", type=int, default=PUERTO_POR_DEFECTO)
+    parser.add_argument("--unix", default=None, help="Escuchar en un socket Unix en lugar de TCP")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="Procesos de análisis (por defecto, uno por núcleo)")
+    parser.add_argument("--cola", type=int, default=64,
+                        help="Solicitudes en espera antes de aplicar contrapresión")
+    args = parser.parse_args()
+    try:
+        asyncio.run(servir(args))
+    except KeyboardInterrupt:
+        sys.exit(0)
@@ -0,0 +1,221 @@
+#!/usr/bin/env python3
+"""
+Servidor local "en caliente" para Whisper y pyannote.
+
+Cargar Whisper 'medium' y el pipeline de diarización cuesta decenas de segundos.
+Este servicio HTTP (sólo localhost) los carga una vez y atiende solicitudes:
+
+  POST /transcribir
+      - JSON {"ruta": "/ruta/absoluta/llamada.wav"}  (archivo visible por el servidor)
+      - o el WAV en el cuerpo, con Content-Type: audio/wav
+    Responde JSON:
+      {"lineas": ["Agente: ...", ...],
+       "segmentos": [[inicio_s, fin_s], ...],   (uno por línea)
+       "tiempos": {"espera_s": ..., "proceso_s": ..., "total_s": ...}}
+
+  GET /estado
+    Responde JSON con el tiempo de arranque y la latencia acumulada por solicitud,
+    para ver cuánto se amortiza la carga de modelos.
+
+Las solicitudes se procesan de a una (los modelos no son thread-safe).
+
+Uso:
+  python servidor_modelos.py [--host 127.0.0.1] [--puerto 8765]
+  python transcripcion.py llamada.wav --servidor http://127.0.0.1:8765
+"""
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.request
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import List
+
+URL_POR_DEFECTO = "http://127.0.0.1:8765"
+
+
+# ------------------------------
+# Cliente liviano (sin torch)
+# ------------------------------
+
+def transcribir_remoto(url: str, ruta_wav: str, enviar_audio: bool = False,
+                       timeout_s: float = 3600) -> dict:
+    """
+    Pide la transcripción de 'ruta_wav' al servidor. Por defecto envía la ruta
+    absoluta (mismo equipo); con 'enviar_audio' manda los bytes del WAV.
+    Devuelve la respuesta JSON del servidor. Si el servidor responde con error
+    o no se puede conectar, lanza RuntimeError con el mensaje del servidor.
+    """
+    if enviar_audio:
+        with open(ruta_wav, "rb") as f:
+            cuerpo = f.read()
+        tipo = "audio/wav"
+    else:
+        cuerpo = json.dumps({"ruta": os.path.abspath(ruta_wav)}).encode("utf-8")
+        tipo = "application/json"
+
+    solicitud = urllib.request.Request(
+        url.rstrip("/") + "/transcribir", data=cuerpo,
+        headers={"Content-Type": tipo}, method="POST"
+    )
+    try:
+        with urllib.request.urlopen(solicitud, timeout=timeout_s) as respuesta:
+            return json.loads(respuesta.read().decode("utf-8"))
+    except urllib.error.HTTPError as e:
+        # El servidor responde {"error": "..."} en 4xx/5xx
+        try:
+            mensaje = json.loads(e.read().decode("utf-8"))["error"]
+        except (ValueError, KeyError, TypeError):
+            mensaje = e.reason
+        raise RuntimeError(f"El servidor respondió {e.code}: {mensaje}") from e
+    except urllib.error.URLError as e:
+        raise RuntimeError(f"No se pudo conectar con el servidor {url}: {e.reason}") from e
+
+
+# ------------------------------
+# Servidor
+# ------------------------------
+
+class EstadoServidor:
+    """
+    Modelos cargados y métricas de arranque / por solicitud.
+    """
+
+    def __init__(self):
+        inicio = time.perf_counter()
+        from transcripcion import precargar_dependencias, cargar_whisper_medium, cargar_pipeline_diarizacion
+        precargar_dependencias()
+
+        t0 = time.perf_counter()
+        self.modelo = cargar_whisper_medium()
+        t1 = time.perf_counter()
+        self.pipeline = cargar_pipeline_diarizacion()
+        t2 = time.perf_counter()
+
+        self.arranque = {
+            "imports_s":  t0 - inicio,
+            "whisper_s":  t1 - t0,
+            "pyannote_s": t2 - t1,
+            "total_s":    t2 - inicio,
+        }
+        self.lock = threading.Lock()
+        self.latencias: List[float] = []
+
+    def transcribir(self, ruta_wav: str) -> dict:
+        from transcripcion import transcribir_con_diarizacion
+        from linea_tiempo import leer_tiempos, ruta_tiempos
+
+        llegada = time.perf_counter()
+        with self.lock:
+            inicio = time.perf_counter()
+            with tempfile.NamedTemporaryFile(suffix=".txt", delete=False) as tmp:
+                ruta_salida = tmp.name
+            try:
+                lineas = transcribir_con_diarizacion(
+                    ruta_wav, self.modelo, pipeline=self.pipeline, ruta_salida=ruta_salida
+                )
+                segmentos = leer_tiempos(ruta_salida)
+            finally:
+                os.remove(ruta_salida)
+                if os.path.exists(ruta_tiempos(ruta_salida)):
+                    os.remove(ruta_tiempos(ruta_salida))
+            fin = time.perf_counter()
+            self.latencias.append(fin - llegada)
+
+        return {
+            "lineas": lineas,
+            "segmentos": segmentos,
+            "tiempos": {
+                "espera_s":  inicio - llegada,
+                "proceso_s": fin - inicio,
+                "total_s":   fin - llegada,
+            }
+        }
+
+    def resumen(self) -> dict:
+        datos = {"arranque": self.arranque, "solicitudes": len(self.latencias)}
+        if self.latencias:
+            total = sum(self.latencias)
+            datos["latencia_media_s"] = statistics.fmean(self.latencias)
+            # Costo promedio por solicitud si el arranque se pagara en cada una
+            # (como al ejecutar transcripcion.py directamente) vs. amortizado
+            datos["costo_sin_servidor_s"] = datos["latencia_media_s"] + self.arranque["total_s"]
+            datos["costo_amortizado_s"] = (total + self.arranque["total_s"]) / len(self.latencias)
+        return datos
+
+
+class ManejadorModelos(BaseHTTPRequestHandler):
+    estado: EstadoServidor = None
+
+    def _responder(self, codigo: int, datos: dict):
+        cuerpo = json.dumps(datos, ensure_ascii=False).encode("utf-8")
+        self.send_response(codigo)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(cuerpo)))
+        self.end_headers()
+        self.wfile.write(cuerpo)
+
+    def do_GET(self):
+        if self.path == "/estado":
+            self._responder(200, self.estado.resumen())
+        else:
+            self._responder(404, {"error": "ruta desconocida"})
+
+    def do_POST(self):
+        if self.path != "/transcribir":
+            self._responder(404, {"error": "ruta desconocida"})
+            return
+
+        largo = int(self.headers.get("Content-Length", 0))
+        cuerpo = self.rfile.read(largo)
+        tipo = self.headers.get("Content-Type", "")
+        ruta_temporal = None
+        try:
+            if tipo.startswith("audio/"):
+                with tempfile.NamedTemporaryFile(suffix=".wav", delete=False) as tmp:
+                    tmp.write(cuerpo)
+                    ruta_temporal = ruta_wav = tmp.name
+            else:
+                ruta_wav = json.loads(cuerpo.decode("utf-8"))["ruta"]
+            if not os.path.isfile(ruta_wav):
+                self._responder(400, {"error": f"No se encontró el archivo: {ruta_wav}"})
+                return
+            resultado = self.estado.transcribir(ruta_wav)
+            print(f"📨 Solicitud {len(self.estado.latencias)}: "
+                  f"{resultado['tiempos']['total_s']:.2f} s", flush=True)
+            self._responder(200, resultado)
+        except (ValueError, KeyError) as e:
+            self._responder(400, {"error": f"Solicitud inválida: {e}"})
+        except Exception as e:
+            self._responder(500, {"error": str(e)})
+        finally:
+            if ruta_temporal:
+                os.remove(ruta_temporal)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Servidor local de modelos Whisper + pyannote.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--puerto", type=int, default=8765)
+    args = parser.parse_args()
+
+    ManejadorModelos.estado = EstadoServidor()
+    arranque = ManejadorModelos.estado.arranque
+    print(f"⏱ Arranque: imports {arranque['imports_s']:.1f} s, Whisper {arranque['whisper_s']:.1f} s, "
+          f"pyannote {arranque['pyannote_s']:.1f} s (total {arranque['total_s']:.1f} s)")
+
+    servidor = ThreadingHTTPServer((args.host, args.puerto), ManejadorModelos)
+    print(f"🚀 Escuchando en http://{args.host}:{args.puerto}", flush=True)
+    try:
+        servidor.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        servidor.server_close()
+        sys.exit(0)
@@ -0,0 +1,129 @@
+import heapq
+from collections import Counter, defaultdict
+from math import ceil
+from typing import Dict, FrozenSet, Iterable, List, Set
+
+class IndiceSugerencias:
+    """
+    Índice invertido de caracteres para generar sugerencias ortográficas sin
+    recorrer todo el vocabulario por cada token desconocido.
+
+    Cada palabra se indexa por sus "rasgos" (carácter, n-ésima aparición), de modo
+    que la cantidad de rasgos compartidos entre dos palabras es exactamente el
+    tamaño de la intersección de sus multiconjuntos de caracteres. Ese valor es una
+    cota superior de los caracteres que SequenceMatcher puede emparejar, por lo que
+    alcanza con mirar las listas de los rasgos más raros de la consulta (filtro por
+    prefijo) para obtener un superconjunto de los candidatos que superan 'cutoff'.
+    Sobre esos candidatos se aplica el mismo cálculo que difflib.get_close_matches,
+    así que los resultados (y su orden) son idénticos.
+    """
+
+    def __init__(self, palabras: Iterable[str] = ()):
+        # palabra -> conjunto de sus rasgos
+        self._palabras: Dict[str, FrozenSet[str]] = {}
+        # rasgo -> longitud de palabra -> palabras que contienen el rasgo
+        self._postings: Dict[str, Dict[int, Set[str]]] = defaultdict(lambda: defaultdict(set))
+        # rasgo -> cantidad total de palabras que lo contienen (para ordenar por rareza)
+        self._frecuencia: Counter = Counter()
+        for palabra in palabras:
+            self.agregar(palabra)
+
+    @staticmethod
+    def _rasgos(palabra: str) -> List[str]:
+        """
+        Devuelve los rasgos de una palabra: "a1", "a2", ... por cada aparición
+        de cada carácter. Ej: "casa" -> ["c1", "a1", "s1", "a2"]
+        """
+        vistos: Counter = Counter()
+        rasgos = []
+        for ch in palabra:
+            vistos[ch] += 1
+            rasgos.append(f"{ch}{vistos[ch]}")
+        return rasgos
+
+    def agregar(self, palabra: str) -> None:
+        """
+        Agrega una palabra al índice (operación incremental, O(len(palabra))).
+        """
+        if palabra in self._palabras or " " in palabra:
+            # Las frases de varias palabras no son sugerencias para un token
+            return
+        rasgos = frozenset(self._rasgos(palabra))
+        self._palabras[palabra] = rasgos
+        largo = len(palabra)
+        for rasgo in rasgos:
+            self._postings[rasgo][largo].add(palabra)
+            self._frecuencia[rasgo] += 1
+
+    def __contains__(self, palabra: str) -> bool:
+        return palabra in self._palabras
+
+    def __len__(self) -> int:
+        return len(self._palabras)
+
+    def _candidatos(self, palabra: str, cutoff: float) -> Iterable[str]:
+        """
+        Filtro por longitud y por prefijo. Para que una palabra b de largo lb
+        supere 'cutoff' hace falta:
+          - 2 * min(la, lb) / (la + lb) >= cutoff  (cota de longitud)
+          - compartir al menos t = ceil(cutoff * (la + lb) / 2) rasgos con la
+            consulta, así que necesariamente comparte alguno de los
+            (la - t + 1) rasgos más raros de la consulta.
+        Los candidatos que no alcanzan t rasgos compartidos se descartan antes
+        de llegar a SequenceMatcher.
+        """
+        la = len(palabra)
+        if cutoff <= 0 or la == 0:
+            return list(self._palabras)
+
+        # Se resta un epsilon para que el redondeo de punto flotante no descarte
+        # longitudes límite válidas.
+        lb_min = max(1, ceil(la * cutoff / (2 - cutoff) - 1e-9))
+        lb_max = int(la * (2 - cutoff) / cutoff + 1e-9)
+        rasgos = sorted(
+            self._rasgos(palabra),
+            key=lambda r: (self._frecuencia.get(r, 0), r)
+        )
+
+        rasgos_consulta = frozenset(rasgos)
+
+        candidatos: List[str] = []
+        for lb in range(lb_min, lb_max + 1):
+            t = max(1, ceil(cutoff * (la + lb) / 2 - 1e-9))
+            del_largo: Set[str] = set()
+            for rasgo in rasgos[:la - t + 1]:
+                por_largo = self._postings.get(rasgo)
+                if por_largo and lb in por_largo:
+                    del_largo.update(por_largo[lb])
+            # Filtro por conteo: la intersección de rasgos debe alcanzar t
+            candidatos.extend(
+                x for x in del_largo
+                if len(rasgos_consulta & self._palabras[x]) >= t
+            )
+        return candidatos
+
+    def sugerir(self, palabra: str, n: int = 3, cutoff: float = 0.6) -> List[str]:
+        """
+        Equivalente a difflib.get_close_matches(palabra, vocabulario, n, cutoff)
+        pero evaluando SequenceMatcher sólo sobre los candidatos del índice.
+        """
+        if not n > 0:
+            raise ValueError(f"n must be > 0: {n!r}")
+        if not 0.0 <= cutoff <= 1.0:
+            raise ValueError(f"cutoff must be in [0.0, 1.0]: {cutoff!r}")
+
+        resultado = []
+        # difflib se importa recién al primer token desconocido
+        from difflib import SequenceMatcher
+        s = SequenceMatcher()
+        s.set_seq2(palabra)
+        for x in self._candidatos(palabra, cutoff):
+            s.set_seq1(x)
+            if s.real_quick_ratio() >= cutoff and \
+               s.quick_ratio() >= cutoff and \
+               s.ratio() >= cutoff:
+                resultado.append((s.ratio(), x))
+
+        # Mismo criterio de orden que difflib (puntaje y luego palabra, descendente)
+        resultado = heapq.nlargest(n, resultado)
+        return [x for score, x in resultado]
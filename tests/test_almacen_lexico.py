@@ -0,0 +1,92 @@
+import multiprocessing
+import random
+
+import pytest
+
+from almacen_lexico import AlmacenLexico, leer_wal
+from tokenizacion import cargar_vocabulario
+
+BASE = "hola,saludo,0\ngracias,otros,2\n"
+PROCESOS = 4
+LOTES = 10
+
+
+def _entrada(palabra):
+    # Todos los procesos agregan la misma entrada para una palabra dada
+    return ("otros", sum(map(ord, palabra)) % 7 - 3)
+
+
+def _palabras(semilla):
+    rnd = random.Random(semilla)
+    # Vocabulario común chico: muchas palabras las agregan varios procesos a la vez
+    return [[f"p{rnd.randrange(60)}" for _ in range(rnd.randint(1, 8))] for _ in range(LOTES)]
+
+
+def _escritor(path_csv, semilla, umbral):
+    almacen = AlmacenLexico(path_csv, umbral_compactacion=umbral)
+    for lote in _palabras(semilla):
+        for palabra in lote:
+            almacen.agregar(palabra, *_entrada(palabra))
+        almacen.confirmar()
+
+
+def _correr(path_csv, umbral):
+    contexto = multiprocessing.get_context("fork")
+    procesos = [contexto.Process(target=_escritor, args=(path_csv, s, umbral)) for s in range(PROCESOS)]
+    for p in procesos:
+        p.start()
+    for p in procesos:
+        p.join(timeout=60)
+        assert p.exitcode == 0
+    return {p for s in range(PROCESOS) for lote in _palabras(s) for p in lote}
+
+
+@pytest.fixture
+def csv_base(tmp_path):
+    ruta = tmp_path / "vocabulario.csv"
+    ruta.write_text(BASE, encoding="utf-8")
+    return str(ruta)
+
+
+def test_escrituras_concurrentes_sin_duplicados(csv_base):
+    agregadas = _correr(csv_base, umbral=10**6)
+    filas, _ = leer_wal(csv_base)
+    assert len(filas) == len({p for p, _, _ in filas})
+    assert {p for p, _, _ in filas} == agregadas
+    vocab = cargar_vocabulario(csv_base, usar_compilado=False)
+    assert vocab == {"hola": ("saludo", 0), "gracias": ("otros", 2),
+                     **{p: _entrada(p) for p in agregadas}}
+
+
+def test_escrituras_concurrentes_con_compactacion(csv_base):
+    agregadas = _correr(csv_base, umbral=15)
+    vocab = cargar_vocabulario(csv_base, usar_compilado=False)
+    assert vocab == {"hola": ("saludo", 0), "gracias": ("otros", 2),
+                     **{p: _entrada(p) for p in agregadas}}
+
+    AlmacenLexico(csv_base).compactar()
+    assert leer_wal(csv_base)[0] == []
+    with open(csv_base, encoding="utf-8") as f:
+        lineas = f.read().splitlines()
+    assert len(lineas) == len(vocab)
+    assert cargar_vocabulario(csv_base, usar_compilado=False) == vocab
+
+
+def test_lector_ve_escrituras_y_compactaciones(csv_base):
+    vocab = cargar_vocabulario(csv_base, usar_compilado=False)
+    lector = AlmacenLexico(csv_base)
+    lector.sincronizado()
+    assert lector.actualizar(vocab) == {}
+
+    escritor = AlmacenLexico(csv_base)
+    escritor.agregar("Nueva", "otros", 1)
+    assert escritor.confirmar() == 1
+    assert lector.actualizar(vocab) == {"nueva": ("otros", 1)}
+
+    escritor.agregar("nueva", "otros", 1)
+    assert escritor.confirmar() == 0          # ya estaba en el WAL
+    escritor.agregar("otra", "saludo", 0)
+    escritor.confirmar()
+    escritor.compactar()
+    assert lector.actualizar(vocab) == {"otra": ("saludo", 0)}
+    assert vocab == cargar_vocabulario(csv_base, usar_compilado=False)
@@ -0,0 +1,42 @@
+import random
+
+import pytest
+
+from analizador_de_sentimiento import analizar_sentimiento
+from analizador_llamada import AnalizadorLlamada
+from protocolo import verificar_protocolo
+from tokenizacion import CATEGORIAS
+
+# Pesos con empates, ceros y negativos para ejercitar el desempate por primera ocurrencia
+LEXICON = {"bien": 2, "genial": 3, "excelente": 3, "mal": -2, "pesimo": -3,
+           "horrible": -3, "neutro": 0, "hola": 0}
+PALABRAS = list(LEXICON) + ["fuera", "lexico", "nada"]
+
+
+def _llamada(semilla, largo):
+    rnd = random.Random(semilla)
+    return [(rnd.choice(("agente", "cliente")),
+             [(rnd.choice(PALABRAS), rnd.choice(CATEGORIAS), 0) for _ in range(rnd.randint(0, 8))])
+            for _ in range(largo)]
+
+
+@pytest.mark.parametrize("semilla", range(50))
+def test_reportes_iguales_a_las_funciones_originales(semilla):
+    turnos = _llamada(semilla, random.Random(semilla).randint(0, 12))
+    analizador = AnalizadorLlamada(LEXICON)
+    for hablante, tokens_info in turnos:
+        analizador.feed_muchos(iter(tokens_info), hablante=hablante)
+
+    todos = [tok for _, tokens_info in turnos for tok, _, _ in tokens_info]
+    agente = [t for hablante, tokens_info in turnos if hablante == "agente" for t in tokens_info]
+    assert analizador.reporte_sentimiento() == analizar_sentimiento(todos, LEXICON)
+    assert analizador.reporte_protocolo() == verificar_protocolo(agente, "")
+
+
+def test_sin_guardar_no_lexico_solo_cuenta():
+    analizador = AnalizadorLlamada(LEXICON, guardar_no_lexico=False)
+    analizador.feed_muchos([("fuera", "otros", 0), ("bien", "otros", 2), ("nada", "otros", 0)])
+    reporte = analizador.reporte_sentimiento()
+    assert reporte["tokens_no_lexico"] == []
+    assert analizador.count_no_lexico == 2
+    assert reporte["puntaje_total"] == 2
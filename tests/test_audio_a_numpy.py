@@ -0,0 +1,49 @@
+import array
+
+import numpy as np
+import pytest
+
+from transcripcion import SAMPLE_RATE_WHISPER, audio_a_numpy
+
+
+class AudioFalso:
+    """Lo mínimo de pydub.AudioSegment que usa audio_a_numpy."""
+
+    def __init__(self, muestras, sample_width, channels=1, frame_rate=SAMPLE_RATE_WHISPER):
+        self.muestras = muestras
+        self.sample_width = sample_width
+        self.channels = channels
+        self.frame_rate = frame_rate
+
+    def get_array_of_samples(self):
+        codigo = {1: "B", 2: "h", 4: "i"}[self.sample_width]
+        return array.array(codigo, self.muestras)
+
+    def set_channels(self, channels):
+        mono = [sum(self.muestras[i:i + self.channels]) // self.channels
+                for i in range(0, len(self.muestras), self.channels)]
+        return AudioFalso(mono, self.sample_width, channels, self.frame_rate)
+
+    def set_frame_rate(self, frame_rate):
+        return AudioFalso(self.muestras, self.sample_width, self.channels, frame_rate)
+
+
+@pytest.mark.parametrize("sample_width, muestras", [
+    (1, [0, 64, 128, 192, 255]),                                  # sin signo, cero en 128
+    (2, [-32768, -16384, 0, 16384, 32767]),
+    (4, [-2147483648, -1073741824, 0, 1073741824, 2147483647]),
+])
+def test_rango_por_ancho_de_muestra(sample_width, muestras):
+    resultado = audio_a_numpy(AudioFalso(muestras, sample_width))
+    assert resultado.dtype == np.float32
+    np.testing.assert_allclose(resultado, [-1.0, -0.5, 0.0, 0.5, 1.0], atol=1e-2)
+
+
+def test_silencio_de_8_bits_es_cero():
+    resultado = audio_a_numpy(AudioFalso([128] * 100, 1))
+    assert not resultado.any()
+
+
+def test_estereo_se_mezcla_a_mono():
+    resultado = audio_a_numpy(AudioFalso([16384, 16384, -16384, -16384], 2, channels=2))
+    np.testing.assert_allclose(resultado, [0.5, -0.5])
@@ -0,0 +1,62 @@
+import random
+
+import pytest
+
+from automata_frases import AutomataFrases, Coincidencia
+from main import VOC_LEX_CSV
+from tokenizacion import cargar_vocabulario
+from utils import extraer_lexemas
+
+# Alfabeto chico para forzar prefijos compartidos, frases contenidas en otras
+# y apariciones superpuestas
+ALFABETO = ["a", "b", "c", "d"]
+
+
+def _fuerza_bruta(frases, tokens, turno=0):
+    coincidencias = []
+    for frase, categoria in frases.items():
+        patron = extraer_lexemas(frase)
+        if not patron:
+            continue
+        for i in range(len(tokens) - len(patron) + 1):
+            if tokens[i:i + len(patron)] == patron:
+                coincidencias.append(Coincidencia(" ".join(patron), categoria, turno, i))
+    return sorted(coincidencias)
+
+
+@pytest.mark.parametrize("semilla", range(100))
+def test_igual_a_fuerza_bruta(semilla):
+    rnd = random.Random(semilla)
+    frases = {" ".join(rnd.choices(ALFABETO, k=rnd.randint(1, 4))): rnd.choice(("saludo", "despedida"))
+              for _ in range(rnd.randint(1, 8))}
+    tokens = rnd.choices(ALFABETO, k=rnd.randint(0, 30))
+    automata = AutomataFrases(frases)
+    assert sorted(automata.buscar(tokens, turno=3)) == _fuerza_bruta(frases, tokens, turno=3)
+
+
+def test_frases_del_vocabulario_en_turnos():
+    vocab = cargar_vocabulario(VOC_LEX_CSV, usar_compilado=False)
+    automata = AutomataFrases.desde_vocabulario(vocab)
+    frases = {p: c for p, (c, _) in vocab.items()
+              if c in ("saludo", "identificacion", "palabra_ruda", "despedida")}
+    turnos = ["Hola, buenas tardes, ¿en qué le puedo ayudar?",
+              "Necesito su número de cliente por favor",
+              "Gracias por su tiempo, que tenga un buen día, adiós"]
+    esperadas = sorted(c for i, t in enumerate(turnos)
+                       for c in _fuerza_bruta(frases, extraer_lexemas(t), i))
+    assert {c.turno for c in esperadas if " " in c.frase} == {0, 1, 2}
+    assert sorted(automata.buscar_en_turnos(turnos)) == esperadas
+
+
+def test_una_frase_no_cruza_turnos():
+    automata = AutomataFrases({"buenas tardes": "saludo"})
+    assert automata.buscar_en_turnos(["Muy buenas", "tardes"]) == []
+    assert automata.buscar_en_turnos(["Muy buenas tardes"]) == [
+        Coincidencia("buenas tardes", "saludo", 0, 1)]
+
+
+def test_las_frases_del_vocabulario_no_tienen_puntaje():
+    vocab = cargar_vocabulario(VOC_LEX_CSV, usar_compilado=False)
+    frases = {p: s for p, (_, s) in vocab.items() if " " in p.strip()}
+    assert frases
+    assert all(s == 0 for s in frases.values()), frases
@@ -0,0 +1,41 @@
+import os
+import time
+
+from cache_diarizacion import CacheDiarizacion
+
+
+def _entrada(cache, clave, nbytes, hace_s):
+    cache.guardar_segmentos(clave, [(0.0, 1.0, "x" * nbytes)])
+    momento = time.time() - hace_s
+    os.utime(os.path.join(cache.directorio, clave), (momento, momento))
+
+
+def test_desalojo_por_tamanio_saca_primero_las_menos_usadas(tmp_path):
+    cache = CacheDiarizacion(str(tmp_path), max_bytes=2500, max_edad_s=None)
+    for n, clave in enumerate(["a", "b", "c"]):
+        _entrada(cache, clave, 1000, hace_s=100 - n)
+    assert cache.obtener_segmentos("a") is not None  # "a" pasa a ser la más reciente
+    assert cache.desalojar() == 1
+    assert sorted(e[0] for e in cache._entradas()) == ["a", "c"]
+
+
+def test_desalojo_por_antiguedad(tmp_path):
+    cache = CacheDiarizacion(str(tmp_path), max_bytes=None, max_edad_s=3600)
+    _entrada(cache, "vieja", 10, hace_s=7200)
+    _entrada(cache, "nueva", 10, hace_s=0)
+    assert cache.desalojar() == 1
+    assert [e[0] for e in cache._entradas()] == ["nueva"]
+
+
+def test_limites_por_defecto(tmp_path):
+    cache = CacheDiarizacion(str(tmp_path))
+    assert cache.max_bytes and cache.max_edad_s
+
+
+def test_linea_cortada_se_ignora_y_se_sigue_escribiendo(tmp_path):
+    cache = CacheDiarizacion(str(tmp_path))
+    cache.guardar_transcripcion("k", 0, "hola")
+    with open(os.path.join(str(tmp_path), "k", "transcripcion.jsonl"), "a", encoding="utf-8") as f:
+        f.write('{"i": 1, "tex')
+    cache.guardar_transcripcion("k", 2, "chau")
+    assert cache.obtener_transcripciones("k") == {0: "hola", 2: "chau"}
@@ -0,0 +1,207 @@
+import glob
+import os
+import random
+
+import pytest
+
+from analizador_de_sentimiento import analizar_sentimiento
+from indice_incremental import IndiceConteos
+from lematizacion import candidatos
+from main import VOC_LEX_CSV, analizar_transcripcion, lexicon_desde_vocabulario, separar_turnos
+from protocolo import verificar_protocolo
+from puntaje_corpus import CorpusTokens, puntuar_corpus
+from tokenizacion import cargar_vocabulario, tokenizar_texto
+from utils import extraer_lexemas
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+TRANSCRIPCIONES = sorted(glob.glob(os.path.join(RAIZ, "transcripcion*.txt")))
+
+
+@pytest.fixture(scope="module")
+def vocab():
+    return cargar_vocabulario(VOC_LEX_CSV, usar_compilado=False)
+
+
+def _main(ruta, vocab):
+    with open(ruta, encoding="utf-8") as f:
+        return analizar_transcripcion(f.read(), vocab, lexicon_desde_vocabulario(vocab))
+
+
+def test_puntuar_corpus_coincide_con_main(vocab):
+    corpus = CorpusTokens.desde_archivos(TRANSCRIPCIONES)
+    resultados = puntuar_corpus(corpus, lexicon_desde_vocabulario(vocab))
+    for ruta, resultado in zip(TRANSCRIPCIONES, resultados):
+        esperado = _main(ruta, vocab)["sentimiento"]
+        assert resultado == esperado, os.path.basename(ruta)
+
+
+@pytest.mark.parametrize("semilla", range(20))
+def test_puntuar_corpus_aleatorio(semilla, tmp_path):
+    # Pesos con empates y documentos vacíos (reduceat no los admite)
+    lexicon = {"bien": 2, "genial": 3, "excelente": 3, "mal": -2, "pesimo": -3,
+               "horrible": -3, "neutro": 0}
+    palabras = list(lexicon) + ["fuera", "nada"]
+    rnd = random.Random(semilla)
+    documentos = [[rnd.choice(palabras) for _ in range(rnd.choice((0, 0, 1, 5, 40)))]
+                  for _ in range(rnd.randint(0, 15))]
+    ruta = str(tmp_path / "corpus.npz")
+    CorpusTokens.desde_tokens(documentos).guardar(ruta)
+    resultados = puntuar_corpus(CorpusTokens.cargar(ruta), lexicon, lematizar=False)
+    assert resultados == [analizar_sentimiento(tokens, lexicon) for tokens in documentos]
+
+
+def test_puntuar_corpus_ve_lemas_nuevos_sin_reindexar():
+    corpus = CorpusTokens.desde_tokens([["revisare", "todo"]])
+    assert puntuar_corpus(corpus, {"todo": 0})[0]["puntaje_total"] == 0
+    resultado = puntuar_corpus(corpus, {"todo": 0, "revisar": 2})[0]
+    assert resultado["puntaje_total"] == 2
+    assert resultado["palabra_mas_positiva"] == ("revisar", 2)
+
+
+def _reporte_main(ruta, vocab):
+    analisis = _main(ruta, vocab)
+    sentimiento = dict(analisis["sentimiento"])
+    sentimiento["count_no_lexico"] = len(sentimiento.pop("tokens_no_lexico"))
+    return sentimiento, analisis["protocolo"]["rudas"]["lista"]
+
+
+def test_indice_coincide_con_main(vocab, tmp_path):
+    indice = IndiceConteos(str(tmp_path / "indice.sqlite"))
+    indice.indexar(TRANSCRIPCIONES, vocab)
+    for ruta in TRANSCRIPCIONES:
+        reporte = indice.reporte(ruta)
+        sentimiento, rudas = _reporte_main(ruta, vocab)
+        assert reporte["sentimiento"] == sentimiento, os.path.basename(ruta)
+        assert reporte["protocolo"]["rudas"]["lista"] == rudas
+    indice.cerrar()
+
+
+@pytest.mark.parametrize("cambio", [
+    {"lamentable": ("otros", -3), "genial": None},                    # pesos de palabras
+    {"ineficiente": None},                                            # su plural deja de resolverse
+    {"esperar": ("otros", -2), "ayudar": ("otros", 1), "tarde": ("saludo", 1)},  # lemas
+    {"idiota": ("otros", -1), "atender": ("palabra_ruda", -3)},        # rudas
+])
+def test_aplicar_vocabulario_equivale_a_reindexar(vocab, tmp_path, cambio):
+    nuevo = dict(vocab)
+    for palabra, entrada in cambio.items():
+        if entrada is None:
+            nuevo.pop(palabra, None)
+        else:
+            nuevo[palabra] = entrada
+
+    incremental = IndiceConteos(str(tmp_path / "incremental.sqlite"))
+    incremental.indexar(TRANSCRIPCIONES, vocab)
+    incremental.aplicar_vocabulario(nuevo)
+    completo = IndiceConteos(str(tmp_path / "completo.sqlite"))
+    completo.indexar(TRANSCRIPCIONES, nuevo)
+    for ruta in TRANSCRIPCIONES:
+        assert incremental.reporte(ruta) == completo.reporte(ruta), os.path.basename(ruta)
+    assert incremental.vocabulario() == nuevo
+    incremental.cerrar()
+    completo.cerrar()
+
+
+def test_indexar_solo_lo_modificado(vocab, tmp_path):
+    rutas = []
+    for i, ruta in enumerate(TRANSCRIPCIONES[:2]):
+        copia = tmp_path / f"llamada{i}.txt"
+        with open(ruta, encoding="utf-8") as f:
+            copia.write_text(f.read(), encoding="utf-8")
+        rutas.append(str(copia))
+    indice = IndiceConteos(str(tmp_path / "indice.sqlite"))
+    assert indice.indexar(rutas, vocab) == 2
+    assert indice.indexar(rutas, vocab) == 0
+
+    with open(rutas[0], "a", encoding="utf-8") as f:
+        f.write("Agente: Lamentablemente es un problema terrible.\n")
+    os.utime(rutas[0], (0, os.path.getmtime(rutas[0]) + 10))
+    assert indice.indexar(rutas, vocab) == 1
+    sentimiento, rudas = _reporte_main(rutas[0], vocab)
+    assert indice.reporte(rutas[0])["sentimiento"] == sentimiento
+
+    with pytest.raises(ValueError):
+        indice.indexar(rutas, {**vocab, "pesimamente": ("otros", -3)})
+    indice.cerrar()
+
+
+def test_protocolo_del_indice_es_el_de_los_tokens(vocab, tmp_path):
+    # Identificación y palabra ruda sólo como frases de varias palabras
+    ruta = tmp_path / "frases.txt"
+    ruta.write_text("Agente: Hola, me da su numero de cliente\n"
+                    "Cliente: Esto no sirve para nada\n"
+                    "Agente: Eso no sirve para nada, adios\n", encoding="utf-8")
+    indice = IndiceConteos(str(tmp_path / "indice.sqlite"))
+    indice.indexar([str(ruta)], vocab)
+    protocolo = indice.reporte(str(ruta))["protocolo"]
+    indice.cerrar()
+
+    with open(ruta, encoding="utf-8") as f:
+        texto = f.read()
+    turnos_agente, _ = separar_turnos(texto)
+    tokens_agente = tokenizar_texto(" ".join(turnos_agente), vocab)[0]
+    assert protocolo == verificar_protocolo(tokens_agente, "")
+
+    completo = analizar_transcripcion(texto, vocab, lexicon_desde_vocabulario(vocab))["protocolo"]
+    assert completo["identificacion"]["ok"] and not protocolo["identificacion"]["ok"]
+    assert "no sirve para nada" in completo["rudas"]["lista"]
+    assert protocolo["rudas"]["lista"] == []
+
+
+def test_aplicar_no_recorre_las_formas_del_indice(vocab, tmp_path):
+    indice = IndiceConteos(str(tmp_path / "indice.sqlite"))
+    indice.indexar(TRANSCRIPCIONES, vocab)
+    consultas = []
+    indice.conexion.set_trace_callback(consultas.append)
+    indice.aplicar_vocabulario({**vocab, "esperar": ("otros", -2)})
+    indice.conexion.set_trace_callback(None)
+    assert not [c for c in consultas if "FROM ocurrencias" in c and "WHERE" not in c]
+    indice.cerrar()
+
+
+def test_indice_anterior_a_la_tabla_de_lemas(vocab, tmp_path):
+    ruta = str(tmp_path / "indice.sqlite")
+    indice = IndiceConteos(ruta)
+    indice.indexar(TRANSCRIPCIONES, vocab)
+    with indice.conexion:
+        indice.conexion.execute("DELETE FROM lemas")
+        indice.conexion.execute("PRAGMA user_version = 0")
+    indice.cerrar()
+
+    nuevo = {**vocab, "esperar": ("otros", -2), "ayudar": ("otros", 1)}
+    migrado = IndiceConteos(ruta)
+    migrado.aplicar_vocabulario(nuevo)
+    completo = IndiceConteos(str(tmp_path / "completo.sqlite"))
+    completo.indexar(TRANSCRIPCIONES, nuevo)
+    for transcripcion in TRANSCRIPCIONES:
+        assert migrado.reporte(transcripcion) == completo.reporte(transcripcion)
+    migrado.cerrar()
+    completo.cerrar()
+
+
+@pytest.mark.parametrize("semilla", range(5))
+def test_aplicar_cambios_aleatorios_equivale_a_reindexar(vocab, tmp_path, semilla):
+    rnd = random.Random(semilla)
+    formas = set()
+    for ruta in TRANSCRIPCIONES:
+        with open(ruta, encoding="utf-8") as f:
+            formas.update(extraer_lexemas(f.read()))
+    # Palabras del vocabulario y lemas candidatos de las formas (nuevos o no)
+    palabras = sorted(set(vocab) | {l for f in formas for l in candidatos(f)} | formas)
+    nuevo = dict(vocab)
+    for palabra in rnd.sample(palabras, 40):
+        if palabra in nuevo and rnd.random() < 0.4:
+            del nuevo[palabra]
+        else:
+            nuevo[palabra] = (rnd.choice(("otros", "saludo", "palabra_ruda", "despedida")),
+                              rnd.randint(-3, 3))
+
+    incremental = IndiceConteos(str(tmp_path / "incremental.sqlite"))
+    incremental.indexar(TRANSCRIPCIONES, vocab)
+    incremental.aplicar_vocabulario(nuevo)
+    completo = IndiceConteos(str(tmp_path / "completo.sqlite"))
+    completo.indexar(TRANSCRIPCIONES, nuevo)
+    for ruta in TRANSCRIPCIONES:
+        assert incremental.reporte(ruta) == completo.reporte(ruta), os.path.basename(ruta)
+    incremental.cerrar()
+    completo.cerrar()
@@ -0,0 +1,55 @@
+import numpy as np
+
+from filtro_voz import ParametrosFiltro, energia_por_tramos, filtrar_segmentos
+from transcripcion_paralela import SAMPLE_RATE
+
+P = ParametrosFiltro(umbral_db=-30.0)
+
+
+def audio(duracion_s, tramos_voz):
+    """Silencio con un tono de amplitud 0.5 en cada (inicio_s, fin_s)."""
+    muestras = np.zeros(int(duracion_s * SAMPLE_RATE), dtype=np.float32)
+    for inicio, fin in tramos_voz:
+        n = np.arange(int(inicio * SAMPLE_RATE), int(fin * SAMPLE_RATE))
+        muestras[n] = 0.5 * np.sin(2 * np.pi * 220 * n / SAMPLE_RATE)
+    return muestras
+
+
+def test_energia_de_silencio_y_tono():
+    energias = energia_por_tramos(audio(1.0, [(0.5, 1.0)]))
+    assert len(energias) == 50
+    assert energias[:25].max() < -100
+    np.testing.assert_allclose(energias[25:], 20 * np.log10(0.5 / np.sqrt(2)), atol=0.1)
+
+
+def test_recorta_silencio_con_relleno():
+    muestras = audio(10.0, [(2.0, 4.0)])
+    segmentos, reporte = filtrar_segmentos(muestras, [(1.0, 6.0, "A")], P)
+    inicio, fin, hablante = segmentos[0]
+    assert hablante == "A"
+    assert abs(inicio - (2.0 - P.relleno_s)) <= P.tramo_s
+    assert abs(fin - (4.0 + P.relleno_s)) <= P.tramo_s
+    assert reporte.saltado_s > 2.5
+
+
+def test_nunca_extiende_un_segmento():
+    muestras = audio(10.0, [(0.0, 10.0)])
+    segmentos, _ = filtrar_segmentos(muestras, [(2.0, 3.0, "A"), (5.0, 8.0, "B")], P)
+    assert segmentos == [(2.0, 3.0, "A"), (5.0, 8.0, "B")]
+
+
+def test_descarta_silencio_y_ruidos_cortos():
+    muestras = audio(10.0, [(1.0, 3.0), (5.0, 5.1)])
+    segmentos, reporte = filtrar_segmentos(
+        muestras, [(0.5, 3.5, "A"), (4.8, 5.4, "B"), (7.0, 9.0, "A")], P)
+    assert [s[2] for s in segmentos] == ["A"]
+    assert reporte.descartados == 2
+
+
+def test_une_turnos_del_mismo_hablante_con_pausa_corta():
+    muestras = audio(10.0, [(1.0, 2.0), (2.3, 3.0), (5.0, 6.0)])
+    segmentos, reporte = filtrar_segmentos(
+        muestras, [(1.0, 2.0, "A"), (2.3, 3.0, "A"), (5.0, 6.0, "A")], P)
+    assert segmentos == [(1.0, 3.0, "A"), (5.0, 6.0, "A")]
+    assert reporte.fusionados == 1
+    assert reporte.llamadas_despues < reporte.llamadas_antes
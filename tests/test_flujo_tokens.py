@@ -0,0 +1,69 @@
+import random
+
+import pytest
+
+from analizador_de_sentimiento import analizar_sentimiento
+from flujo_tokens import FlujoTokens, TablaTokens, tokenizar_flujo
+from protocolo import verificar_protocolo
+from tokenizacion import CATEGORIAS, tokenizar_texto
+
+LEXICON = {"bien": 2, "genial": 3, "excelente": 3, "mal": -2, "pesimo": -3,
+           "horrible": -3, "neutro": 0}
+PALABRAS = list(LEXICON) + ["fuera", "lexico", "nada"]
+# Categorías fuera de CATEGORIAS reciben códigos nuevos
+CATEGORIAS_EXTRA = list(CATEGORIAS) + ["queja", "consulta"]
+
+
+def _turnos(semilla):
+    rnd = random.Random(semilla)
+    return [(rnd.choice(("agente", "cliente")),
+             [(rnd.choice(PALABRAS), rnd.choice(CATEGORIAS_EXTRA), rnd.randint(-3, 3))
+              for _ in range(rnd.randint(0, 8))])
+            for _ in range(rnd.randint(0, 10))]
+
+
+@pytest.mark.parametrize("semilla", range(50))
+def test_flujo_equivale_a_listas_de_tuplas(semilla):
+    turnos = _turnos(semilla)
+    flujo = FlujoTokens()
+    for hablante, tokens_info in turnos:
+        flujo.extender(iter(tokens_info), hablante)
+
+    todas = [t for _, tokens_info in turnos for t in tokens_info]
+    agente = [t for hablante, tokens_info in turnos if hablante == "agente" for t in tokens_info]
+    assert flujo.tuplas() == todas
+    assert list(flujo.tokens()) == [tok for tok, _, _ in todas]
+    assert flujo.del_hablante("agente").tuplas() == agente
+    assert analizar_sentimiento(flujo, LEXICON) == analizar_sentimiento(
+        [tok for tok, _, _ in todas], LEXICON)
+    assert verificar_protocolo(flujo, "") == verificar_protocolo(agente, "")
+
+
+def test_indexar_y_rebanar():
+    tuplas = [("bien", "saludo", 1), ("mal", "queja", -2), ("nada", "otros", 0)]
+    flujo = FlujoTokens.desde_tuplas(tuplas)
+    assert flujo[1] == tuplas[1]
+    assert flujo[-1] == tuplas[-1]
+    assert flujo[::2] == tuplas[::2]
+    assert len(flujo) == 3
+
+
+def test_tokenizar_flujo_como_tokenizar_texto():
+    vocab = {"hola": ("saludo", 0), "gracias": ("otros", 2), "revisar": ("otros", 1)}
+    texto = "Hola, gracias: revisaré su caso"
+    flujo, sugerencias = tokenizar_flujo(texto, vocab)
+    tuplas, esperadas = tokenizar_texto(texto, vocab)
+    assert flujo.tuplas() == tuplas
+    assert sugerencias == esperadas
+
+
+def test_pesos_de_un_lexicon_nuevo_con_el_id_de_uno_liberado():
+    tabla = TablaTokens()
+    for palabra in PALABRAS:
+        tabla.id(palabra)
+    for peso in range(-3, 4):
+        # Lexicones temporales del mismo tamaño: CPython suele reutilizar la
+        # dirección (y por lo tanto el id()) del dict anterior ya liberado
+        pesos, presentes = tabla.pesos({palabra: peso for palabra in LEXICON})
+        assert list(pesos) == [peso if p in LEXICON else 0 for p in PALABRAS]
+        assert list(presentes) == [p in LEXICON for p in PALABRAS]
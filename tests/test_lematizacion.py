@@ -0,0 +1,69 @@
+import pytest
+
+from lematizacion import FORMAS_IRREGULARES, NO_LEMATIZAR, buscar_lema, candidatos
+
+VOCAB = {"revisar", "esperar", "tarde", "idiota", "atento", "vez", "agradecer", "indicar",
+         "llegar", "ayudar", "poder", "ir", "facturacion", "forma", "formar", "lamentar",
+         "falto", "contar", "cargar", "estar", "ineficiente"}
+
+
+@pytest.mark.parametrize("forma, lema", [
+    ("revisare", "revisar"),      # futuro
+    ("espere", "esperar"),        # subjuntivo / imperativo de cortesía
+    ("tardes", "tarde"),          # plural
+    ("idiotas", "idiota"),
+    ("atenta", "atento"),         # femenino de adjetivo
+    ("atentamente", "atento"),
+    ("veces", "vez"),
+    ("facturaciones", "facturacion"),
+    ("agradezco", "agradecer"),   # cambio ortográfico de la raíz
+    ("indique", "indicar"),
+    ("llegue", "llegar"),
+    ("ayudarle", "ayudar"),       # enclítico
+    ("indiqueme", "indicar"),
+    ("puede", "poder"),           # irregulares
+    ("voy", "ir"),
+    ("formas", "forma"),          # el plural va antes que el verbo
+    ("ineficientes", "ineficiente"),
+])
+def test_formas_flexionadas(forma, lema):
+    assert buscar_lema(forma, VOCAB) == lema
+
+
+@pytest.mark.parametrize("forma", [
+    "lamento",   # "lamento las molestias": disculpa, no "lamentar"
+    "falta",     # sustantivo, no el femenino de "falto"
+    "cuenta",    # sustantivo, no "contar"
+    "cargo",     # sustantivo, no "cargar"
+    "estado",    # sustantivo, no "estar"
+    "esta",      # determinante
+    "hablo",     # primera persona del presente regular
+])
+def test_no_cambia_la_clase_de_palabra(forma):
+    assert buscar_lema(forma, VOCAB) is None
+
+
+def test_sin_candidatos_para_formas_cortas_ni_excluidas():
+    assert candidatos("mas") == ()
+    assert candidatos("les") == ()
+    assert all(candidatos(forma) == () for forma in NO_LEMATIZAR)
+
+
+def test_irregulares_solo_dan_sus_lemas():
+    for forma, lemas in FORMAS_IRREGULARES.items():
+        if forma not in NO_LEMATIZAR:
+            assert candidatos(forma) == lemas
+
+
+def test_candidatos_no_incluyen_la_forma_ni_repetidos():
+    for forma in ["revisare", "tardes", "atentamente", "agradezco", "formas", "ayudarle"]:
+        lemas = candidatos(forma)
+        assert forma not in lemas
+        assert len(set(lemas)) == len(lemas)
+
+
+def test_el_vocabulario_se_consulta_en_cada_llamada():
+    vocab = set()
+    assert buscar_lema("gestionare", vocab) is None
+    vocab.add("gestionar")  # palabra nueva (modo interactivo / WAL) sin invalidar la caché
+    assert buscar_lema("gestionare", vocab) == "gestionar"
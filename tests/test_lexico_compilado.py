@@ -0,0 +1,75 @@
+import os
+import shutil
+import time
+
+import pytest
+
+from lexico_compilado import LexicoCompilado, compilado_vigente, compilar_lexico, ruta_compilada
+from main import VOC_LEX_CSV, load_lexicon
+from tokenizacion import cargar_vocabulario
+
+
+@pytest.fixture
+def lexc(tmp_path):
+    rutas = []
+
+    def compilar(vocab):
+        ruta = str(tmp_path / f"vocab{len(rutas)}.lexc")
+        assert compilar_lexico(vocab, ruta) == len(vocab)
+        lexico = LexicoCompilado(ruta)
+        rutas.append(lexico)
+        return lexico
+
+    yield compilar
+    for lexico in rutas:
+        lexico.cerrar()
+
+
+def test_ida_y_vuelta_del_vocabulario_incluido(lexc):
+    vocab = cargar_vocabulario(VOC_LEX_CSV, usar_compilado=False)
+    lexico = lexc(vocab)
+    assert lexico.a_dict() == vocab
+    assert list(lexico) == list(vocab)  # conserva el orden del CSV
+    assert len(lexico) == len(vocab)
+    for palabra, entrada in vocab.items():
+        assert palabra in lexico and lexico[palabra] == entrada
+        assert lexico.puntajes()[palabra] == entrada[1]
+    assert dict(lexico.puntajes()) == load_lexicon(VOC_LEX_CSV)
+
+
+def test_casos_borde(lexc):
+    vocab = {"ñandú": ("otros", -3), "buenas tardes": ("saludo", 0),
+             "x": ("palabra_ruda", 2**31 - 1), "y": ("otros", -2**31)}
+    lexico = lexc(vocab)
+    assert lexico.a_dict() == vocab
+    for ausente in ["", "nandu", "buenas", "z", 3, None]:
+        assert ausente not in lexico
+    with pytest.raises(KeyError):
+        lexico["z"]
+
+
+def test_vocabulario_vacio(lexc):
+    lexico = lexc({})
+    assert len(lexico) == 0 and lexico.a_dict() == {} and "a" not in lexico
+
+
+def test_entrada_invalida(tmp_path):
+    with pytest.raises(ValueError):
+        compilar_lexico({"a\nb": ("otros", 0)}, str(tmp_path / "x.lexc"))
+
+
+def test_compilado_vigente_y_carga(tmp_path):
+    csv = str(tmp_path / "vocabulario.csv")
+    shutil.copy(VOC_LEX_CSV, csv)
+    assert compilado_vigente(csv) is None
+    vocab = cargar_vocabulario(csv, usar_compilado=False)
+    compilar_lexico(vocab, ruta_compilada(csv))
+    assert compilado_vigente(csv) == ruta_compilada(csv)
+    assert cargar_vocabulario(csv) == vocab
+
+    # Editar el CSV deja viejo al compilado: se vuelve a leer el CSV
+    with open(csv, "a", encoding="utf-8") as f:
+        f.write("nuevisima,otros,2\n")
+    os.utime(csv, (time.time() + 5, time.time() + 5))
+    assert compilado_vigente(csv) is None
+    assert cargar_vocabulario(csv)["nuevisima"] == ("otros", 2)
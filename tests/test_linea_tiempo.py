@@ -0,0 +1,82 @@
+import os
+import random
+
+import pytest
+
+from linea_tiempo import LineaTiempo, guardar_tiempos, leer_tiempos
+
+LEXICON = {"bien": 2, "genial": 3, "mal": -2, "pesimo": -3, "neutro": 0}
+PALABRAS = list(LEXICON) + ["fuera", "nada"]
+
+
+def _llamada(rnd, con_tiempos):
+    turnos, inicio = [], 0.0
+    for _ in range(rnd.randint(0, 25)):
+        tokens = [(rnd.choice(PALABRAS), "otros", 0) for _ in range(rnd.randint(0, 12))]
+        tiempos = (None, None)
+        if con_tiempos:
+            # Turnos ordenados por inicio, con superpuestos y anidados
+            inicio += rnd.uniform(0, 8)
+            tiempos = (inicio, inicio + rnd.uniform(0.5, 20))
+        turnos.append((rnd.choice(("agente", "cliente")), tokens, tiempos))
+    return turnos
+
+
+def _fuerza_bruta(turnos, ventana_tokens, ventana_s):
+    pesos, puntos, fines = [], [], []
+    for hablante, tokens, (inicio_s, fin_s) in turnos:
+        sumas = [sum(pesos[-ventana_tokens:])]
+        for tok, _, _ in tokens:
+            pesos.append(LEXICON.get(tok, 0))
+            sumas.append(sum(pesos[-ventana_tokens:]))
+        ventana_tiempo = None
+        if fin_s is not None:
+            fines.append((fin_s, sum(LEXICON.get(t, 0) for t, _, _ in tokens)))
+            limite = max(f for f, _ in fines) - ventana_s
+            ventana_tiempo = sum(p for f, p in fines if f >= limite)
+        puntos.append((len(puntos), hablante, inicio_s, fin_s, len(tokens),
+                       sum(LEXICON.get(t, 0) for t, _, _ in tokens),
+                       sumas[-1], min(sumas), ventana_tiempo, sum(pesos)))
+    return puntos
+
+
+@pytest.mark.parametrize("con_tiempos", [False, True])
+@pytest.mark.parametrize("semilla", range(30))
+def test_igual_a_fuerza_bruta(semilla, con_tiempos):
+    rnd = random.Random(semilla)
+    ventana_tokens, ventana_s = rnd.randint(1, 15), rnd.uniform(5, 40)
+    turnos = _llamada(rnd, con_tiempos)
+    linea = LineaTiempo(LEXICON, ventana_tokens=ventana_tokens, ventana_s=ventana_s)
+    for hablante, tokens, (inicio_s, fin_s) in turnos:
+        # registrar reproduce las tripletas sin cambios
+        assert list(linea.registrar(iter(tokens), hablante, inicio_s, fin_s)) == tokens
+    assert [tuple(p) for p in linea.puntos] == _fuerza_bruta(turnos, ventana_tokens, ventana_s)
+
+
+def test_turno_anidado_no_deja_turnos_viejos_en_la_ventana():
+    linea = LineaTiempo(LEXICON, ventana_s=30.0)
+    linea.agregar_turno([("mal", "otros", 0)], "cliente", 0.0, 50.0)
+    linea.agregar_turno([("genial", "otros", 0)], "agente", 10.0, 100.0)
+    linea.agregar_turno([("bien", "otros", 0)], "cliente", 60.0, 65.0)   # anidado
+    punto = linea.agregar_turno([("pesimo", "otros", 0)], "agente", 70.0, 90.0)
+    assert punto.ventana_tiempo == 3 - 3   # "bien" y "mal" terminaron antes de 100 - 30
+
+
+def test_peor_momento_y_serie():
+    linea = LineaTiempo(LEXICON, ventana_tokens=2)
+    linea.agregar_turno([("bien", "otros", 0)], "agente")
+    linea.agregar_turno([("pesimo", "otros", 0), ("mal", "otros", 0), ("bien", "otros", 0)], "cliente")
+    assert linea.peor_momento().turno == 1
+    serie = linea.serie()
+    assert serie["hablantes"] == "AC"
+    assert serie["ventana_min"] == [0, -5]
+    assert "fin_s" not in serie
+
+
+def test_tiempos_viejos_se_ignoran(tmp_path):
+    ruta = tmp_path / "llamada.txt"
+    ruta.write_text("Agente: hola\n", encoding="utf-8")
+    guardar_tiempos(str(ruta), [(0.0, 1.234)])
+    assert leer_tiempos(str(ruta)) == [(0.0, 1.23)]
+    os.utime(ruta, (0, os.path.getmtime(ruta) + 10))
+    assert leer_tiempos(str(ruta)) is None
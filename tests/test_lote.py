@@ -0,0 +1,84 @@
+import glob
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+from lote import escribir_reporte, listar_transcripciones, procesar_lote
+from main import VOC_LEX_CSV, analizar_transcripcion, lexicon_desde_vocabulario
+from tokenizacion import cargar_vocabulario
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+TRANSCRIPCIONES = sorted(glob.glob(os.path.join(RAIZ, "transcripcion*.txt")))
+
+
+@pytest.fixture
+def vocab(monkeypatch):
+    monkeypatch.chdir(RAIZ)  # los workers abren el almacén del vocabulario por defecto
+    vocab_catalog = cargar_vocabulario(VOC_LEX_CSV, usar_compilado=False)
+    return vocab_catalog, lexicon_desde_vocabulario(vocab_catalog)
+
+
+@pytest.fixture
+def transcripciones(tmp_path):
+    """
+    Copias de las transcripciones del repo (más variantes, para que haya varias
+    por worker) y un archivo que no se puede leer como UTF-8 en el medio.
+    """
+    rutas = []
+    for i, ruta in enumerate(TRANSCRIPCIONES * 3):
+        with open(ruta, encoding="utf-8") as f:
+            texto = f.read()
+        copia = tmp_path / f"{i:02d}.txt"
+        copia.write_text(texto if i < len(TRANSCRIPCIONES) else texto + "\nAgente: gracias, adiós\n" * i,
+                         encoding="utf-8")
+        rutas.append(str(copia))
+    roto = tmp_path / "05b.txt"
+    roto.write_bytes(b"Agente: hola \xff\xfe\n")
+    return sorted(rutas + [str(roto)])
+
+
+def _esperado(ruta, vocab_catalog, lexicon):
+    with open(ruta, encoding="utf-8") as f:
+        resultado = analizar_transcripcion(f.read(), dict(vocab_catalog), dict(lexicon))
+    return {"archivo": ruta, "sentimiento": resultado["sentimiento"], "protocolo": resultado["protocolo"],
+            "tokens_no_reconocidos": {**resultado["sugerencias_agente"], **resultado["sugerencias_cliente"]}}
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_lote_igual_a_analizar_cada_archivo(vocab, transcripciones, workers):
+    vocab_catalog, lexicon = vocab
+    registros = list(procesar_lote(transcripciones, vocab_catalog, lexicon, workers=workers))
+    assert [r["archivo"] for r in registros] == transcripciones
+    for ruta, registro in zip(transcripciones, registros):
+        if ruta.endswith("05b.txt"):
+            # El error de un archivo queda en su registro sin cortar el lote
+            assert "codec can't decode" in registro["error"]
+            continue
+        # Ida y vuelta por JSON, como en el reporte (las tuplas pasan a listas)
+        assert json.loads(json.dumps(registro)) == json.loads(json.dumps(_esperado(ruta, *vocab)))
+
+
+def test_lote_vacio(vocab, tmp_path):
+    vocab_catalog, lexicon = vocab
+    assert list(procesar_lote([], vocab_catalog, lexicon, workers=2)) == []
+    assert listar_transcripciones(str(tmp_path)) == []
+    salida = str(tmp_path / "reporte.jsonl")
+    assert escribir_reporte(iter([]), salida) == 0
+    proceso = subprocess.run([sys.executable, os.path.join(RAIZ, "lote.py"), str(tmp_path)],
+                             capture_output=True, text=True, cwd=RAIZ, timeout=60)
+    assert proceso.returncode == 1
+    assert "[ERROR] No se encontraron transcripciones" in proceso.stdout
+
+
+def test_reporte_csv_marca_los_errores(vocab, transcripciones, tmp_path):
+    vocab_catalog, lexicon = vocab
+    salida = str(tmp_path / "reporte.csv")
+    total = escribir_reporte(procesar_lote(transcripciones, vocab_catalog, lexicon, workers=2), salida)
+    assert total == len(transcripciones)
+    with open(salida, encoding="utf-8") as f:
+        lineas = f.read().splitlines()
+    assert len(lineas) == total + 1
+    assert sum("ERROR:" in linea for linea in lineas) == 1
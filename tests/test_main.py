@@ -0,0 +1,91 @@
+import glob
+import os
+import random
+
+import pytest
+
+from main import VOC_LEX_CSV, analizar_archivo, analizar_transcripcion, iterar_turnos, \
+    lexicon_desde_vocabulario, separar_turnos
+from tokenizacion import cargar_vocabulario
+
+# Frases cortadas por saltos de línea dentro de un mismo turno
+CORTADA = ("Agente: Hola, buenas\n"
+           "tardes. ¿En qué le puedo ayudar?\n"
+           "Cliente: Mi internet no sirve\n"
+           "para nada.\n"
+           "Agente: Lo reviso. Gracias por su tiempo, que tenga un\n"
+           "buen dia\n")
+
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+TRANSCRIPCIONES = sorted(glob.glob(os.path.join(RAIZ, "transcripcion*.txt")))
+
+
+@pytest.fixture(scope="module")
+def vocab():
+    return cargar_vocabulario(VOC_LEX_CSV, usar_compilado=False)
+
+
+def _archivo(tmp_path, texto):
+    ruta = tmp_path / "transcripcion.txt"
+    ruta.write_text(texto, encoding="utf-8")
+    return str(ruta)
+
+
+def test_iterar_turnos_une_las_lineas_de_continuacion(tmp_path):
+    ruta = _archivo(tmp_path, CORTADA)
+    agente, cliente = separar_turnos(CORTADA)
+    assert list(iterar_turnos(ruta, "agente")) == agente
+    assert list(iterar_turnos(ruta, "cliente")) == cliente
+
+
+def test_frases_que_cruzan_lineas_en_streaming(vocab, tmp_path):
+    lexicon = lexicon_desde_vocabulario(vocab)
+    protocolo = analizar_archivo(_archivo(tmp_path, CORTADA), vocab, lexicon)["protocolo"]
+    assert protocolo == analizar_transcripcion(CORTADA, vocab, lexicon)["protocolo"]
+    assert protocolo["saludo"]["primer_turno"]
+    assert protocolo["despedida"] == {"ok": True, "ultimo_turno": True}
+    assert {"buenas tardes", "que tenga un buen dia"} <= {f["frase"] for f in protocolo["frases"]}
+
+
+def _cortar_lineas(texto, semilla):
+    """
+    La misma transcripción con cada turno partido en varias líneas sin prefijo.
+    """
+    rnd = random.Random(semilla)
+    lineas = []
+    for linea in texto.splitlines():
+        palabras = linea.split()
+        while len(palabras) > 1 and rnd.random() < 0.6:
+            corte = rnd.randint(1, len(palabras) - 1)
+            lineas.append(" ".join(palabras[:corte]))
+            palabras = palabras[corte:]
+        lineas.append(" ".join(palabras))
+    return "\n".join(lineas) + "\n"
+
+
+def _textos():
+    textos = [CORTADA]
+    for ruta in TRANSCRIPCIONES:
+        with open(ruta, encoding="utf-8") as f:
+            original = f.read()
+        textos.append(original)
+        textos.extend(_cortar_lineas(original, semilla) for semilla in range(3))
+    return textos
+
+
+@pytest.mark.parametrize("texto", _textos())
+def test_analizar_archivo_igual_a_analizar_transcripcion(vocab, tmp_path, texto):
+    lexicon = lexicon_desde_vocabulario(vocab)
+    en_memoria = analizar_transcripcion(texto, vocab, lexicon)
+    streaming = analizar_archivo(_archivo(tmp_path, texto), vocab, lexicon)
+    assert set(streaming) == set(en_memoria)
+    # Única diferencia documentada: "tokens_no_lexico" no se acumula
+    assert streaming["sentimiento"].pop("tokens_no_lexico") == []
+    en_memoria["sentimiento"].pop("tokens_no_lexico")
+    for campo in ("sentimiento", "protocolo"):
+        for clave, valor in en_memoria[campo].items():
+            assert streaming[campo][clave] == valor, (campo, clave)
+        assert set(streaming[campo]) == set(en_memoria[campo])
+    assert streaming["sugerencias_agente"] == en_memoria["sugerencias_agente"]
+    assert streaming["sugerencias_cliente"] == en_memoria["sugerencias_cliente"]
@@ -0,0 +1,111 @@
+import asyncio
+import json
+import os
+
+import pytest
+
+from servidor_analisis import MAX_SOLICITUD_BYTES, ServidorAnalisis
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+TEXTO = "Agente: Hola, buenas tardes.\nCliente: Tengo un problema terrible.\nAgente: Gracias, adiós."
+
+
+@pytest.fixture
+def analisis(monkeypatch):
+    monkeypatch.chdir(RAIZ)  # el vocabulario se lee de la raíz del repo
+    servidor = ServidorAnalisis(workers=1, max_cola=2)
+    yield servidor
+    servidor.pool.shutdown(cancel_futures=True)
+
+
+async def _con_servidor(analisis, cliente):
+    """
+    Inicia 'analisis' en un puerto libre, corre cliente(reader, writer) y lo detiene.
+    """
+    await analisis.iniciar()
+    servidor = await asyncio.start_server(analisis.atender, "127.0.0.1", 0,
+                                          limit=MAX_SOLICITUD_BYTES)
+    puerto = servidor.sockets[0].getsockname()[1]
+    try:
+        reader, writer = await asyncio.open_connection("127.0.0.1", puerto)
+        try:
+            return await asyncio.wait_for(cliente(reader, writer), timeout=60)
+        finally:
+            writer.close()
+    finally:
+        servidor.close()
+        await servidor.wait_closed()
+        for tarea in analisis._consumidores:
+            tarea.cancel()
+
+
+async def _enviar(writer, *solicitudes):
+    for solicitud in solicitudes:
+        linea = solicitud if isinstance(solicitud, bytes) else json.dumps(solicitud).encode()
+        writer.write(linea + b"\n")
+    await writer.drain()
+
+
+async def _leer(reader, n):
+    return [json.loads(await reader.readline()) for _ in range(n)]
+
+
+def test_cada_respuesta_trae_el_id_de_su_solicitud(analisis):
+    async def cliente(reader, writer):
+        await _enviar(writer, *({"id": i, "texto": TEXTO * (i + 1)} for i in range(5)))
+        return await _leer(reader, 5)
+
+    respuestas = asyncio.run(_con_servidor(analisis, cliente))
+    por_id = {r["id"]: r for r in respuestas}
+    assert sorted(por_id) == list(range(5))
+    for i, respuesta in por_id.items():
+        # El texto repetido i + 1 veces suma i + 1 veces el mismo puntaje
+        assert respuesta["sentimiento"]["puntaje_total"] == (i + 1) * por_id[0]["sentimiento"]["puntaje_total"]
+        assert respuesta["protocolo"]["saludo"]["ok"]
+
+
+def test_json_invalido_no_corta_la_conexion(analisis):
+    async def cliente(reader, writer):
+        await _enviar(writer, b"{esto no es json")
+        error = (await _leer(reader, 1))[0]
+        await _enviar(writer, {"id": "sin-texto"}, {"id": 7, "texto": 3}, {"id": 8, "texto": TEXTO})
+        return [error] + await _leer(reader, 3)
+
+    invalido, sin_texto, no_string, valida = asyncio.run(_con_servidor(analisis, cliente))
+    assert invalido["error"].startswith("Solicitud inválida")
+    assert sin_texto["error"].startswith("Solicitud inválida")
+    assert "'texto' debe ser un string" in no_string["error"]
+    assert valida["id"] == 8 and "sentimiento" in valida
+
+
+def test_cola_llena_deja_de_leer_solicitudes(analisis, monkeypatch):
+    liberar = asyncio.Event()
+    consumir = ServidorAnalisis._consumir
+
+    async def consumir_demorado(self):
+        await liberar.wait()
+        await consumir(self)
+
+    monkeypatch.setattr(ServidorAnalisis, "_consumir", consumir_demorado)
+    leidas = []
+
+    async def cliente(reader, writer):
+        poner = analisis.cola.put
+
+        async def contar_y_poner(item):
+            leidas.append(item)
+            await poner(item)
+
+        analisis.cola.put = contar_y_poner
+        await _enviar(writer, *({"id": i, "texto": TEXTO} for i in range(20)))
+        await asyncio.sleep(0.3)
+        # Con la cola llena, la conexión queda detenida en el put: sólo se
+        # leyeron las solicitudes que entran en la cola más la que espera
+        assert analisis.cola.qsize() == analisis.max_cola
+        assert len(leidas) == analisis.max_cola + 1
+        liberar.set()
+        return await _leer(reader, 20)
+
+    respuestas = asyncio.run(_con_servidor(analisis, cliente))
+    assert sorted(r["id"] for r in respuestas) == list(range(20))
+    assert len(leidas) == 20
@@ -0,0 +1,61 @@
+import os
+import subprocess
+import sys
+import threading
+from http.server import ThreadingHTTPServer
+
+import pytest
+
+from servidor_modelos import ManejadorModelos, transcribir_remoto
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class EstadoFalso:
+    """Reemplaza a EstadoServidor sin cargar modelos."""
+
+    def transcribir(self, ruta_wav):
+        raise RuntimeError("CUDA out of memory")
+
+    def resumen(self):
+        return {}
+
+
+@pytest.fixture
+def servidor():
+    ManejadorModelos.estado = EstadoFalso()
+    ManejadorModelos.log_message = lambda *args: None
+    http = ThreadingHTTPServer(("127.0.0.1", 0), ManejadorModelos)
+    hilo = threading.Thread(target=http.serve_forever, daemon=True)
+    hilo.start()
+    yield f"http://127.0.0.1:{http.server_address[1]}"
+    http.shutdown()
+    http.server_close()
+
+
+def test_error_del_servidor_trae_su_mensaje(servidor, tmp_path):
+    with pytest.raises(RuntimeError, match="400: No se encontró el archivo"):
+        transcribir_remoto(servidor, str(tmp_path / "no_existe.wav"))
+
+    wav = tmp_path / "llamada.wav"
+    wav.write_bytes(b"RIFF")
+    with pytest.raises(RuntimeError, match="500: CUDA out of memory"):
+        transcribir_remoto(servidor, str(wav))
+
+
+def test_servidor_caido():
+    with pytest.raises(RuntimeError, match="No se pudo conectar"):
+        transcribir_remoto("http://127.0.0.1:9", "llamada.wav", timeout_s=5)
+
+
+def test_cliente_reporta_el_error_y_sale_con_codigo(servidor, tmp_path):
+    wav = tmp_path / "llamada.wav"
+    wav.write_bytes(b"RIFF")
+    proceso = subprocess.run(
+        [sys.executable, os.path.join(RAIZ, "transcripcion.py"), str(wav), "--servidor", servidor],
+        capture_output=True, text=True, cwd=tmp_path, timeout=60,
+    )
+    assert proceso.returncode == 1
+    assert "[ERROR] El servidor respondió 500: CUDA out of memory" in proceso.stdout
+    assert "Traceback" not in proceso.stderr
+    assert not (tmp_path / "transcripcion.txt").exists()
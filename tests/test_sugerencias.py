@@ -0,0 +1,65 @@
+import difflib
+import random
+
+import pytest
+
+from main import VOC_LEX_CSV
+from sugerencias import IndiceSugerencias
+from tokenizacion import cargar_vocabulario
+
+
+@pytest.fixture(scope="module")
+def palabras():
+    return [p for p in cargar_vocabulario(VOC_LEX_CSV, usar_compilado=False) if " " not in p]
+
+
+def _mutaciones(palabras, cantidad, semilla=7):
+    """Palabras del vocabulario con errores de tipeo (y algunas al azar)."""
+    rnd = random.Random(semilla)
+    letras = "abcdefghijklmnopqrstuvwxyz"
+    consultas = []
+    for _ in range(cantidad):
+        p = list(rnd.choice(palabras))
+        for _ in range(rnd.randint(0, 3)):
+            i = rnd.randrange(len(p) + 1)
+            operacion = rnd.random()
+            if operacion < 0.4 and i < len(p):
+                p[i] = rnd.choice(letras)
+            elif operacion < 0.7:
+                p.insert(i, rnd.choice(letras))
+            elif i < len(p) and len(p) > 1:
+                del p[i]
+        consultas.append("".join(p))
+    consultas += ["".join(rnd.choice(letras) for _ in range(rnd.randint(1, 12))) for _ in range(50)]
+    return consultas + ["", "a", "gracias"]
+
+
+@pytest.mark.parametrize("n, cutoff", [(3, 0.75), (5, 0.6), (1, 0.9), (10, 0.3)])
+def test_sugerir_equivale_a_difflib(palabras, n, cutoff):
+    indice = IndiceSugerencias(palabras)
+    for consulta in _mutaciones(palabras, 100):
+        assert indice.sugerir(consulta, n=n, cutoff=cutoff) == \
+            difflib.get_close_matches(consulta, palabras, n=n, cutoff=cutoff), consulta
+
+
+def test_agregar_incremental_equivale_a_reconstruir(palabras):
+    indice = IndiceSugerencias(palabras[:400])
+    for palabra in palabras[400:]:
+        indice.agregar(palabra)
+    indice.agregar(palabras[0])  # repetidas no cambian nada
+    for consulta in _mutaciones(palabras, 50, semilla=11):
+        assert indice.sugerir(consulta, n=3, cutoff=0.75) == \
+            difflib.get_close_matches(consulta, palabras, n=3, cutoff=0.75), consulta
+
+
+def test_frases_no_se_sugieren():
+    indice = IndiceSugerencias(["buenas tardes", "tardes"])
+    assert indice.sugerir("tarde", cutoff=0.5) == ["tardes"]
+
+
+def test_validacion_de_parametros_como_difflib():
+    indice = IndiceSugerencias(["hola"])
+    with pytest.raises(ValueError):
+        indice.sugerir("hola", n=0)
+    with pytest.raises(ValueError):
+        indice.sugerir("hola", cutoff=1.5)
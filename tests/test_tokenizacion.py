@@ -0,0 +1,43 @@
+import itertools
+
+import pytest
+
+import metricas
+from tokenizacion import iterar_tokens, tokenizar_texto
+
+VOCAB = {
+    "hola": ("saludo", 0),
+    "gracias": ("otros", 2),
+    "revisar": ("otros", 1),
+    "problema": ("otros", -2),
+}
+TEXTO = "Hola, gracias por esperar: revisaré el problema 123 hoy mismo"
+
+
+@pytest.fixture
+def registro():
+    metricas.habilitar()
+    metricas.REGISTRO.reiniciar()
+    yield metricas.REGISTRO.contadores
+    metricas.REGISTRO.reiniciar()
+    metricas.habilitar(False)
+
+
+def test_generador_cerrado_cuenta_solo_lo_entregado(registro):
+    tokens = iterar_tokens(TEXTO, VOCAB)
+    primeros = list(itertools.islice(tokens, 3))
+    tokens.close()
+    assert [t for t, _, _ in primeros] == ["hola", "gracias", "por"]
+    assert registro["tokenizacion.tokens"] == 3
+
+
+def test_generador_agotado_cuenta_todos(registro):
+    tokens = list(iterar_tokens(TEXTO, VOCAB))
+    assert registro["tokenizacion.tokens"] == len(tokens) == 9   # sin el número
+    assert registro["tokenizacion.tokens_lematizados"] == 1      # revisaré -> revisar
+
+
+def test_iterar_y_tokenizar_coinciden():
+    sugerencias = {}
+    assert list(iterar_tokens(TEXTO, VOCAB, sugerencias)) == tokenizar_texto(TEXTO, VOCAB)[0]
+    assert set(sugerencias) == set(tokenizar_texto(TEXTO, VOCAB)[1])
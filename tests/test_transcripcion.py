@@ -0,0 +1,192 @@
+import array
+import functools
+import os
+import subprocess
+import sys
+import time
+import types
+
+import pytest
+
+import transcripcion
+from cache_diarizacion import CacheDiarizacion
+from filtro_voz import ParametrosFiltro
+from transcripcion import SAMPLE_RATE_WHISPER, transcribir_con_diarizacion
+
+# Tres turnos; en el audio falso cada uno es una meseta con amplitud (i + 1) * 1000
+SEGMENTOS = [(0.5, 2.0, "SPEAKER_00"), (2.5, 4.0, "SPEAKER_01"), (4.5, 6.0, "SPEAKER_00")]
+DURACION_S = 7.0
+
+
+class AudioFalso:
+    """Lo mínimo de pydub.AudioSegment que usa transcribir_con_diarizacion."""
+
+    channels = 1
+    frame_rate = SAMPLE_RATE_WHISPER
+    sample_width = 2
+
+    def __init__(self):
+        self.muestras = [0] * int(DURACION_S * SAMPLE_RATE_WHISPER)
+        for i, (inicio, fin, _) in enumerate(SEGMENTOS):
+            for n in range(int(inicio * SAMPLE_RATE_WHISPER), int(fin * SAMPLE_RATE_WHISPER)):
+                self.muestras[n] = (i + 1) * 1000
+
+    def __len__(self):
+        return int(DURACION_S * 1000)
+
+    def get_array_of_samples(self):
+        return array.array("h", self.muestras)
+
+
+class ModeloFalso:
+    """
+    Whisper falso: un segmento "turno<k>" por cada meseta de amplitud k del
+    audio (suelto o empaquetado), con sus marcas de tiempo.
+    """
+
+    def __init__(self, fallar=()):
+        self.fallar = set(fallar)
+        self.error = RuntimeError
+        self.llamadas = 0
+
+    def transcribe(self, audio, language="es"):
+        self.llamadas += 1
+        niveles = [round(x * 32768 / 1000) for x in audio]
+        segmentos, n = [], 0
+        while n < len(niveles):
+            fin = n
+            while fin < len(niveles) and niveles[fin] == niveles[n]:
+                fin += 1
+            if niveles[n]:
+                if niveles[n] in self.fallar:
+                    raise self.error("fallo simulado")
+                segmentos.append({"start": n / SAMPLE_RATE_WHISPER, "end": fin / SAMPLE_RATE_WHISPER,
+                                  "text": f" turno{niveles[n]}"})
+            n = fin
+        return {"text": "".join(s["text"] for s in segmentos), "segments": segmentos}
+
+
+@pytest.fixture
+def entorno(monkeypatch, tmp_path):
+    """
+    pydub, pyannote y Whisper reemplazados por dobles; devuelve un objeto con
+    el WAV, la caché y los contadores de carga/diarización.
+    """
+    pydub = types.ModuleType("pydub")
+    pydub.AudioSegment = types.SimpleNamespace(from_wav=lambda ruta: AudioFalso())
+    monkeypatch.setitem(sys.modules, "pydub", pydub)
+
+    estado = types.SimpleNamespace(diarizaciones=0, cargas=0, modelo=ModeloFalso(),
+                                   segmentos=list(SEGMENTOS))
+
+    def diarizar(ruta_wav, pipeline=None):
+        estado.diarizaciones += 1
+        return list(estado.segmentos)
+
+    def cargar():
+        estado.cargas += 1
+        return estado.modelo
+
+    monkeypatch.setattr(transcripcion, "diarizar_audio", diarizar)
+    monkeypatch.setattr(transcripcion, "cargar_whisper_medium", cargar)
+    estado.wav = tmp_path / "llamada.wav"
+    estado.wav.write_bytes(b"RIFF-falso")
+    estado.salida = str(tmp_path / "transcripcion.txt")
+    estado.cache = CacheDiarizacion(str(tmp_path / "cache"))
+    return estado
+
+
+ESPERADAS = ["Agente: turno1", "Cliente: turno2", "Agente: turno3"]
+
+
+@pytest.mark.parametrize("agrupar", [False, True])
+def test_con_cache_carga_el_modelo_si_hay_pendientes(entorno, agrupar):
+    lineas = transcribir_con_diarizacion(str(entorno.wav), None, agrupar=agrupar,
+                                         ruta_salida=entorno.salida, cache=entorno.cache)
+    assert lineas == ESPERADAS
+    assert entorno.cargas == 1
+
+
+@pytest.mark.parametrize("agrupar", [False, True])
+def test_los_errores_no_se_guardan_en_la_cache(entorno, agrupar):
+    entorno.modelo = ModeloFalso(fallar={2})
+    lineas = transcribir_con_diarizacion(str(entorno.wav), None, agrupar=agrupar,
+                                         ruta_salida=entorno.salida, cache=entorno.cache)
+    assert sum(l.startswith("Cliente: [ERROR TRANSCRIPCIÓN") for l in lineas) == 1
+
+    # La corrida siguiente sólo reintenta lo que falló
+    entorno.modelo = ModeloFalso()
+    lineas = transcribir_con_diarizacion(str(entorno.wav), None, agrupar=agrupar,
+                                         ruta_salida=entorno.salida, cache=entorno.cache)
+    assert lineas == ESPERADAS
+    assert entorno.modelo.llamadas == 1
+
+
+def test_cambiar_de_whisper_reutiliza_la_diarizacion(entorno):
+    transcribir_con_diarizacion(str(entorno.wav), None, nombre_modelo="medium",
+                                ruta_salida=entorno.salida, cache=entorno.cache)
+    transcribir_con_diarizacion(str(entorno.wav), None, nombre_modelo="small",
+                                ruta_salida=entorno.salida, cache=entorno.cache)
+    assert entorno.diarizaciones == 1
+    # Pero los textos de un modelo no se sirven para el otro
+    assert entorno.modelo.llamadas == 2 * len(SEGMENTOS)
+    clave = entorno.cache.clave(str(entorno.wav), transcripcion.MODELO_DIARIZACION)
+    assert entorno.cache.obtener_segmentos(clave) == SEGMENTOS
+
+
+def test_corte_a_mitad_del_lote_se_retoma(entorno, monkeypatch):
+    # Paquetes de un segmento cada uno; el tercero corta la corrida
+    monkeypatch.setattr(transcripcion, "transcribir_segmentos",
+                        functools.partial(transcripcion.transcribir_segmentos, max_s=2.0))
+
+    class Corte(BaseException):
+        pass
+
+    entorno.modelo = ModeloFalso(fallar={3})
+    entorno.modelo.error = Corte
+    with pytest.raises(Corte):
+        transcribir_con_diarizacion(str(entorno.wav), None, agrupar=True,
+                                    ruta_salida=entorno.salida, cache=entorno.cache)
+
+    entorno.modelo = ModeloFalso()
+    lineas = transcribir_con_diarizacion(str(entorno.wav), None, agrupar=True,
+                                         ruta_salida=entorno.salida, cache=entorno.cache)
+    assert lineas == ESPERADAS
+    assert entorno.modelo.llamadas == 1
+
+
+def test_al_terminar_se_desalojan_entradas_viejas(entorno):
+    vieja = os.path.join(entorno.cache.directorio, "0" * 64)
+    os.makedirs(vieja)
+    with open(os.path.join(vieja, "segmentos.json"), "w") as f:
+        f.write("[]")
+    hace_un_anio = time.time() - 365 * 86400
+    os.utime(vieja, (hace_un_anio, hace_un_anio))
+
+    transcribir_con_diarizacion(str(entorno.wav), None, ruta_salida=entorno.salida,
+                                cache=entorno.cache)
+    assert not os.path.exists(vieja)
+    # Las entradas de esta corrida quedan
+    assert entorno.cache._entradas()
+
+
+def test_el_filtro_no_invierte_los_roles(entorno):
+    # El agente (SPEAKER_00) abre con un turno en silencio que el filtro descarta
+    entorno.segmentos = [(0.0, 0.4, "SPEAKER_00"), (0.5, 2.0, "SPEAKER_01"),
+                         (2.5, 4.0, "SPEAKER_00"), (4.5, 6.0, "SPEAKER_01")]
+    lineas = transcribir_con_diarizacion(str(entorno.wav), None, ruta_salida=entorno.salida,
+                                         cache=entorno.cache, filtro=ParametrosFiltro())
+    assert lineas == ["Cliente: turno1", "Agente: turno2", "Cliente: turno3"]
+
+
+@pytest.mark.parametrize("opciones, mensaje", [
+    (["--servidor", "http://127.0.0.1:9", "--workers", "2", "--vad"], "--workers, --vad no se puede(n) usar con --servidor"),
+    (["--servidor", "http://127.0.0.1:9", "--metricas", "m.json"], "--metricas no se puede(n) usar con --servidor"),
+    (["--enviar-audio"], "--enviar-audio requiere --servidor"),
+])
+def test_opciones_locales_con_servidor_son_error(opciones, mensaje):
+    raiz = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    proceso = subprocess.run([sys.executable, os.path.join(raiz, "llamadas.py"), "transcribir", "llamada.wav",
+                              *opciones], capture_output=True, text=True, timeout=60)
+    assert proceso.returncode == 2
+    assert mensaje in proceso.stderr
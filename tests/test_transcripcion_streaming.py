@@ -0,0 +1,157 @@
+import os
+import sys
+
+import numpy as np
+
+from transcripcion_streaming import SAMPLE_RATE, TranscriptorStreaming
+
+
+class ModeloFalso:
+    """Whisper falso: devuelve la duración del fragmento como texto."""
+
+    def __init__(self):
+        self.fragmentos = []
+
+    def transcribe(self, fragmento, language="es"):
+        self.fragmentos.append(len(fragmento))
+        return {"text": f"{len(fragmento) / SAMPLE_RATE:.1f}s"}
+
+
+class TranscriptorGuionado(TranscriptorStreaming):
+    """
+    Diariza devolviendo los turnos "reales" recortados a la ventana recibida,
+    como haría pyannote sobre ese audio.
+    """
+
+    def __init__(self, turnos, **kwargs):
+        self.turnos = turnos
+        self.ventanas = []
+        self.emitidos = []
+        super().__init__(ModeloFalso(), None, self._al_emitir, **kwargs)
+
+    def _al_emitir(self, rol, texto, inicio, fin):
+        self.emitidos.append((rol, round(inicio, 2), round(fin, 2)))
+
+    def _diarizar(self, ventana, inicio_ventana):
+        fin_ventana = inicio_ventana + len(ventana) / SAMPLE_RATE
+        self.ventanas.append(fin_ventana - inicio_ventana)
+        return [(max(a, inicio_ventana), min(b, fin_ventana), s) for a, b, s in self.turnos
+                if b > inicio_ventana and a < fin_ventana]
+
+
+def correr(transcriptor, duracion_s, bloque_s=1.0):
+    bloque = np.zeros(int(bloque_s * SAMPLE_RATE), dtype=np.float32)
+    for _ in range(int(duracion_s / bloque_s)):
+        transcriptor.agregar_audio(bloque)
+    transcriptor.finalizar()
+    return transcriptor.emitidos
+
+
+def test_turnos_solapados_y_anidados_se_emiten_una_vez():
+    turnos = [(0.0, 10.0, "S0"), (3.0, 5.0, "S1"), (9.0, 14.0, "S1"), (15.0, 18.0, "S0")]
+    emitidos = correr(TranscriptorGuionado(turnos), 20)
+    assert sorted(emitidos) == sorted([
+        ("Agente", 0.0, 10.0), ("Cliente", 3.0, 5.0),
+        ("Cliente", 9.0, 14.0), ("Agente", 15.0, 18.0),
+    ])
+
+
+def test_fin_emitido_no_retrocede():
+    turnos = [(0.0, 10.0, "S0"), (3.0, 5.0, "S1"), (12.0, 13.0, "S1")]
+    transcriptor = TranscriptorGuionado(turnos)
+    correr(transcriptor, 15)
+    assert transcriptor._fin_emitido_s == 13.0
+    # Ningún tramo de audio de un mismo rol se transcribe dos veces
+    for rol in ("Agente", "Cliente"):
+        tramos = sorted((a, b) for r, a, b in transcriptor.emitidos if r == rol)
+        assert all(b1 <= a2 for (_, b1), (a2, _) in zip(tramos, tramos[1:]))
+
+
+def test_monologo_largo_se_corta_y_la_ventana_no_crece():
+    transcriptor = TranscriptorGuionado([(0.0, 120.0, "S0")], paso_s=5.0, max_turno_s=30.0)
+    emitidos = correr(transcriptor, 120)
+    tope = transcriptor.contexto_s + transcriptor.max_turno_s + transcriptor.paso_s + transcriptor.margen_s
+    assert max(transcriptor.ventanas) <= tope
+    # El monólogo sale en varios turnos contiguos del mismo rol que lo cubren entero
+    assert len(emitidos) > 1
+    assert {rol for rol, _, _ in emitidos} == {"Agente"}
+    assert emitidos[0][1] == 0.0 and emitidos[-1][2] == 120.0
+    assert all(b == a for (_, _, b), (_, a, _) in zip(emitidos, emitidos[1:]))
+
+
+def test_silencio_largo_no_acumula_audio():
+    transcriptor = TranscriptorGuionado([(100.0, 104.0, "S0")], paso_s=5.0, max_turno_s=30.0)
+    emitidos = correr(transcriptor, 110)
+    tope = transcriptor.contexto_s + transcriptor.max_turno_s + transcriptor.paso_s + transcriptor.margen_s
+    assert max(transcriptor.ventanas) <= tope
+    assert len(transcriptor._buffer) <= tope * SAMPLE_RATE
+    assert emitidos == [("Agente", 100.0, 104.0)]
+
+
+# Turnos (inicio_s, fin_s, speaker, texto) de la llamada del CLI
+LLAMADA = [
+    (0.0, 4.0, "S0", "Un momento, por favor."),
+    (5.0, 9.0, "S1", "Mi internet no sirve para nada, es terrible."),
+    (10.0, 15.0, "S0", "Perdón, buenas tardes. Gracias por su tiempo, que tenga un buen dia."),
+]
+
+
+def _tiempo(muestras):
+    # Cada muestra del WAV guarda su instante en centésimas de segundo
+    return round(float(muestras[0]) * 32768) / 100
+
+
+def test_cli_genera_el_reporte_de_main(tmp_path, monkeypatch, capsys):
+    import runpy
+    import types
+    import wave
+
+    import transcripcion
+    from main import VOC_LEX_CSV, analizar_transcripcion, generar_reporte, lexicon_desde_vocabulario
+    from tokenizacion import cargar_vocabulario
+
+    raiz = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    ruta_wav = tmp_path / "llamada.wav"
+    with wave.open(str(ruta_wav), "wb") as w:
+        w.setnchannels(1)
+        w.setsampwidth(2)
+        w.setframerate(SAMPLE_RATE)
+        w.writeframes((np.arange(20 * SAMPLE_RATE) * 100 // SAMPLE_RATE).astype("<i2").tobytes())
+
+    class Modelo:
+        def transcribe(self, fragmento, language="es"):
+            inicio = _tiempo(fragmento)
+            return {"text": next(t for a, b, _, t in LLAMADA if a <= inicio < b)}
+
+    def pipeline(entrada):
+        ventana = entrada["waveform"]
+        inicio = _tiempo(ventana)
+        fin = inicio + len(ventana) / SAMPLE_RATE
+        return types.SimpleNamespace(itertracks=lambda yield_label: [
+            (types.SimpleNamespace(start=max(a, inicio) - inicio, end=min(b, fin) - inicio), None, s)
+            for a, b, s, _ in LLAMADA if b > inicio and a < fin
+        ])
+
+    torch = types.ModuleType("torch")
+    torch.from_numpy = lambda a: types.SimpleNamespace(unsqueeze=lambda eje: a)
+    monkeypatch.setitem(sys.modules, "torch", torch)
+    monkeypatch.setattr(transcripcion, "cargar_whisper_medium", Modelo)
+    monkeypatch.setattr(transcripcion, "cargar_pipeline_diarizacion", lambda: pipeline)
+    monkeypatch.chdir(raiz)  # el vocabulario se lee de la raíz del repo
+    salida = tmp_path / "transcripcion.txt"
+    monkeypatch.setattr(sys, "argv", ["transcripcion_streaming.py", str(ruta_wav), "--salida", str(salida),
+                                      "--linea-tiempo", str(tmp_path / "linea.json")])
+    runpy.run_path(os.path.join(raiz, "transcripcion_streaming.py"), run_name="__main__")
+    consola = capsys.readouterr().out
+
+    texto = salida.read_text(encoding="utf-8")
+    assert texto == "".join(f"{'Agente' if s == 'S0' else 'Cliente'}: {t}\n" for _, _, s, t in LLAMADA)
+    vocab = cargar_vocabulario(VOC_LEX_CSV, usar_compilado=False)
+    resultado = analizar_transcripcion(texto, vocab, lexicon_desde_vocabulario(vocab))
+    generar_reporte(resultado["sentimiento"], resultado["protocolo"],
+                    resultado["sugerencias_agente"], resultado["sugerencias_cliente"])
+    reporte = capsys.readouterr().out
+    assert consola.endswith(reporte)
+    # Las frases del protocolo llegan al reporte, con el turno en que se dijeron
+    assert "Saludo inicial: OK (fuera del primer turno)" in reporte
+    assert "Despedida amable: OK\n" in reporte
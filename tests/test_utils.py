@@ -0,0 +1,41 @@
+import random
+import re
+
+import pytest
+
+from utils import extraer_lexemas, limpiar_palabra
+
+PATRON_TOKEN = r"[A-Za-zÑñÁÉÍÓÚáéíóú0-9]+"
+
+
+def tokenizar_original(texto):
+    """El tokenizador de antes: re.findall + limpiar_palabra por token."""
+    lexemas = []
+    for tok in re.findall(PATRON_TOKEN, texto):
+        if tok.isdigit():
+            continue
+        limpio = limpiar_palabra(tok)
+        if limpio:
+            lexemas.append(limpio)
+    return lexemas
+
+
+@pytest.mark.parametrize("texto", [
+    "¿Cómo está, SEÑOR? 123",
+    "Agente: Buenas tardes, le habla Óscar. ¿En qué puedo ayudarle?",
+    "pedido 4521-B llegó el 03/05; ÚLTIMA vez!!!",
+    "niño  ÑANDÚ\tpingüino\naçaí",        # ü y ç no son parte de un token
+    "versión2 2da 100% ...",
+    "İstanbul KELVIN K",              # minúsculas que cambian de largo
+    "",
+])
+def test_extraer_lexemas_equivale_al_tokenizador_original(texto):
+    assert extraer_lexemas(texto) == tokenizar_original(texto)
+
+
+def test_extraer_lexemas_texto_aleatorio():
+    rnd = random.Random(3)
+    alfabeto = "abcñáéíóúüABCÑÁÉÍÓÚ019 .,¿?¡!-'\"\n\tçİK"
+    for _ in range(500):
+        texto = "".join(rnd.choice(alfabeto) for _ in range(rnd.randint(0, 40)))
+        assert extraer_lexemas(texto) == tokenizar_original(texto), repr(texto)
@@ -1,23 +1,46 @@
-import re
-import difflib
-import csv
 import os
-from typing import List, Dict, Tuple
-from utils import limpiar_palabra
+from typing import Iterator, List, Dict, Tuple, Optional
+import metricas
+from utils import extraer_lexemas
+from sugerencias import IndiceSugerencias
+from lematizacion import buscar_lema
+from lexico_compilado import LexicoCompilado, compilado_vigente
+from almacen_lexico import AlmacenLexico, leer_wal
 
 # Lista fija de categorías pragmáticas
 CATEGORIAS = ["saludo", "despedida", "identificacion", "palabra_ruda", "otros"]
 
-def cargar_vocabulario(path_csv: str) -> Dict[str, Tuple[str,int]]:
+def cargar_vocabulario(path_csv: str, usar_compilado: bool = True) -> Dict[str, Tuple[str,int]]:
     """
     Carga el CSV de vocabulario pragmático con columnas:
       palabra,categoria,puntaje
+    Si existe el vocabulario compilado (ver lexico_compilado.py) y es más nuevo
+    que el CSV, se lee desde ahí sin parsear el CSV. Se aplican además las
+    palabras del WAL que todavía no se compactaron (ver almacen_lexico.py).
     Retorna un dict: { palabra: (categoria, puntaje) }.
     """
+    with metricas.temporizador("vocabulario.carga"):
+        vocab = _cargar_base(path_csv, usar_compilado)
+        for palabra, categoria, puntaje in leer_wal(path_csv)[0]:
+            vocab[palabra] = (categoria, puntaje)
+        return vocab
+
+def _cargar_base(path_csv: str, usar_compilado: bool) -> Dict[str, Tuple[str,int]]:
+    if usar_compilado:
+        ruta = compilado_vigente(path_csv)
+        if ruta:
+            lexico = LexicoCompilado(ruta)
+            try:
+                return lexico.a_dict()
+            finally:
+                lexico.cerrar()
+
     vocab = {}
     if not os.path.isfile(path_csv):
         return vocab
 
+    import csv  # sólo sin vocabulario compilado vigente
+
     with open(path_csv, "r", encoding="utf-8") as f:
         reader = csv.reader(f)
         for row in reader:
@@ -32,19 +55,152 @@ def cargar_vocabulario(path_csv: str) -> Dict[str, Tuple[str,int]]:
             vocab[palabra] = (categoria, puntaje)
     return vocab
 
+def iterar_tokens(
+    texto_transcrito: str,
+    vocabulario: Dict[str, Tuple[str,int]],
+    sugerencias: Optional[Dict[str, List[str]]] = None,
+    max_sugerencias: int = 3,
+    cutoff: float = 0.75,
+    interactivo: bool = False,
+    indice: Optional[IndiceSugerencias] = None,
+    almacen: Optional[AlmacenLexico] = None,
+    lematizar: bool = True
+) -> Iterator[Tuple[str,str,int]]:
+    """
+    Versión generadora de tokenizar_texto: produce cada (token, categoria, puntaje)
+    a medida que se tokeniza, sin materializar la lista completa.
+    Si se pasa 'sugerencias', se completa con { token_invalido: sugerencias }.
+    En modo interactivo las palabras nuevas se agregan a 'almacen'; si no se
+    pasa uno, se usa el del vocabulario por defecto y se confirma al terminar.
+    Con 'lematizar', un token flexionado cuyo lema está en el vocabulario
+    ("revisaré" -> "revisar", ver lematizacion.py) se produce como ese lema,
+    sin pasar por las sugerencias.
+    """
+    if sugerencias is None:
+        sugerencias = {}
+    almacen_propio = False
+
+    # Tokenización y normalización en una sola pasada (ya omite números)
+    with metricas.temporizador("tokenizacion.normalizacion"):
+        lexemas = extraer_lexemas(texto_transcrito)
+    # Los conteos se acumulan localmente y se publican al terminar (o al cerrar
+    # el generador), para no pagar una llamada a metricas por token. Si el
+    # consumidor lo cierra antes de tiempo, el generador está detenido en el
+    # yield del último token entregado: 'producidos' no cuenta los que faltan
+    producidos = desconocidos = lematizados = 0
+    try:
+        for tok_clean in lexemas:
+            producidos += 1
+            # Si el token ya existe en el vocabulario, anexamos directo
+            if tok_clean in vocabulario:
+                categoria, puntaje = vocabulario[tok_clean]
+                yield (tok_clean, categoria, puntaje)
+                continue
+            if lematizar:
+                lema = buscar_lema(tok_clean, vocabulario)
+                if lema is not None:
+                    lematizados += 1
+                    categoria, puntaje = vocabulario[lema]
+                    yield (lema, categoria, puntaje)
+                    continue
+
+            # Generar sugerencias ortográficas
+            desconocidos += 1
+            if not interactivo and tok_clean in sugerencias:
+                # Ya se buscaron sugerencias para este token (el vocabulario no
+                # cambia fuera del modo interactivo): se reutilizan
+                yield (tok_clean, "otros", 0)
+                continue
+            if indice is None:
+                indice = IndiceSugerencias(vocabulario.keys())
+            with metricas.temporizador("tokenizacion.sugerencia"):
+                matches = indice.sugerir(tok_clean, n=max_sugerencias, cutoff=cutoff)
+            sugerencias[tok_clean] = matches
+
+            if not interactivo:
+                # Modo no interactivo: categorizar como "otros"
+                yield (tok_clean, "otros", 0)
+                continue
+
+            # -----------------------
+            # MODO INTERACTIVO AQUI
+            # -----------------------
+            print(f"\nToken desconocido: '{tok_clean}'")
+            if matches:
+                print("  Sugerencias cercanas:")
+                for idx, sugerencia in enumerate(matches):
+                    print(f"    [{idx}] {sugerencia}")
+                print("    [n] Ninguna de las anteriores")
+                sel = input("  ¿Reemplazar por alguna sugerencia? (índice o 'n'): ").strip().lower()
+                if sel.isdigit():
+                    i = int(sel)
+                    if 0 <= i < len(matches):
+                        reemplazo = matches[i]
+                        cat_rep, peso_rep = vocabulario[reemplazo]
+                        print(f"  → Usando sugerencia: '{reemplazo}' "
+                              f"(categoría='{cat_rep}', puntaje={peso_rep})")
+                        yield (reemplazo, cat_rep, peso_rep)
+                        continue
+                    else:
+                        print("  Índice fuera de rango. Se omite reemplazo.")
+                else:
+                    print("  No se usará ninguna sugerencia para este token.")
+            else:
+                print("  Sin sugerencias cercanas.")
+
+            # Mostrar lista numerada de categorías pragmáticas
+            print("\n  Escoja categoría pragmática para este token:")
+            for idx, cat in enumerate(CATEGORIAS):
+                print(f"    [{idx}] {cat}")
+            sel_cat = input("  Ingrese el número de la categoría (o Enter para 'otros'): ").strip()
+
+            if sel_cat.isdigit() and 0 <= int(sel_cat) < len(CATEGORIAS):
+                categoria_elegida = CATEGORIAS[int(sel_cat)]
+            else:
+                categoria_elegida = "otros"
+
+            # Preguntar puntaje de sentimiento
+            voto = input("  Puntaje de sentimiento para este token (−3…+3, defecto=0): ").strip()
+            try:
+                puntaje = int(voto)
+            except ValueError:
+                puntaje = 0
+
+            # Guardar en memoria y en el almacén (se escribe por lotes al confirmar)
+            vocabulario[tok_clean] = (categoria_elegida, puntaje)
+            indice.agregar(tok_clean)
+            if almacen is None:
+                almacen, almacen_propio = AlmacenLexico("vocabulario_sentimiento.csv"), True
+            almacen.agregar(tok_clean, categoria_elegida, puntaje)
+
+            yield (tok_clean, categoria_elegida, puntaje)
+    finally:
+        if almacen_propio:
+            almacen.confirmar()
+        metricas.contar("tokenizacion.tokens", producidos)
+        metricas.contar("tokenizacion.tokens_lematizados", lematizados)
+        metricas.contar("tokenizacion.tokens_desconocidos", desconocidos)
+
 def tokenizar_texto(
     texto_transcrito: str,
     vocabulario: Dict[str, Tuple[str,int]],
     max_sugerencias: int = 3,
     cutoff: float = 0.75,
-    interactivo: bool = False
+    interactivo: bool = False,
+    indice: Optional[IndiceSugerencias] = None,
+    almacen: Optional[AlmacenLexico] = None,
+    lematizar: bool = True
 ) -> Tuple[List[Tuple[str,str,int]], Dict[str, List[str]]]:
     """
     Tokeniza el texto en lexemas normalizados (sin tildes, minúsculas).
     Omite tokens que sean únicamente números.
     Para cada token:
       - Si existe en 'vocabulario', extrae (categoria, puntaje).
-      - Si no existe, genera sugerencias ortográficas (difflib).
+      - Si no, y 'lematizar' es True, busca su lema (ver lematizacion.py); si
+        el lema está en 'vocabulario', produce (lema, categoria, puntaje).
+      - Si no existe, genera sugerencias ortográficas con 'indice'
+        (IndiceSugerencias, mismos resultados que difflib). Si no se pasa,
+        se construye uno a partir del vocabulario al primer token desconocido.
         Si 'interactivo' es True, pregunta:
           1. ¿Desea reemplazar por alguna sugerencia?
           2. Si no, ¿Agregar como nuevo token con categoría pragmática?
@@ -52,87 +208,10 @@ def tokenizar_texto(
       tokens_info: List[ (token, categoria, puntaje) ]
       sugerencias: Dict[token_invalido, List[sugerencias_ortográficas>]
     """
-    raw_tokens = re.findall(r"[A-Za-zÑñÁÉÍÓÚáéíóú0-9]+", texto_transcrito)
-    tokens_info: List[Tuple[str,str,int]] = []
     sugerencias: Dict[str, List[str]] = {}
-
-    for tok in raw_tokens:
-        # Omitir secuencias puramente numéricas
-        if tok.isdigit():
-            continue
-
-        tok_clean = limpiar_palabra(tok)
-        if not tok_clean:
-            continue
-
-        # Si el token ya existe en el vocabulario, anexamos directo
-        if tok_clean in vocabulario:
-            categoria, puntaje = vocabulario[tok_clean]
-            tokens_info.append((tok_clean, categoria, puntaje))
-            continue
-
-        # Generar sugerencias ortográficas
-        matches = difflib.get_close_matches(
-            tok_clean, vocabulario.keys(),
-            n=max_sugerencias, cutoff=cutoff
-        )
-        sugerencias[tok_clean] = matches
-
-        if not interactivo:
-            # Modo no interactivo: categorizar como "otros"
-            tokens_info.append((tok_clean, "otros", 0))
-            continue
-
-        # -----------------------
-        # MODO INTERACTIVO AQUI
-        # -----------------------
-        print(f"\nToken desconocido: '{tok_clean}'")
-        if matches:
-            print("  Sugerencias cercanas:")
-            for idx, sugerencia in enumerate(matches):
-                print(f"    [{idx}] {sugerencia}")
-            print("    [n] Ninguna de las anteriores")
-            sel = input("  ¿Reemplazar por alguna sugerencia? (índice o 'n'): ").strip().lower()
-            if sel.isdigit():
-                i = int(sel)
-                if 0 <= i < len(matches):
-                    reemplazo = matches[i]
-                    cat_rep, peso_rep = vocabulario[reemplazo]
-                    print(f"  → Usando sugerencia: '{reemplazo}' "
-                          f"(categoría='{cat_rep}', puntaje={peso_rep})")
-                    tokens_info.append((reemplazo, cat_rep, peso_rep))
-                    continue
-                else:
-                    print("  Índice fuera de rango. Se omite reemplazo.")
-            else:
-                print("  No se usará ninguna sugerencia para este token.")
-        else:
-            print("  Sin sugerencias cercanas.")
-
-        # Mostrar lista numerada de categorías pragmáticas
-        print("\n  Escoja categoría pragmática para este token:")
-        for idx, cat in enumerate(CATEGORIAS):
-            print(f"    [{idx}] {cat}")
-        sel_cat = input("  Ingrese el número de la categoría (o Enter para 'otros'): ").strip()
-
-        if sel_cat.isdigit() and 0 <= int(sel_cat) < len(CATEGORIAS):
-            categoria_elegida = CATEGORIAS[int(sel_cat)]
-        else:
-            categoria_elegida = "otros"
-
-        # Preguntar puntaje de sentimiento
-        voto = input("  Puntaje de sentimiento para este token (−3…+3, defecto=0): ").strip()
-        try:
-            puntaje = int(voto)
-        except ValueError:
-            puntaje = 0
-
-        # Guardar en memoria y en CSV si la categoría no es 'otros'
-        vocabulario[tok_clean] = (categoria_elegida, puntaje)
-        with open("vocabulario_sentimiento.csv", "a", encoding="utf-8", newline="") as fcsv:
-            writer = csv.writer(fcsv)
-            writer.writerow([tok_clean, categoria_elegida, str(puntaje)])
-
-        tokens_info.append((tok_clean, categoria_elegida, puntaje))
-
+    tokens_info: List[Tuple[str,str,int]] = list(iterar_tokens(
+        texto_transcrito, vocabulario, sugerencias,
+        max_sugerencias=max_sugerencias, cutoff=cutoff,
+        interactivo=interactivo, indice=indice, almacen=almacen, lematizar=lematizar
+    ))
     return tokens_info, sugerencias
@@ -41,52 +41,117 @@ warnings.filterwarnings(
 
 # ----------------------------------------------------
 
+import argparse
 import os
 import sys
 import tempfile
-import torch
+import time
+from typing import TYPE_CHECKING, Optional
 
-import whisper
-from pydub import AudioSegment
-from pyannote.audio import Pipeline
+import numpy as np
+
+# torch, whisper, pydub y pyannote tardan varios segundos en importarse: se
+# importan dentro de las funciones que los usan, así "--help", el cliente de
+# --servidor o la caché no los cargan
+if TYPE_CHECKING:
+    from pydub import AudioSegment
+
+from transcripcion_paralela import transcribir_segmentos
+from cache_diarizacion import CacheDiarizacion, DIRECTORIO_POR_DEFECTO
+from filtro_voz import ParametrosFiltro, filtrar_segmentos
+from linea_tiempo import guardar_tiempos
+import metricas
+
+SAMPLE_RATE_WHISPER = 16000  # Whisper trabaja con audio mono a 16 kHz
+MODELO_DIARIZACION = "pyannote/speaker-diarization"
+PREFIJO_ERROR = "[ERROR TRANSCRIPCIÓN"
+
+def precargar_dependencias():
+    """
+    Importa torch, whisper, pydub y pyannote (para medir su costo por separado
+    de la carga de los modelos, o pagarlo antes de la primera solicitud).
+    """
+    import torch  # noqa: F401
+    import whisper  # noqa: F401
+    import pydub  # noqa: F401
+    import pyannote.audio  # noqa: F401
 
 def cargar_whisper_medium():
     """
     Carga el modelo Whisper "medium" en GPU si está disponible, sino en CPU.
     """
+    import torch
+    import whisper
+
     device = "cuda" if torch.cuda.is_available() else "cpu"
     print(f"🔄 Cargando Whisper 'medium' en dispositivo: {device}")
     modelo = whisper.load_model("medium", device=device)
     return modelo
 
-def diarizar_audio(ruta_wav: str):
+def cargar_pipeline_diarizacion():
     """
-    Usa Pyannote.audio para obtener segmentos diarizados.
+    Carga el pipeline "pyannote/speaker-diarization".
     Requiere que la variable de entorno HUGGINGFACE_TOKEN esté presente.
-    Retorna lista de tuplas: (start_s, end_s, speaker_label).
     """
-    print("🔍 Iniciando diarización con Pyannote...")
     hf_token = os.getenv("HUGGINGFACE_TOKEN")
     if not hf_token:
         print("[ERROR] No se encontró la variable HUGGINGFACE_TOKEN.")
         sys.exit(1)
 
-    pipeline = Pipeline.from_pretrained(
-        "pyannote/speaker-diarization",
+    from pyannote.audio import Pipeline
+    return Pipeline.from_pretrained(
+        MODELO_DIARIZACION,
         use_auth_token=hf_token
     )
-    diarization = pipeline({"uri": "llamada_tp1", "audio": ruta_wav})
+
+def diarizar_audio(ruta_wav: str, pipeline=None):
+    """
+    Usa Pyannote.audio para obtener segmentos diarizados.
+    Si no se pasa un 'pipeline' ya cargado, lo carga (requiere que la variable
+    de entorno HUGGINGFACE_TOKEN esté presente).
+    Retorna lista de tuplas: (start_s, end_s, speaker_label).
+    """
+    print("🔍 Iniciando diarización con Pyannote...")
+    if pipeline is None:
+        with metricas.temporizador("transcripcion.carga_pyannote"):
+            pipeline = cargar_pipeline_diarizacion()
+    with metricas.temporizador("transcripcion.diarizacion"):
+        diarization = pipeline({"uri": "llamada_tp1", "audio": ruta_wav})
 
     segmentos = []
     for turn, _, speaker in diarization.itertracks(yield_label=True):
         segmentos.append((turn.start, turn.end, speaker))
     return segmentos
 
-def transcribir_fragmento_whisper(fragmento: AudioSegment, modelo) -> str:
+def audio_a_numpy(audio: "AudioSegment") -> np.ndarray:
     """
-    Exporta un fragmento de AudioSegment a WAV temporal y llama a Whisper para transcribirlo.
-    Devuelve el texto transcrito.
+    Convierte un AudioSegment en el formato que Whisper espera en memoria:
+    float32 mono a 16 kHz, con amplitud en [-1, 1].
     """
+    if audio.channels != 1:
+        audio = audio.set_channels(1)
+    if audio.frame_rate != SAMPLE_RATE_WHISPER:
+        audio = audio.set_frame_rate(SAMPLE_RATE_WHISPER)
+    muestras = np.array(audio.get_array_of_samples(), dtype=np.float32)
+    if audio.sample_width == 1:
+        muestras -= 128.0  # el PCM de 8 bits es sin signo, con el cero en 128
+    return muestras / float(1 << (8 * audio.sample_width - 1))
+
+def transcribir_fragmento_whisper(fragmento, modelo) -> str:
+    """
+    Transcribe un fragmento con Whisper y devuelve el texto.
+      - Si 'fragmento' es un np.ndarray (float32, 16 kHz, mono) se pasa directo
+        a Whisper, sin disco ni ffmpeg.
+      - Si es un AudioSegment (respaldo), se exporta a un WAV temporal y Whisper
+        lo vuelve a leer.
+    """
+    if isinstance(fragmento, np.ndarray):
+        try:
+            resultado = modelo.transcribe(fragmento, language="es")
+            return resultado.get("text", "").strip()
+        except Exception as e:
+            return f"{PREFIJO_ERROR}: {e}]"
+
     with tempfile.NamedTemporaryFile(suffix=".wav", delete=False) as tmp:
         ruta_temp = tmp.name
         fragmento.export(ruta_temp, format="wav")
@@ -95,69 +160,284 @@ def transcribir_fragmento_whisper(fragmento: AudioSegment, modelo) -> str:
         resultado = modelo.transcribe(ruta_temp, language="es")
         texto = resultado.get("text", "").strip()
     except Exception as e:
-        texto = f"[ERROR TRANSCRIPCIÓN: {e}]"
+        texto = f"{PREFIJO_ERROR}: {e}]"
     finally:
         os.remove(ruta_temp)
 
     return texto
 
-def transcribir_con_diarizacion(ruta_wav: str, modelo):
+def es_error_transcripcion(texto: str) -> bool:
+    """
+    True si 'texto' es la marca de un segmento que Whisper no pudo transcribir
+    (se escribe en la salida, pero no se guarda en la caché).
+    """
+    return texto.startswith(PREFIJO_ERROR)
+
+def asignar_roles(segmentos: list) -> dict:
+    """
+    Mapeo de etiquetas del diarizador a roles: "Agente" para el primer speaker
+    que aparece, "Cliente" para el segundo, y así alternando.
+    """
+    speaker_map = {}
+    next_role = "Agente"
+    for _, _, speaker in segmentos:
+        if speaker not in speaker_map:
+            speaker_map[speaker] = next_role
+            next_role = "Cliente" if next_role == "Agente" else "Agente"
+    return speaker_map
+
+def transcribir_con_diarizacion(ruta_wav: str, modelo, workers: int = 1, agrupar: bool = False,
+                                nombre_modelo: str = "medium", pipeline=None,
+                                ruta_salida: str = "transcripcion.txt",
+                                cache: Optional[CacheDiarizacion] = None,
+                                filtro: Optional[ParametrosFiltro] = None) -> list:
     """
     Flujo principal:
-      1. Carga el WAV completo con pydub.
+      1. Carga el WAV completo con pydub y lo decodifica una sola vez a float32 16 kHz.
       2. Diariza para obtener segmentos (start_s, end_s, speaker).
-      3. Por cada segmento, recorta el AudioSegment y transcribe con Whisper.
-      4. Guarda en 'transcripcion.txt' cada turno en el formato específico:
+      3. Por cada segmento, toma una vista (sin copia) de las muestras y
+         transcribe con Whisper. Si la decodificación en memoria falla, se
+         recorta el AudioSegment y se usa el camino por archivo temporal.
+      4. Guarda en 'ruta_salida' (por defecto 'transcripcion.txt') cada turno en el formato específico:
             Rol: texto
          donde Rol es "Agente" o "Cliente", asignados según el orden
-         en que aparecen los speakers en la diarización.
+         en que aparecen los speakers en la diarización (antes del pre-filtro).
+    Con 'agrupar' y/o 'workers' > 1 los segmentos se transcriben con el
+    planificador de transcripcion_paralela (paquetes de hasta 30 s, N procesos
+    con su propio modelo 'nombre_modelo').
+    'pipeline' permite reutilizar un pipeline de pyannote ya cargado.
+    Con 'cache' (CacheDiarizacion) se reutilizan la diarización y los textos ya
+    transcritos de la misma grabación; 'modelo' puede ser None y sólo se carga
+    si queda algún segmento por transcribir. Los segmentos que Whisper no pudo
+    transcribir no se guardan: quedan pendientes para la próxima corrida. Al
+    terminar se desalojan las entradas que exceden los límites de la caché.
+    Con 'filtro' (ParametrosFiltro, ver filtro_voz.py) los segmentos se recortan,
+    descartan o unen por energía antes de llegar a Whisper (la diarización no
+    se filtra: pyannote procesa el audio completo).
+    Los tiempos de cada línea se guardan junto a 'ruta_salida' (ver
+    linea_tiempo.guardar_tiempos) para alinear la línea de tiempo del sentimiento.
+    Devuelve la lista de líneas escritas.
     """
+    from pydub import AudioSegment
+
+    inicio = time.perf_counter()
     print("🎧 Cargando audio con pydub...")
-    audio_completo = AudioSegment.from_wav(ruta_wav)
-    segmentos = diarizar_audio(ruta_wav)
+    with metricas.temporizador("transcripcion.carga_audio"):
+        audio_completo = AudioSegment.from_wav(ruta_wav)
+        try:
+            muestras = audio_a_numpy(audio_completo)
+        except Exception as e:
+            print(f"[AVISO] No se pudo decodificar en memoria ({e}); se usarán archivos temporales.")
+            muestras = None
+    metricas.contar("transcripcion.audio_s", len(audio_completo) / 1000)
 
-    # Mapeo de etiquetas del diarizador a roles "Agente"/"Cliente"
-    speaker_map = {}
-    next_role = "Agente"
+    # La diarización sólo depende del audio y de pyannote; los textos, además,
+    # del modelo Whisper (y del pre-filtro, más abajo)
+    clave_segmentos = cache.clave(ruta_wav, MODELO_DIARIZACION) if cache else None
+    clave = cache.derivar(clave_segmentos, nombre_modelo) if cache else None
+    segmentos = cache.obtener_segmentos(clave_segmentos) if cache else None
+    if segmentos is None:
+        segmentos = diarizar_audio(ruta_wav, pipeline)
+        if cache:
+            cache.guardar_segmentos(clave_segmentos, segmentos)
+    else:
+        print(f"♻ Diarización recuperada de la caché ({len(segmentos)} segmentos).")
+
+    # Roles según el orden de aparición en la diarización completa: el filtro
+    # puede descartar el primer turno (un "¿Aló?" corto) y no debe invertirlos
+    roles = asignar_roles(segmentos)
+
+    # Pre-filtro de voz: menos audio (y menos llamadas) para Whisper
+    reporte_filtro = None
+    if filtro is not None and muestras is not None:
+        with metricas.temporizador("transcripcion.filtro_voz"):
+            segmentos, reporte_filtro = filtrar_segmentos(muestras, segmentos, filtro, agrupar=agrupar)
+        metricas.contar("transcripcion.filtro_voz_saltado_s", reporte_filtro.saltado_s)
+        print(f"🔇 Pre-filtro de voz: {reporte_filtro.resumen()}")
+        if cache:
+            # Los índices de los textos se refieren a los segmentos filtrados
+            clave = cache.derivar(clave, filtro.firma())
+    t_whisper = 0.0
+
+    # Textos ya transcritos en una corrida anterior (se retoma desde ahí); los
+    # errores que hubiera guardado una versión anterior se vuelven a intentar
+    textos = cache.obtener_transcripciones(clave, len(segmentos)) if cache else {}
+    textos = {i: t for i, t in textos.items() if not es_error_transcripcion(t)}
+    pendientes = [i for i in range(len(segmentos)) if i not in textos]
+    if textos:
+        print(f"♻ {len(textos)} segmentos ya transcritos en la caché, {len(pendientes)} pendientes.")
+
+    # El modelo se carga sólo si queda algo por transcribir en este proceso
+    # (con varios workers, cada uno carga el suyo)
+    if pendientes and modelo is None and (workers <= 1 or muestras is None):
+        with metricas.temporizador("transcripcion.carga_whisper"):
+            modelo = cargar_whisper_medium()
+
+    # Transcripción planificada (por paquetes y/o en paralelo) antes de escribir
+    if pendientes and muestras is not None and (agrupar or workers > 1):
+        print(f"\n🎤 Transcribiendo {len(pendientes)} segmentos "
+              f"({'agrupados' if agrupar else 'individuales'}, {workers} proceso(s))...")
+
+        def al_paquete(parcial: dict):
+            # Cada paquete se guarda apenas termina: un corte no pierde lo ya hecho
+            for j, texto in parcial.items():
+                textos[pendientes[j]] = texto
+                if cache and not es_error_transcripcion(texto):
+                    cache.guardar_transcripcion(clave, pendientes[j], texto)
+
+        t0 = time.perf_counter()
+        with metricas.temporizador("transcripcion.whisper"):
+            transcribir_segmentos(
+                muestras, [segmentos[i] for i in pendientes], modelo=modelo,
+                nombre_modelo=nombre_modelo, workers=workers, agrupar=agrupar,
+                al_avanzar=lambda hechos, total: print(f"  paquete {hechos}/{total} listo.", flush=True),
+                al_paquete=al_paquete
+            )
+        t_whisper += time.perf_counter() - t0
+        metricas.contar("transcripcion.segmentos", len(pendientes))
+
+    lineas = []
+    tiempos = []  # (start_s, end_s) de cada línea, para la línea de tiempo del sentimiento
 
     # Abrir archivo de salida
-    with open("transcripcion.txt", "w", encoding="utf-8") as f:
-        print("\n🎤 Transcribiendo y guardando en 'transcripcion.txt'...\n")
-        for start_s, end_s, speaker in segmentos:
-            # Asignar rol si es la primera vez que aparece este speaker
-            if speaker not in speaker_map:
-                speaker_map[speaker] = next_role
-                next_role = "Cliente" if next_role == "Agente" else "Agente"
-
-            role = speaker_map[speaker]
-            start_ms = int(start_s * 1000)
-            end_ms   = int(end_s   * 1000)
-            fragmento = audio_completo[start_ms:end_ms]
+    with open(ruta_salida, "w", encoding="utf-8") as f:
+        print(f"\n🎤 Transcribiendo y guardando en '{ruta_salida}'...\n")
+        for i, (start_s, end_s, speaker) in enumerate(segmentos):
+            role = roles[speaker]
+            tiempos.append((start_s, end_s))
+            if i in textos:
+                lineas.append(f"{role}: {textos[i]}")
+                f.write(lineas[-1] + "\n")
+                continue
+            if muestras is not None:
+                # Slice de NumPy: vista sobre el buffer decodificado, sin copia
+                fragmento = muestras[int(start_s * SAMPLE_RATE_WHISPER):int(end_s * SAMPLE_RATE_WHISPER)]
+            else:
+                start_ms = int(start_s * 1000)
+                end_ms   = int(end_s   * 1000)
+                fragmento = audio_completo[start_ms:end_ms]
 
             minutos = int(start_s // 60)
             segundos = start_s % 60
             timestamp = f"{minutos:02d}:{segundos:05.2f}"
 
             print(f"▶ [{timestamp}] [{role}] …", end="", flush=True)
-            texto = transcribir_fragmento_whisper(fragmento, modelo)
+            t0 = time.perf_counter()
+            with metricas.temporizador("transcripcion.whisper"):
+                texto = transcribir_fragmento_whisper(fragmento, modelo)
+            t_whisper += time.perf_counter() - t0
+            metricas.contar("transcripcion.segmentos")
             print(" listo.")
+            if cache and not es_error_transcripcion(texto):
+                cache.guardar_transcripcion(clave, i, texto)
 
             # Escribir línea en el archivo de forma específica para tokenización:
             #   <Rol>: <texto>\n
             linea = f"{role}: {texto}\n"
             f.write(linea)
+            lineas.append(linea.rstrip("\n"))
 
-    print("\n✅ Transcripción completa guardada en 'transcripcion.txt'.")
+    guardar_tiempos(ruta_salida, tiempos)
+    if cache:
+        cache.guardar_estadisticas()
+        eliminadas = cache.desalojar()
+        if eliminadas:
+            print(f"🧹 {eliminadas} entradas viejas eliminadas de la caché.")
+    if reporte_filtro is not None and t_whisper:
+        print(f"⏱ Whisper: {t_whisper:.1f} s (sin pre-filtro se estiman "
+              f"~{t_whisper * reporte_filtro.speedup_estimado:.1f} s)")
+    metricas.observar("transcripcion.total", time.perf_counter() - inicio)
+    print(f"\n✅ Transcripción completa guardada en '{ruta_salida}'.")
+    return lineas
 
 if __name__ == "__main__":
-    if len(sys.argv) < 2:
-        print("Uso: python transcribir.py ruta_archivo.wav")
-        sys.exit(1)
+    parser = argparse.ArgumentParser(description="Diarización y transcripción de una llamada.")
+    parser.add_argument("ruta_wav", help="Archivo WAV de la llamada")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="Procesos de Whisper en paralelo (cada uno carga su modelo, en CPU)")
+    parser.add_argument("--agrupar", action="store_true",
+                        help="Empaquetar segmentos cortos consecutivos en ventanas de hasta 30 s")
+    parser.add_argument("--servidor", default=None,
+                        help="URL de servidor_modelos.py con los modelos ya cargados (cliente liviano; "
+                             "no admite las opciones de la transcripción local)")
+    parser.add_argument("--enviar-audio", action="store_true",
+                        help="Con --servidor, enviar los bytes del WAV en lugar de su ruta")
+    parser.add_argument("--cache", default=DIRECTORIO_POR_DEFECTO,
+                        help="Directorio de la caché de diarización/transcripción")
+    parser.add_argument("--sin-cache", action="store_true",
+                        help="No leer ni escribir la caché")
+    parser.add_argument("--vad", action="store_true",
+                        help="Pre-filtro de voz por energía antes de Whisper (la diarización "
+                             "sigue usando el audio completo): recorta silencios, descarta "
+                             "segmentos cortos o silenciosos y une turnos del mismo hablante; "
+                             "el speedup que informa es estimado")
+    parser.add_argument("--vad-umbral-db", type=float, default=None,
+                        help="Umbral de voz en dBFS (por defecto, adaptativo al ruido de fondo)")
+    parser.add_argument("--vad-min-s", type=float, default=ParametrosFiltro().min_duracion_s,
+                        help="Duración mínima de un segmento, ya recortado")
+    parser.add_argument("--vad-pausa-s", type=float, default=ParametrosFiltro().max_pausa_s,
+                        help="Pausa máxima para unir turnos consecutivos del mismo hablante")
+    parser.add_argument("--metricas", default=None,
+                        help="Exportar métricas por etapa a este archivo (.json o .prom)")
+    args = parser.parse_args()
+    if args.servidor:
+        # El servidor transcribe con su propia configuración: las opciones de
+        # la transcripción local no tendrían efecto
+        locales = {
+            "--workers": args.workers != 1,
+            "--agrupar": args.agrupar,
+            "--cache": args.cache != DIRECTORIO_POR_DEFECTO,
+            "--sin-cache": args.sin_cache,
+            "--vad": args.vad,
+            "--vad-umbral-db": args.vad_umbral_db is not None,
+            "--vad-min-s": args.vad_min_s != ParametrosFiltro().min_duracion_s,
+            "--vad-pausa-s": args.vad_pausa_s != ParametrosFiltro().max_pausa_s,
+            "--metricas": args.metricas is not None,
+        }
+        usadas = [opcion for opcion, usada in locales.items() if usada]
+        if usadas:
+            parser.error(f"{', '.join(usadas)} no se puede(n) usar con --servidor")
+    elif args.enviar_audio:
+        parser.error("--enviar-audio requiere --servidor")
+    if args.metricas:
+        metricas.habilitar()
 
-    ruta_wav = sys.argv[1]
+    ruta_wav = args.ruta_wav
     if not os.path.isfile(ruta_wav):
         print(f"[ERROR] No se encontró el archivo: {ruta_wav}")
         sys.exit(1)
 
-    modelo_whisper = cargar_whisper_medium()
-    transcribir_con_diarizacion(ruta_wav, modelo_whisper)
+    if args.servidor:
+        from servidor_modelos import transcribir_remoto
+
+        try:
+            respuesta = transcribir_remoto(args.servidor, ruta_wav, enviar_audio=args.enviar_audio)
+        except RuntimeError as e:
+            print(f"[ERROR] {e}")
+            sys.exit(1)
+        with open("transcripcion.txt", "w", encoding="utf-8") as f:
+            for linea in respuesta["lineas"]:
+                f.write(linea + "\n")
+        if respuesta.get("segmentos"):
+            guardar_tiempos("transcripcion.txt", respuesta["segmentos"])
+        tiempos = respuesta["tiempos"]
+        print(f"✅ Transcripción guardada en 'transcripcion.txt' "
+              f"(servidor: {tiempos['proceso_s']:.2f} s, espera {tiempos['espera_s']:.2f} s).")
+        sys.exit(0)
+
+    # El modelo se carga sólo si hace falta (con varios workers, cada proceso
+    # carga el suyo; con caché, puede que no quede nada por transcribir)
+    cache = None if args.sin_cache else CacheDiarizacion(args.cache)
+    modelo_whisper = None
+    if args.workers <= 1 and cache is None:
+        with metricas.temporizador("transcripcion.carga_whisper"):
+            modelo_whisper = cargar_whisper_medium()
+    filtro = None
+    if args.vad:
+        filtro = ParametrosFiltro(umbral_db=args.vad_umbral_db, min_duracion_s=args.vad_min_s,
+                                  max_pausa_s=args.vad_pausa_s)
+    transcribir_con_diarizacion(ruta_wav, modelo_whisper, workers=args.workers,
+                                agrupar=args.agrupar, cache=cache, filtro=filtro)
+    if cache:
+        print(cache.reporte())
+    metricas.exportar_a_archivo(args.metricas)
@@ -0,0 +1,181 @@
+"""
+Planificador de inferencia Whisper por lotes y en paralelo (CPU).
+
+Whisper procesa ventanas de 30 s: un turno corto desperdicia casi toda la ventana.
+Este módulo:
+  1. Agrupa segmentos diarizados consecutivos en "paquetes" de hasta ~30 s,
+     separados por un breve silencio, para decodificarlos en una sola llamada.
+  2. Reparte el texto de vuelta a cada turno según las marcas de tiempo de los
+     segmentos que devuelve Whisper.
+  3. Opcionalmente reparte los paquetes entre N procesos, cada uno con su propio
+     modelo cargado (pensado para equipos multinúcleo sin GPU).
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+SAMPLE_RATE = 16000
+VENTANA_WHISPER_S = 30.0
+
+# Un paquete: lista de (índice_de_segmento, inicio_s, fin_s) en el audio original
+Paquete = List[Tuple[int, float, float]]
+
+# Modelo del proceso worker (se carga una vez en _inicializar_worker)
+_modelo_worker = None
+
+
+def agrupar_segmentos(
+    segmentos: List[Tuple[float, float, str]],
+    max_s: float = VENTANA_WHISPER_S,
+    silencio_s: float = 0.5
+) -> List[Paquete]:
+    """
+    Agrupa segmentos consecutivos (start_s, end_s, speaker) en paquetes cuya
+    duración total, con 'silencio_s' entre segmentos, no supera 'max_s'.
+    Un segmento más largo que 'max_s' queda solo en su paquete.
+    """
+    paquetes: List[Paquete] = []
+    actual: Paquete = []
+    duracion = 0.0
+    for i, (inicio, fin, _) in enumerate(segmentos):
+        largo = fin - inicio
+        extra = largo + (silencio_s if actual else 0.0)
+        if actual and duracion + extra > max_s:
+            paquetes.append(actual)
+            actual, duracion, extra = [], 0.0, largo
+        actual.append((i, inicio, fin))
+        duracion += extra
+    if actual:
+        paquetes.append(actual)
+    return paquetes
+
+
+def armar_audio_paquete(
+    muestras: np.ndarray,
+    paquete: Paquete,
+    silencio_s: float = 0.5
+) -> Tuple[np.ndarray, List[Tuple[int, float, float]]]:
+    """
+    Concatena los fragmentos del paquete con silencio intermedio.
+    Devuelve (audio, posiciones) donde posiciones es [(índice, inicio_s, fin_s)]
+    dentro del audio empaquetado.
+    """
+    silencio = np.zeros(int(silencio_s * SAMPLE_RATE), dtype=np.float32)
+    partes = []
+    posiciones = []
+    cursor = 0
+    for idx, inicio, fin in paquete:
+        if partes:
+            partes.append(silencio)
+            cursor += len(silencio)
+        fragmento = muestras[int(inicio * SAMPLE_RATE):int(fin * SAMPLE_RATE)]
+        posiciones.append((idx, cursor / SAMPLE_RATE, (cursor + len(fragmento)) / SAMPLE_RATE))
+        partes.append(fragmento)
+        cursor += len(fragmento)
+    audio = np.concatenate(partes).astype(np.float32, copy=False) if partes else silencio[:0]
+    return audio, posiciones
+
+
+def repartir_texto(resultado: dict, posiciones: List[Tuple[int, float, float]]) -> dict:
+    """
+    Asigna cada segmento de Whisper al turno con el que más se solapa (por marcas
+    de tiempo dentro del audio empaquetado). Devuelve { índice: texto }.
+    """
+    textos = {idx: [] for idx, _, _ in posiciones}
+    for seg in resultado.get("segments", []):
+        mejor, mejor_solape = None, 0.0
+        for idx, inicio, fin in posiciones:
+            solape = min(fin, seg["end"]) - max(inicio, seg["start"])
+            if solape > mejor_solape:
+                mejor, mejor_solape = idx, solape
+        if mejor is None:
+            # Sin solapamiento (cae en un silencio): turno más cercano al centro
+            centro = (seg["start"] + seg["end"]) / 2
+            mejor = min(posiciones, key=lambda p: min(abs(centro - p[1]), abs(centro - p[2])))[0]
+        textos[mejor].append(seg["text"].strip())
+    return {idx: " ".join(t for t in partes if t) for idx, partes in textos.items()}
+
+
+def transcribir_paquete(audio: np.ndarray, posiciones, modelo=None) -> dict:
+    """
+    Transcribe un paquete en una sola llamada a Whisper y reparte el texto.
+    Si no se pasa 'modelo', usa el del proceso worker.
+    """
+    modelo = modelo or _modelo_worker
+    try:
+        resultado = modelo.transcribe(audio, language="es")
+    except Exception as e:
+        return {idx: f"[ERROR TRANSCRIPCIÓN: {e}]" for idx, _, _ in posiciones}
+    if len(posiciones) == 1:
+        return {posiciones[0][0]: resultado.get("text", "").strip()}
+    return repartir_texto(resultado, posiciones)
+
+
+def _inicializar_worker(nombre_modelo: str, hilos: int):
+    """
+    Carga un modelo Whisper propio en cada proceso, en CPU, limitando los hilos
+    de torch para no sobresuscribir los núcleos entre procesos.
+    """
+    global _modelo_worker
+    import torch
+    import whisper
+
+    torch.set_num_threads(hilos)
+    _modelo_worker = whisper.load_model(nombre_modelo, device="cpu")
+
+
+def transcribir_segmentos(
+    muestras: np.ndarray,
+    segmentos: List[Tuple[float, float, str]],
+    modelo=None,
+    nombre_modelo: str = "medium",
+    workers: int = 1,
+    agrupar: bool = True,
+    max_s: float = VENTANA_WHISPER_S,
+    silencio_s: float = 0.5,
+    al_avanzar=None,
+    al_paquete=None
+) -> List[str]:
+    """
+    Transcribe todos los segmentos diarizados y devuelve sus textos en orden.
+      - agrupar: empaqueta segmentos consecutivos en ventanas de hasta 'max_s'.
+      - workers: con 1 se usa 'modelo' en este proceso; con N > 1 se lanzan N
+        procesos, cada uno con su propio 'nombre_modelo' cargado.
+      - al_avanzar: callback(hechos, total) opcional, por paquete terminado.
+      - al_paquete: callback({índice: texto}) opcional con los textos de cada
+        paquete apenas termina (para guardarlos y poder retomar tras un corte).
+    """
+    if agrupar:
+        paquetes = agrupar_segmentos(segmentos, max_s=max_s, silencio_s=silencio_s)
+    else:
+        paquetes = [[(i, inicio, fin)] for i, (inicio, fin, _) in enumerate(segmentos)]
+    trabajos = [armar_audio_paquete(muestras, p, silencio_s) for p in paquetes]
+
+    textos: List[Optional[str]] = [None] * len(segmentos)
+
+    def guardar(parcial: dict, hechos: int):
+        for idx, texto in parcial.items():
+            textos[idx] = texto
+        if al_paquete:
+            al_paquete(parcial)
+        if al_avanzar:
+            al_avanzar(hechos, len(trabajos))
+
+    if workers <= 1:
+        for n, (audio, posiciones) in enumerate(trabajos, 1):
+            guardar(transcribir_paquete(audio, posiciones, modelo), n)
+    else:
+        hilos = max(1, (os.cpu_count() or 1) // workers)
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=_inicializar_worker,
+            initargs=(nombre_modelo, hilos)
+        ) as pool:
+            resultados = pool.map(transcribir_paquete, *zip(*trabajos)) if trabajos else []
+            for n, parcial in enumerate(resultados, 1):
+                guardar(parcial, n)
+
+    return [t or "" for t in textos]
@@ -0,0 +1,438 @@
+#!/usr/bin/env python3
+"""
+Transcripción en tiempo (casi) real para monitoreo de llamadas en vivo.
+
+En lugar de diarizar el WAV completo antes de transcribir, el audio se consume
+por bloques (de un WAV que se sigue escribiendo o de un pipe con PCM crudo).
+Cada 'paso_s' segundos de audio nuevo se diariza una ventana que empieza un poco
+antes del último turno emitido; los turnos que terminan antes del borde de la
+ventana (menos un margen) se consideran finales, se transcriben con Whisper y se
+emiten como "Rol: texto" de inmediato: al archivo de salida, por consola y a la
+línea de tiempo del sentimiento (linea_tiempo.py), que se actualiza con cada
+turno, con sus tiempos, y se exporta al terminar. El reporte de sentimiento y
+protocolo es el de main.py (analizar_ruta) sobre la transcripción guardada.
+
+Para cada turno se mide la latencia de punta a punta: desde que llegó el audio
+que contiene el final del turno hasta que la línea fue emitida.
+
+Uso:
+  python transcripcion_streaming.py llamada.wav [--seguir]
+  ffmpeg -i entrada -f s16le -ar 16000 -ac 1 - | python transcripcion_streaming.py -
+"""
+
+import argparse
+import os
+import statistics
+import struct
+import sys
+import time
+from typing import Callable, Dict, Iterator, List, Tuple
+
+import numpy as np
+
+import metricas
+
+SAMPLE_RATE = 16000  # Whisper y pyannote trabajan a 16 kHz mono
+MIN_RESTO_S = 0.5    # restos más cortos de un turno ya emitido en parte no se transcriben
+
+
+# ------------------------------
+# Lectura de audio por bloques
+# ------------------------------
+
+def _leer_exacto(f, n: int, seguir: bool, espera_s: float) -> bytes:
+    """
+    Lee hasta 'n' bytes. Si 'seguir' es True y el archivo todavía no tiene
+    suficientes datos, espera a que crezca (como 'tail -f'). Devuelve menos
+    de 'n' bytes sólo al final del flujo.
+    """
+    datos = b""
+    while len(datos) < n:
+        parte = f.read(n - len(datos))
+        if parte:
+            datos += parte
+            continue
+        if not seguir:
+            break
+        time.sleep(espera_s)
+    return datos
+
+
+def _leer_cabecera_wav(f, seguir: bool, espera_s: float) -> Tuple[int, int, int]:
+    """
+    Recorre los chunks RIFF hasta 'data' y devuelve (sample_rate, canales, bytes_por_muestra).
+    """
+    riff = _leer_exacto(f, 12, seguir, espera_s)
+    if len(riff) < 12 or riff[:4] != b"RIFF" or riff[8:12] != b"WAVE":
+        raise ValueError("El archivo no es un WAV válido")
+
+    formato = None
+    while True:
+        cab = _leer_exacto(f, 8, seguir, espera_s)
+        if len(cab) < 8:
+            raise ValueError("WAV sin chunk 'data'")
+        nombre, tam = cab[:4], struct.unpack("<I", cab[4:])[0]
+        if nombre == b"data":
+            break
+        cuerpo = _leer_exacto(f, tam + (tam & 1), seguir, espera_s)
+        if nombre == b"fmt ":
+            codigo, canales, sr, _, _, bits = struct.unpack("<HHIIHH", cuerpo[:16])
+            if codigo != 1 or bits != 16:
+                raise ValueError("Sólo se soporta WAV PCM de 16 bits")
+            formato = (sr, canales, bits // 8)
+
+    if formato is None:
+        raise ValueError("WAV sin chunk 'fmt '")
+    return formato
+
+
+def _a_float32_16k(pcm: bytes, sample_rate: int, canales: int) -> np.ndarray:
+    """
+    Convierte PCM int16 intercalado a float32 mono a 16 kHz en [-1, 1].
+    """
+    muestras = np.frombuffer(pcm, dtype="<i2").astype(np.float32) / 32768.0
+    if canales > 1:
+        muestras = muestras.reshape(-1, canales).mean(axis=1)
+    if sample_rate != SAMPLE_RATE and len(muestras):
+        n_salida = int(round(len(muestras) * SAMPLE_RATE / sample_rate))
+        x = np.arange(n_salida) * (sample_rate / SAMPLE_RATE)
+        muestras = np.interp(x, np.arange(len(muestras)), muestras).astype(np.float32)
+    return muestras
+
+
+def leer_audio_por_bloques(
+    fuente: str,
+    bloque_s: float = 1.0,
+    seguir: bool = False,
+    espera_s: float = 0.2
+) -> Iterator[np.ndarray]:
+    """
+    Genera bloques de audio float32 mono a 16 kHz.
+      - fuente == "-": PCM crudo s16le, 16 kHz, mono desde stdin (ej. ffmpeg).
+      - otra ruta: WAV PCM 16 bits; con 'seguir' se espera a que el archivo crezca
+        (útil mientras otro proceso lo está grabando; se corta con Ctrl+C).
+    """
+    if fuente == "-":
+        f = sys.stdin.buffer
+        sample_rate, canales, ancho = SAMPLE_RATE, 1, 2
+        seguir = False  # un pipe ya bloquea hasta que haya datos
+    else:
+        f = open(fuente, "rb")
+        sample_rate, canales, ancho = _leer_cabecera_wav(f, seguir, espera_s)
+
+    tam_frame = canales * ancho
+    tam_bloque = max(1, int(bloque_s * sample_rate)) * tam_frame
+    try:
+        while True:
+            pcm = _leer_exacto(f, tam_bloque, seguir, espera_s)
+            pcm = pcm[:len(pcm) - len(pcm) % tam_frame]
+            if pcm:
+                yield _a_float32_16k(pcm, sample_rate, canales)
+            if len(pcm) < tam_bloque:
+                break
+    finally:
+        if f is not sys.stdin.buffer:
+            f.close()
+
+
+# ------------------------------
+# Transcriptor incremental
+# ------------------------------
+
+def _otro_rol(rol: str) -> str:
+    return "Cliente" if rol == "Agente" else "Agente"
+
+
+class TranscriptorStreaming:
+    """
+    Mantiene un buffer de audio y emite turnos "Rol: texto" apenas son finales.
+
+    Parámetros:
+      modelo:       modelo Whisper ya cargado.
+      pipeline:     pipeline de pyannote ya cargado.
+      al_emitir:    callback(rol, texto, inicio_s, fin_s) por cada turno final.
+      paso_s:       cada cuántos segundos de audio nuevo se vuelve a diarizar.
+      margen_s:     un turno es final si termina al menos 'margen_s' antes del
+                    borde del audio recibido (el hablante podría seguir).
+      contexto_s:   audio ya emitido que se incluye al inicio de cada ventana,
+                    para mantener la correspondencia hablante -> rol.
+      max_turno_s:  audio pendiente máximo sin emitir: pasado ese tiempo sin un
+                    turno final (monólogo o silencio largo) se corta en el borde
+                    y se emite lo que haya, así la ventana (y el costo de cada
+                    diarización) no crece con la duración de la llamada.
+    """
+
+    def __init__(
+        self,
+        modelo,
+        pipeline,
+        al_emitir: Callable[[str, str, float, float], None],
+        paso_s: float = 5.0,
+        margen_s: float = 1.0,
+        contexto_s: float = 10.0,
+        max_turno_s: float = 30.0
+    ):
+        self.modelo = modelo
+        self.pipeline = pipeline
+        self.al_emitir = al_emitir
+        self.paso_s = paso_s
+        self.margen_s = margen_s
+        self.contexto_s = contexto_s
+        self.max_turno_s = max_turno_s
+
+        self._buffer = np.zeros(0, dtype=np.float32)
+        self._inicio_buffer_s = 0.0      # tiempo absoluto de la muestra 0 del buffer
+        self._recibido_s = 0.0           # duración total de audio recibido
+        self._ultima_diarizacion_s = 0.0
+        self._fin_emitido_s = 0.0        # fin del turno emitido más tardío (de cualquier rol)
+        self._emitido_hasta: Dict[str, float] = {}  # rol -> fin de su último turno emitido
+        self._llegadas: List[Tuple[float, float]] = []  # (fin_audio_s, instante de llegada)
+        self._turnos_emitidos: List[Tuple[float, float, str]] = []  # (inicio, fin, rol)
+        self._siguiente_rol = "Agente"
+
+        # Métrica: latencia de punta a punta por turno (segundos)
+        self.latencias: List[float] = []
+
+    def agregar_audio(self, muestras: np.ndarray):
+        """
+        Agrega un bloque de audio (float32, 16 kHz, mono) y emite los turnos que
+        hayan quedado finales.
+        """
+        self._buffer = np.concatenate([self._buffer, muestras])
+        self._recibido_s += len(muestras) / SAMPLE_RATE
+        self._llegadas.append((self._recibido_s, time.perf_counter()))
+
+        if self._recibido_s - self._ultima_diarizacion_s >= self.paso_s:
+            self._procesar(final=False)
+
+    def finalizar(self):
+        """
+        Fin del flujo: todos los turnos pendientes son finales.
+        """
+        if self._recibido_s > self._fin_emitido_s:
+            self._procesar(final=True)
+
+    def resumen_latencias(self) -> Dict[str, float]:
+        """
+        Estadísticas de latencia de punta a punta por turno (segundos).
+        """
+        if not self.latencias:
+            return {"turnos": 0}
+        ordenadas = sorted(self.latencias)
+        return {
+            "turnos":  len(ordenadas),
+            "media_s": statistics.fmean(ordenadas),
+            "p50_s":   ordenadas[len(ordenadas) // 2],
+            "max_s":   ordenadas[-1],
+        }
+
+    # --- internos ---
+
+    def _procesar(self, final: bool):
+        self._ultima_diarizacion_s = self._recibido_s
+
+        # Ventana: desde un poco antes del último turno emitido hasta el final
+        inicio_ventana = max(self._inicio_buffer_s, self._fin_emitido_s - self.contexto_s)
+        desde = int(round((inicio_ventana - self._inicio_buffer_s) * SAMPLE_RATE))
+        ventana = self._buffer[desde:]
+        if not len(ventana):
+            return
+
+        segmentos = sorted(self._diarizar(ventana, inicio_ventana))
+        roles = self._asignar_roles(segmentos)
+        limite = self._recibido_s if final else self._recibido_s - self.margen_s
+        for inicio, fin, speaker in segmentos:
+            if fin > limite:
+                continue
+            # Lo ya emitido se controla por rol: un turno del otro hablante que se
+            # solapa con (o queda dentro de) uno ya emitido se emite igual, y uno
+            # del mismo rol sólo desde donde terminó su último turno
+            rol = roles[speaker]
+            emitido = self._emitido_hasta.get(rol, 0.0)
+            if fin <= emitido or (inicio < emitido and fin - emitido < MIN_RESTO_S):
+                # Ya emitido, o sólo cambió un poco el borde al re-diarizar
+                continue
+            inicio = max(inicio, emitido)
+            self._emitir(rol, inicio, fin)
+
+        if not final and limite - self._fin_emitido_s > self.max_turno_s:
+            self._cortar(segmentos, roles, limite)
+
+        self._recortar_buffer()
+
+    def _cortar(self, segmentos, roles: Dict[str, str], limite: float):
+        """
+        Corte forzado en 'limite': los turnos todavía abiertos se emiten hasta ahí
+        (el resto sale como un turno aparte más adelante) y lo anterior al corte se
+        da por emitido para ambos roles, aunque sea silencio.
+        """
+        for inicio, fin, speaker in segmentos:
+            if fin <= limite:
+                continue
+            rol = roles[speaker]
+            inicio = max(inicio, self._emitido_hasta.get(rol, 0.0))
+            if limite - inicio >= MIN_RESTO_S:
+                self._emitir(rol, inicio, limite)
+        self._fin_emitido_s = max(self._fin_emitido_s, limite)
+        for rol in ("Agente", "Cliente"):
+            self._emitido_hasta[rol] = max(self._emitido_hasta.get(rol, 0.0), limite)
+
+    def _diarizar(self, ventana: np.ndarray, inicio_ventana: float) -> List[Tuple[float, float, str]]:
+        """
+        Segmentos (inicio_s, fin_s, speaker) de la ventana, en tiempo absoluto.
+        """
+        import torch
+
+        waveform = torch.from_numpy(np.ascontiguousarray(ventana)).unsqueeze(0)
+        diarization = self.pipeline({"waveform": waveform, "sample_rate": SAMPLE_RATE})
+        return [
+            (inicio_ventana + turn.start, inicio_ventana + turn.end, speaker)
+            for turn, _, speaker in diarization.itertracks(yield_label=True)
+        ]
+
+    def _asignar_roles(self, segmentos) -> Dict[str, str]:
+        """
+        Las etiquetas de pyannote son locales a cada ventana. Cada etiqueta toma el
+        rol con el que mejor coincide en el contexto ya emitido (solape sobre
+        unión de cada par de tramos, así un turno corto del otro hablante anidado
+        en uno largo no arrastra la etiqueta del largo); primero se reparten los
+        roles uno a uno por mejor coincidencia. Las etiquetas que quedan (sin
+        solapamiento, o cuyo rol ya tomó otra) reciben roles libres en orden de
+        aparición, como en el modo por lotes.
+        """
+        solapes: Dict[str, Dict[str, float]] = {}
+        for inicio, fin, speaker in segmentos:
+            por_rol = solapes.setdefault(speaker, {})
+            for e_ini, e_fin, rol in self._turnos_emitidos:
+                s = min(fin, e_fin) - max(inicio, e_ini)
+                if s > 0:
+                    union = max(fin, e_fin) - min(inicio, e_ini)
+                    por_rol[rol] = por_rol.get(rol, 0.0) + s / union
+
+        roles: Dict[str, str] = {}
+        pares = sorted(((puntaje, speaker, rol) for speaker, por_rol in solapes.items()
+                        for rol, puntaje in por_rol.items()), reverse=True)
+        for _, speaker, rol in pares:
+            if speaker not in roles and rol not in roles.values():
+                roles[speaker] = rol
+        for inicio, fin, speaker in segmentos:
+            if speaker not in roles:
+                usados = set(roles.values())
+                libres = [r for r in (self._siguiente_rol, _otro_rol(self._siguiente_rol))
+                          if r not in usados]
+                rol = libres[0] if libres else self._siguiente_rol
+                roles[speaker] = rol
+                self._siguiente_rol = _otro_rol(rol)
+        return roles
+
+    def _emitir(self, rol: str, inicio: float, fin: float):
+        desde = int(round((inicio - self._inicio_buffer_s) * SAMPLE_RATE))
+        hasta = int(round((fin - self._inicio_buffer_s) * SAMPLE_RATE))
+        fragmento = self._buffer[max(0, desde):hasta]
+
+        try:
+            resultado = self.modelo.transcribe(fragmento, language="es")
+            texto = resultado.get("text", "").strip()
+        except Exception as e:
+            texto = f"[ERROR TRANSCRIPCIÓN: {e}]"
+
+        self.al_emitir(rol, texto, inicio, fin)
+
+        # Latencia: desde la llegada del bloque que contenía el final del turno
+        llegada = next((t for fin_audio, t in self._llegadas if fin_audio >= fin),
+                       self._llegadas[-1][1])
+        self.latencias.append(time.perf_counter() - llegada)
+
+        self._fin_emitido_s = max(self._fin_emitido_s, fin)
+        self._emitido_hasta[rol] = max(self._emitido_hasta.get(rol, 0.0), fin)
+        self._turnos_emitidos.append((inicio, fin, rol))
+
+    def _recortar_buffer(self):
+        """
+        Descarta el audio que ya no puede formar parte de ninguna ventana.
+        """
+        corte_s = self._fin_emitido_s - self.contexto_s
+        if corte_s <= self._inicio_buffer_s:
+            return
+        n = int((corte_s - self._inicio_buffer_s) * SAMPLE_RATE)
+        self._buffer = self._buffer[n:].copy()
+        self._inicio_buffer_s += n / SAMPLE_RATE
+        self._llegadas = [(f, t) for f, t in self._llegadas if f >= self._fin_emitido_s]
+        self._turnos_emitidos = [t for t in self._turnos_emitidos if t[1] > corte_s]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Transcripción y análisis en streaming.")
+    parser.add_argument("fuente", help="WAV PCM 16 bits, o '-' para PCM s16le 16 kHz mono por stdin")
+    parser.add_argument("--seguir", action="store_true",
+                        help="Esperar a que el WAV siga creciendo (grabación en curso)")
+    parser.add_argument("--salida", default="transcripcion.txt")
+    parser.add_argument("--paso", type=float, default=5.0,
+                        help="Segundos de audio nuevo entre diarizaciones")
+    parser.add_argument("--max-turno", type=float, default=30.0,
+                        help="Segundos de audio sin un turno final tras los que se corta y emite igual")
+    parser.add_argument("--linea-tiempo", default="linea_tiempo.json",
+                        help="Archivo JSON para la línea de tiempo del sentimiento por turno")
+    parser.add_argument("--metricas", default=None,
+                        help="Exportar métricas por etapa a este archivo (.json o .prom)")
+    args = parser.parse_args()
+    if args.metricas:
+        metricas.habilitar()
+
+    if args.fuente != "-" and not os.path.isfile(args.fuente):
+        print(f"[ERROR] No se encontró el archivo: {args.fuente}")
+        sys.exit(1)
+
+    from transcripcion import cargar_whisper_medium, cargar_pipeline_diarizacion
+    from tokenizacion import cargar_vocabulario, iterar_tokens
+    from sugerencias import IndiceSugerencias
+    from automata_frases import AutomataFrases
+    from linea_tiempo import LineaTiempo, guardar_tiempos
+    from main import VOC_LEX_CSV, lexicon_desde_vocabulario, analizar_ruta, generar_reporte
+
+    vocab_catalog = cargar_vocabulario(VOC_LEX_CSV)
+    indice = IndiceSugerencias(vocab_catalog.keys())
+    lexicon = lexicon_desde_vocabulario(vocab_catalog)
+    automata = AutomataFrases.desde_vocabulario(vocab_catalog)
+    linea = LineaTiempo(lexicon)
+    sugerencias: Dict[str, List[str]] = {}
+
+    modelo_whisper = cargar_whisper_medium()
+    pipeline = cargar_pipeline_diarizacion()
+
+    with open(args.salida, "w", encoding="utf-8") as f:
+        def al_emitir(rol: str, texto: str, inicio: float, fin: float):
+            minutos, segundos = int(inicio // 60), inicio % 60
+            print(f"▶ [{minutos:02d}:{segundos:05.2f}] {rol}: {texto}", end="", flush=True)
+            f.write(f"{rol}: {texto}\n")
+            f.flush()
+            # Etapa siguiente: tokenización + línea de tiempo, turno a turno
+            punto = linea.agregar_turno(iterar_tokens(texto, vocab_catalog, sugerencias, indice=indice),
+                                        rol.lower(), inicio, fin)
+            print(f"  [{punto.puntaje:+d} | ventana {punto.ventana:+d}]", flush=True)
+
+        transcriptor = TranscriptorStreaming(modelo_whisper, pipeline, al_emitir, paso_s=args.paso,
+                                             max_turno_s=args.max_turno)
+        print("\n🎤 Escuchando audio...\n")
+        try:
+            for bloque in leer_audio_por_bloques(args.fuente, seguir=args.seguir):
+                transcriptor.agregar_audio(bloque)
+        except KeyboardInterrupt:
+            pass
+        transcriptor.finalizar()
+
+    linea.guardar(args.linea_tiempo)
+    guardar_tiempos(args.salida, [(p.inicio_s, p.fin_s) for p in linea.puntos])
+    print(f"\n📈 Línea de tiempo de {len(linea)} turnos guardada en '{args.linea_tiempo}'.")
+    resumen = transcriptor.resumen_latencias()
+    if resumen["turnos"]:
+        print(f"\n⏱ Latencia por turno: media={resumen['media_s']:.2f}s "
+              f"p50={resumen['p50_s']:.2f}s max={resumen['max_s']:.2f}s "
+              f"({resumen['turnos']} turnos)")
+
+    # Reporte final: el mismo de main.py sobre la transcripción guardada
+    # (sentimiento, protocolo con sus frases y sugerencias)
+    resultado = analizar_ruta(args.salida, vocab_catalog, lexicon, indice=indice, automata=automata)
+    generar_reporte(resultado["sentimiento"], resultado["protocolo"],
+                    resultado["sugerencias_agente"], resultado["sugerencias_cliente"])
+    metricas.exportar_a_archivo(args.metricas)
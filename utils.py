@@ -1,6 +1,19 @@
 import re
+from typing import List
 from unidecode import unidecode
 
+# Caracteres que forman un token y su forma normalizada (minúscula, sin tildes).
+# Equivale a limpiar_palabra() aplicado a tokens de [A-Za-zÑñÁÉÍÓÚáéíóú0-9]+.
+_TABLA_LEXEMAS = str.maketrans(
+    "ABCDEFGHIJKLMNOPQRSTUVWXYZÑñÁÉÍÓÚáéíóú",
+    "abcdefghijklmnopqrstuvwxyznnaeiouaeiou"
+)
+_TABLA_TILDES = str.maketrans("ñáéíóú", "naeiou")
+_PATRON_LEXEMA = re.compile(r"[a-z0-9]+")
+_PATRON_MINUSCULA = re.compile(r"[a-z0-9ñáéíóú]+")
+# Únicos caracteres fuera de la clase cuyo lower() produce letras de la clase
+_MINUSCULA_AMBIGUA = ("\u0130", "\u212a")
+
 def limpiar_palabra(palabra: str) -> str:
     """
     Elimina puntuación al inicio y final de la palabra, convierte a minúsculas,
@@ -14,3 +27,23 @@ def limpiar_palabra(palabra: str) -> str:
     # 3. Eliminar cualquier carácter que no sea letra o número
     palabra_limpia = re.sub(r'[^a-z0-9ñ]', '', palabra_limpia)
     return palabra_limpia
+
+def extraer_lexemas(texto: str) -> List[str]:
+    """
+    Tokeniza y normaliza en una sola pasada: traduce el texto completo a su forma
+    normalizada y extrae los lexemas con un único escaneo, sin pasar cada token
+    por limpiar_palabra. Omite los tokens que sean únicamente números.
+    Ej: "¿Cómo está, SEÑOR? 123" -> ["como", "esta", "senor"]
+    """
+    if any(ch in texto for ch in _MINUSCULA_AMBIGUA):
+        # Caso raro: se traduce carácter a carácter para respetar los límites
+        # de token originales.
+        tokens = _PATRON_LEXEMA.findall(texto.translate(_TABLA_LEXEMAS))
+        return [tok for tok in tokens if not tok.isdigit()]
+
+    # lower() y el escaneo corren en C; sólo los tokens con tildes/ñ se traducen
+    return [
+        tok if tok.isascii() else tok.translate(_TABLA_TILDES)
+        for tok in _PATRON_MINUSCULA.findall(texto.lower())
+        if not tok.isdigit()
+    ]